@@ -1,16 +1,307 @@
+import math
+
+import numpy as np
+
 import utils
 
+OBSTACLE_COLOR = (0, 255, 255)
+CLEARANCE_LIMIT = 64  # Верхняя граница карты расстояний до препятствий, в пикселях
+CELL_DIAGONAL = math.sqrt(2)  # Запас на положение точки внутри ячейки
+
+
+class CollisionMap:
+    """Карта занятости: булев массив grid[y, x], True - препятствие.
+
+    Строится один раз из изображения карты, при необходимости расширяется
+    на радиус робота. Точки за пределами карты считаются свободными,
+    как и в проверке по Surface.
+    """
+
+    def __init__(self, grid, robot_radius=0):
+        grid = np.ascontiguousarray(grid, dtype=bool)
+        if robot_radius > 0:
+            grid = inflate(grid, robot_radius)
+        self.grid = grid
+        self.height, self.width = grid.shape
+        # Плоское представление без копирования для быстрого доступа к ячейке из цикла Python
+        self.cells = memoryview(grid.view(np.uint8).reshape(-1))
+        self.clearance = None  # Расстояние до ближайшего препятствия, см. enable_clearance
+        self.clearance_cells = None
+
+    def enable_clearance(self, clearance=None):
+        """Один раз строит карту расстояний и включает раннее завершение проверок.
+
+        Если расстояние от ячейки до препятствий больше оставшейся длины отрезка,
+        остаток отрезка не проверяется. clearance - уже посчитанная для этой карты
+        distance_transform (например, в разделяемой памяти), тогда она не строится заново.
+        """
+        if self.clearance is None:
+            if clearance is None:
+                clearance = distance_transform(self.grid, CLEARANCE_LIMIT)
+            self.clearance = clearance
+            self.clearance_cells = memoryview(self.clearance.reshape(-1))
+        return self.clearance
+
+    def clearance_at(self, x, y):
+        """Расстояние от ячейки с точкой (x, y) до ближайшего препятствия (не больше CLEARANCE_LIMIT).
+
+        За пределами карты расстояние неизвестно, поэтому возвращается 0.
+        """
+        cx, cy = int(math.floor(x)), int(math.floor(y))
+        if 0 <= cx < self.width and 0 <= cy < self.height:
+            return float(self.enable_clearance()[cy, cx])
+        return 0.0
+
+    @classmethod
+    def from_surface(cls, surface, robot_radius=0, color=OBSTACLE_COLOR):
+        """Строит карту по pygame.Surface, препятствия - пиксели цвета color"""
+        import pygame
+
+        pixels = pygame.surfarray.array3d(surface)  # [x, y, rgb]
+        grid = np.all(pixels == np.array(color, dtype=pixels.dtype), axis=2).T
+        return cls(grid, robot_radius)
+
+    def is_occupied(self, x, y):
+        """Проверяет, занята ли ячейка, содержащая точку (x, y)"""
+        cx, cy = int(math.floor(x)), int(math.floor(y))
+        if 0 <= cx < self.width and 0 <= cy < self.height:
+            return self.cells[cy * self.width + cx] != 0
+        return False
+
+    def segment_collides(self, x0, y0, x1, y1):
+        """Проверяет отрезок обходом всех пересекаемых им ячеек (DDA, Amanatides-Woo).
+
+        Концы упорядочиваются перед обходом: при проходе через углы ячеек DDA
+        выбирает разные ячейки в зависимости от направления, а ответ для ребра
+        дерева не должен зависеть от того, с какого конца его проверили.
+        """
+        if (x1, y1) < (x0, y0):
+            x0, y0, x1, y1 = x1, y1, x0, y0
+        cells = self.cells
+        width, height = self.width, self.height
+        cx, cy = int(math.floor(x0)), int(math.floor(y0))
+        end_x, end_y = int(math.floor(x1)), int(math.floor(y1))
+        dx, dy = x1 - x0, y1 - y0
+
+        if dx > 0:
+            step_x, t_delta_x = 1, 1.0 / dx
+            t_max_x = (cx + 1 - x0) * t_delta_x
+        elif dx < 0:
+            step_x, t_delta_x = -1, -1.0 / dx
+            t_max_x = (x0 - cx) * t_delta_x
+        else:
+            step_x, t_delta_x, t_max_x = 0, math.inf, math.inf
+
+        if dy > 0:
+            step_y, t_delta_y = 1, 1.0 / dy
+            t_max_y = (cy + 1 - y0) * t_delta_y
+        elif dy < 0:
+            step_y, t_delta_y = -1, -1.0 / dy
+            t_max_y = (y0 - cy) * t_delta_y
+        else:
+            step_y, t_delta_y, t_max_y = 0, math.inf, math.inf
+
+        # Конечная ячейка проверяется отдельно: при концах на границе ячеек шаги DDA
+        # с равными t могут завершить обход в соседней ячейке
+        if 0 <= end_x < width and 0 <= end_y < height and cells[end_y * width + end_x]:
+            return True
+
+        count = abs(end_x - cx) + abs(end_y - cy) + 1
+        clearance = self.clearance_cells
+        if clearance is None:
+            for _ in range(count):
+                if 0 <= cx < width and 0 <= cy < height and cells[cy * width + cx]:
+                    return True
+                if t_max_x < t_max_y:
+                    cx += step_x
+                    t_max_x += t_delta_x
+                else:
+                    cy += step_y
+                    t_max_y += t_delta_y
+            return False
+
+        # То же с ранним завершением: t - параметр точки входа отрезка в текущую ячейку
+        length = math.hypot(dx, dy)
+        t = 0.0
+        for _ in range(count):
+            if 0 <= cx < width and 0 <= cy < height:
+                i = cy * width + cx
+                if cells[i]:
+                    return True
+                if clearance[i] > (1.0 - t) * length + CELL_DIAGONAL:
+                    return False
+            if t_max_x < t_max_y:
+                t = t_max_x
+                cx += step_x
+                t_max_x += t_delta_x
+            else:
+                t = t_max_y
+                cy += step_y
+                t_max_y += t_delta_y
+        return False
+
+    def segments_free(self, x0, y0, xs, ys):
+        """Пакетная проверка рёбер между (x0, y0) и точками (xs[i], ys[i]).
+
+        Те же ячейки, что обходит segment_collides (DDA, Amanatides-Woo, концы
+        упорядочены, конечная ячейка проверяется отдельно), но для всех рёбер сразу
+        операциями NumPy, поэтому результат совпадает с проверкой по одному ребру
+        в любом направлении, в том числе для рёбер, задевающих угол ячейки.
+        Возвращает булев массив: True - ребро свободно.
+        """
+        xs = np.asarray(xs, dtype=float)
+        ys = np.asarray(ys, dtype=float)
+        if xs.size == 0:
+            return np.ones(0, dtype=bool)
+        if self.clearance is not None:
+            # Рёбра короче расстояния от начала до препятствий заведомо свободны
+            lengths = np.hypot(xs - x0, ys - y0)
+            near = lengths + CELL_DIAGONAL >= self.clearance_at(x0, y0)
+            if not near.all():
+                free = np.ones(xs.size, dtype=bool)
+                if near.any():
+                    free[near] = self.segments_free(x0, y0, xs[near], ys[near])
+                return free
+
+        # Шаг DDA - ближайшее по t пересечение границы ячейки по x или по y (при равенстве - по y).
+        # Моменты пересечений по каждой оси накапливаются тем же сложением, что в segment_collides,
+        # а слияние двух возрастающих рядов даёт ту же последовательность ячеек
+        # Концы каждого ребра упорядочиваются так же, как в segment_collides
+        swap = (xs < x0) | ((xs == x0) & (ys < y0))
+        origin_x, origin_y = np.where(swap, xs, x0), np.where(swap, ys, y0)
+        target_x, target_y = np.where(swap, x0, xs), np.where(swap, y0, ys)
+        start_x, start_y = np.floor(origin_x).astype(np.intp), np.floor(origin_y).astype(np.intp)
+        end_x, end_y = np.floor(target_x).astype(np.intp), np.floor(target_y).astype(np.intp)
+        ends_hit = self._occupied(start_x, start_y) | self._occupied(end_x, end_y)
+        events = np.abs(end_x - start_x) + np.abs(end_y - start_y)
+        steps = int(events.max())
+        if steps == 0:
+            return ~ends_hit
+        with np.errstate(divide='ignore', invalid='ignore'):
+            step_x, times_x = _dda_crossings(start_x, origin_x, target_x - origin_x)
+            step_y, times_y = _dda_crossings(start_y, origin_y, target_y - origin_y)
+        ramp = np.empty((xs.size, steps))
+        crossings = []
+        for t_max, t_delta in (times_y, times_x):
+            ramp[:, 0] = t_max
+            ramp[:, 1:] = t_delta[:, None]
+            crossings.append(np.cumsum(ramp, axis=1))
+        # Устойчивая сортировка: при равных t пересечение по y (первая половина) идёт раньше
+        order = np.argsort(np.concatenate(crossings, axis=1), axis=1, kind='stable')
+        moved_x = np.cumsum(order[:, :steps] >= steps, axis=1)
+        moved_y = np.arange(1, steps + 1) - moved_x
+        cx = start_x[:, None] + step_x[:, None] * moved_x
+        cy = start_y[:, None] + step_y[:, None] * moved_y
+        hit = self._occupied(cx, cy) & (np.arange(steps) < events[:, None])
+        return ~(hit.any(axis=1) | ends_hit)
+
+    def _occupied(self, cx, cy):
+        """is_occupied для массивов номеров ячеек: за пределами карты - свободно"""
+        inside = (cx >= 0) & (cx < self.width) & (cy >= 0) & (cy < self.height)
+        occupied = np.zeros(cx.shape, dtype=bool)
+        occupied[inside] = self.grid[cy[inside], cx[inside]]
+        return occupied
+
+
+def _dda_crossings(cell, origin, delta):
+    """Шаг по оси, первое t_max и t_delta DDA для массива рёбер, как в segment_collides"""
+    step = np.sign(delta).astype(np.intp)
+    t_delta = np.where(delta != 0, 1.0 / np.abs(delta), math.inf)
+    t_max = np.where(delta > 0, (cell + 1 - origin) * t_delta,
+                     np.where(delta < 0, (origin - cell) * t_delta, math.inf))
+    return step, (t_max, t_delta)
+
+
+def distance_transform(grid, limit):
+    """Точное евклидово расстояние от каждой ячейки до ближайшего препятствия.
+
+    Сначала по столбцам считается расстояние по вертикали, затем по строкам
+    берётся минимум (x - x')^2 + g(x')^2 по сдвигам не больше limit.
+    Значения ограничены сверху limit, препятствия получают 0.
+    """
+    height, width = grid.shape
+    limit = float(limit)
+    vertical = np.full((height, width), limit, dtype=np.float32)
+    last = np.full(width, -np.inf, dtype=np.float32)
+    for y in range(height):
+        last[grid[y]] = y
+        np.minimum(y - last, limit, out=vertical[y])
+    last[:] = np.inf
+    for y in range(height - 1, -1, -1):
+        last[grid[y]] = y
+        np.minimum(vertical[y], last - y, out=vertical[y])
+
+    squared = vertical * vertical
+    best = squared.copy()
+    shift = 1
+    while shift < min(limit, width) and shift * shift < best.max():
+        offset = np.float32(shift * shift)
+        np.minimum(best[:, shift:], squared[:, :-shift] + offset, out=best[:, shift:])
+        np.minimum(best[:, :-shift], squared[:, shift:] + offset, out=best[:, :-shift])
+        shift += 1
+    return np.sqrt(np.minimum(best, limit * limit))
+
+
+def inflate(grid, radius):
+    """Расширяет препятствия на radius пикселей (дилатация кругом)"""
+    r = int(math.ceil(radius))
+    height, width = grid.shape
+    padded = np.zeros((height + 2 * r, width + 2 * r), dtype=bool)
+    padded[r:r + height, r:r + width] = grid
+    result = np.zeros_like(grid)
+    for oy in range(-r, r + 1):
+        for ox in range(-r, r + 1):
+            if ox * ox + oy * oy <= radius * radius:
+                result |= padded[r + oy:r + oy + height, r + ox:r + ox + width]
+    return result
+
+
+def as_collision_map(obstacles, backend='bitmap', robot_radius=0):
+    """Приводит карту препятствий к виду, который принимают collision и free_edges.
+
+    CollisionMap возвращается как есть, булев массив [y, x] оборачивается в CollisionMap,
+    pygame.Surface преобразуется в карту занятости или (backend='surface') остаётся эталоном.
+    """
+    if isinstance(obstacles, CollisionMap):
+        return obstacles
+    if isinstance(obstacles, np.ndarray):
+        return CollisionMap(obstacles, robot_radius)
+    if backend == 'bitmap':
+        return CollisionMap.from_surface(obstacles, robot_radius)
+    return obstacles
+
 
 def collision(src, dst, obstacles):
+    """Проверяет наличие столкновений на пути от src до dst.
+
+    obstacles - CollisionMap или pygame.Surface (эталонная попиксельная проверка).
+    """
+    if isinstance(obstacles, CollisionMap):
+        return obstacles.segment_collides(src.x, src.y, dst.x, dst.y)
+    return collision_surface(src, dst, obstacles)
+
+
+def free_edges(src, dsts, obstacles):
+    """Пакетно проверяет рёбра от src до каждого узла из dsts.
+
+    Возвращает булев массив: True - ребро без столкновений.
+    """
+    if isinstance(obstacles, CollisionMap):
+        return obstacles.segments_free(src.x, src.y, [d.x for d in dsts], [d.y for d in dsts])
+    return np.array([not collision_surface(src, d, obstacles) for d in dsts], dtype=bool)
+
+
+def collision_surface(src, dst, obstacles):
+    """Эталонная проверка: шаг в 1 пиксель и чтение цвета из Surface"""
     vx, vy = utils.normalize(dst.x - src.x, dst.y - src.y)
     curr = [src.x, src.y]
     while utils.dist(curr, dst) > 1:
         intCurr = int(curr[0]), int(curr[1])
         try:
-            if obstacles.get_at(intCurr) == (0, 255, 255):
+            if obstacles.get_at(intCurr) == OBSTACLE_COLOR:
                 return True
         except Exception:
             pass
         curr[0] += vx
         curr[1] += vy
-    return False
\ No newline at end of file
+    return False
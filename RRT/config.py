@@ -1,6 +1,3 @@
-from pygame import font
-
-
 BLACK = (0, 0, 0)
 WHITE = (255, 255, 255)
 RED = (255, 0, 0)
@@ -10,5 +7,16 @@ YELLOW = (255, 255, 0)
 
 WIDTH = 800
 HEIGHT = 600
-font.init()
-FONT = font.SysFont('Tahoma', 25, bold = True)
\ No newline at end of file
+FONT_NAME = 'Tahoma'
+FONT_SIZE = 25
+
+COLLISION_BACKEND = 'bitmap'  # Проверка столкновений: 'bitmap' (карта занятости) или 'surface' (эталон по пикселям)
+ROBOT_RADIUS = 0  # Радиус робота для расширения препятствий на карте занятости
+CLEARANCE = True  # Карта расстояний до препятствий: проверка отрезка заканчивается, как только остаток заведомо свободен
+TREE_STORE = 'objects'  # Хранение дерева: 'objects' (объекты Node) или 'arrays' (массивы NumPy, векторный поиск ближайшего)
+PLANNER = 'rrt'  # Планировщик: 'rrt' (одно дерево) или 'connect' (двунаправленный RRT-Connect)
+SMOOTH_PATH = False  # Сокращать и сглаживать найденный путь перед отображением
+SMOOTH_SPLINE = False  # Дополнительно сглаживать сокращённый путь сплайном Катмулла-Рома (добавляет точки)
+MAX_CURVATURE = 0.1  # Максимальная кривизна сплайна (1/пиксель), None - без ограничения
+MAP_FILE = None  # Файл карты (PNG, PGM, ROS yaml, .npy) вместо рисования препятствий мышью
+MAP_OBSTACLE_COLOR = (0, 255, 255)  # Цвет препятствий в PNG; None - занятость по яркости, как в ROS
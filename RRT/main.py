@@ -1,71 +1,26 @@
-import pygame
-import random
-import math
+import os
+import sys
 import time
 
+import numpy as np
+import pygame
+
 import collision
 import config as cfg
+import smoothing
+from rrt import Node, RRT
+from rrt_connect import RRTConnect
 
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), '..', 'maps'))
+import map_loader
 
 
-# Define Node class
-class Node:
-    def __init__(self, x, y):
-        self.x = x
-        self.y = y
-        self.parent = None
-
-
-# Define RRT class
-class RRT:
-    def __init__(self, start, goal, obstacles):
-        self.start = start
-        self.goal = goal
-        self.obstacles = obstacles
-        self.nodes = [start]
-        self.step_size = 20
-        self.final_step = 50
-
-    def find_path(self):
-        for i in range(10000):
-            rand_node = Node(random.randint(0, cfg.WIDTH), random.randint(0, cfg.HEIGHT))
-            nearest_node = self.nodes[0]
-            for node in self.nodes:
-                if math.sqrt((rand_node.x - node.x) ** 2 + (rand_node.y - node.y) ** 2) < math.sqrt(
-                        (rand_node.x - nearest_node.x) ** 2 + (rand_node.y - nearest_node.y) ** 2):
-                    nearest_node = node
-
-            new_node = Node(nearest_node.x + self.step_size * (rand_node.x - nearest_node.x) / math.sqrt(
-                (rand_node.x - nearest_node.x) ** 2 + (rand_node.y - nearest_node.y) ** 2),
-                            nearest_node.y + self.step_size * (rand_node.y - nearest_node.y) / math.sqrt(
-                                (rand_node.x - nearest_node.x) ** 2 + (rand_node.y - nearest_node.y) ** 2))
-            if not collision.collision(nearest_node, new_node, self.obstacles):
-                new_node.parent = nearest_node
-                self.nodes.append(new_node)
-                print(f"Random node position: ({rand_node.x}, {rand_node.y})")
-                print(f"Nearest node position: ({nearest_node.x}, {nearest_node.y})")
-                print(f"New node position: ({new_node.x}, {new_node.y})")
-            final_node = Node(self.goal.x, self.goal.y)
-            if math.sqrt((new_node.x - self.goal.x) ** 2 + (
-                    new_node.y - self.goal.y) ** 2) < self.final_step and not collision.collision(new_node, final_node,
-                                                                                             self.obstacles):
-                    final_node.parent = new_node
-                    self.nodes.append(final_node)
-                    path = [final_node]
-                    while path[-1].parent is not None:
-                        path.append(path[-1].parent)
-                    return [(node.x, node.y) for node in path[::-1]]
-        return None
-
-    def draw(self, screen):
-        for node in self.nodes:
-            pygame.draw.circle(screen, cfg.YELLOW, (node.x, node.y), 3)
-            if node.parent is not None:
-                pygame.draw.line(screen, cfg.WHITE, (node.x, node.y), (node.parent.x, node.parent.y), 2)
-        pygame.draw.circle(screen, cfg.RED, (self.start.x, self.start.y), 10)
-        pygame.draw.circle(screen, cfg.GREEN, (self.goal.x, self.goal.y), 10)
-
-
+# Load a map file (PNG, PGM, ROS yaml, .npy) and draw its obstacles on a Surface
+def load_obstacles(path):
+    grid = map_loader.load_map(path, obstacle_color=cfg.MAP_OBSTACLE_COLOR).grid()
+    pixels = np.zeros((grid.shape[1], grid.shape[0], 3), dtype=np.uint8)
+    pixels[grid.T] = collision.OBSTACLE_COLOR
+    return pygame.surfarray.make_surface(pixels)
 
 
 # Define function to create obstacles
@@ -118,41 +73,56 @@ def get_start_end_points():
     return start, end
 
 
-pygame.init()
+def main():
+    global screen
+
+    pygame.init()
+    font = pygame.font.SysFont(cfg.FONT_NAME, cfg.FONT_SIZE, bold=True)
+
+    screen = pygame.display.set_mode((cfg.WIDTH, cfg.HEIGHT))
+    pygame.display.set_caption("Rapidly-exploring Random Tree")
+
+    infoSurface = pygame.Surface((cfg.WIDTH, cfg.HEIGHT))
+    infoSurface.set_colorkey((0, 0, 0))
+    start, goal = get_start_end_points()
+    obstacles = load_obstacles(cfg.MAP_FILE) if cfg.MAP_FILE else create_obstacles()
+    planner_class = RRTConnect if cfg.PLANNER == 'connect' else RRT
+    rrt = planner_class(start, goal, obstacles)
+    startTime = time.perf_counter()
+    path = rrt.find_path()
+    if cfg.SMOOTH_PATH and path is not None and isinstance(rrt.collision_map, collision.CollisionMap):
+        path, report = smoothing.smooth_path(path, rrt.collision_map, spline=cfg.SMOOTH_SPLINE,
+                                             max_curvature=cfg.MAX_CURVATURE)
+        print(f"Smoothing: length {report['length_before']:.2f} -> {report['length_after']:.2f}, "
+              f"waypoints {report['waypoints_before']} -> {report['waypoints_after']}, "
+              f"collision checks {report['collision_checks']}")
+    elapsed = time.perf_counter() - startTime
+    elapsed = format(elapsed, '.4f')
+    temp = font.render(f'Nodes: {len(rrt.nodes)} Time:{elapsed}s', 0, (0, 255, 0), (0, 0, 1))
+
+    running = True
+    while running:
+        screen.blit(infoSurface, (0, 0))
+        infoSurface.blit(temp, (cfg.WIDTH - temp.get_width(), font.get_height()))
 
-screen = pygame.display.set_mode((cfg.WIDTH, cfg.HEIGHT))
-pygame.display.set_caption("Rapidly-exploring Random Tree")
-
-infoSurface = pygame.Surface((cfg.WIDTH, cfg.HEIGHT))
-infoSurface.set_colorkey((0, 0, 0))
-start, goal = get_start_end_points()
-obstacles = create_obstacles()
-rrt = RRT(start, goal, obstacles)
-startTime = time.perf_counter()
-path = rrt.find_path()
-elapsed = time.perf_counter() - startTime
-elapsed = format(elapsed, '.4f')
-temp = cfg.FONT.render(f'Nodes: {len(rrt.nodes)} Time:{elapsed}s', 0, (0, 255, 0), (0, 0, 1))
+        for event in pygame.event.get():
+            if event.type == pygame.QUIT:
+                running = False
 
-running = True
-while running:
-    screen.blit(infoSurface, (0, 0))
-    infoSurface.blit(temp, (cfg.WIDTH - temp.get_width(), cfg.FONT.get_height()))
+            elif event.type == pygame.KEYDOWN:
+                if event.key == pygame.K_TAB:
 
-    for event in pygame.event.get():
-        if event.type == pygame.QUIT:
-            running = False
+                    rrt.draw(screen)
 
-        elif event.type == pygame.KEYDOWN:
-            if event.key == pygame.K_TAB:
+                    if path is not None:
+                        pygame.draw.lines(screen, cfg.BLUE, False, path, 3)
 
-                rrt.draw(screen)
+                    temp = font.render(f'{len(rrt.nodes)}', 0, (255, 255, 0), (0, 0, 1))
 
-                if path is not None:
-                    pygame.draw.lines(screen, cfg.BLUE, False, path, 3)
+                    pygame.display.update()
 
-                temp = cfg.FONT.render(f'{len(rrt.nodes)}', 0, (255, 255, 0), (0, 0, 1))
+    pygame.quit()
 
-                pygame.display.update()
 
-pygame.quit()
+if __name__ == "__main__":
+    main()
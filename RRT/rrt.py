@@ -0,0 +1,132 @@
+import math
+import time
+
+import collision
+import config as cfg
+import smoothing
+import tree_store
+import utils
+
+
+
+# Define Node class
+class Node:
+    def __init__(self, x, y):
+        self.x = x
+        self.y = y
+        self.parent = None
+
+
+# Define RRT class
+class RRT:
+    def __init__(self, start, goal, obstacles, verbose=True, seed=None):
+        # obstacles: CollisionMap, bool array [y, x] or a pygame.Surface with drawn obstacles
+        # seed: int or numpy.random.Generator, samples are drawn from it in blocks
+        self.start = start
+        self.goal = goal
+        self.obstacles = obstacles
+        # Build the occupancy bitmap once; 'surface' keeps the reference per-pixel check
+        self.collision_map = collision.as_collision_map(obstacles, cfg.COLLISION_BACKEND, cfg.ROBOT_RADIUS)
+        if isinstance(self.collision_map, collision.CollisionMap):
+            self.width, self.height = self.collision_map.width, self.collision_map.height
+            # Distance map lets collision checks stop once the rest of a segment is clearly free
+            if cfg.CLEARANCE:
+                self.collision_map.enable_clearance()
+        else:
+            self.width, self.height = cfg.WIDTH, cfg.HEIGHT
+        self.verbose = verbose
+        self.rng = utils.BlockRandom(seed)
+        # 'arrays' keeps the tree in NumPy arrays and finds the nearest node in one vectorized pass
+        if cfg.TREE_STORE == 'arrays':
+            self.nodes = tree_store.TreeStore()
+            self.nodes.add(start.x, start.y)
+        elif cfg.TREE_STORE == 'objects':
+            self.nodes = [start]
+        else:
+            raise ValueError(f"Unknown tree store: {cfg.TREE_STORE}")
+        self.step_size = 20
+        self.final_step = 50
+        self.iterations = 0
+        self.elapsed = 0.0
+
+    def find_nearest(self, target):
+        if isinstance(self.nodes, tree_store.TreeStore):
+            return self.nodes.nearest(target.x, target.y)
+        nearest_node = self.nodes[0]
+        for node in self.nodes:
+            if math.sqrt((target.x - node.x) ** 2 + (target.y - node.y) ** 2) < math.sqrt(
+                    (target.x - nearest_node.x) ** 2 + (target.y - nearest_node.y) ** 2):
+                nearest_node = node
+        return nearest_node
+
+    # Adds the node to the tree and returns the node stored there
+    def add_node(self, node, parent):
+        if isinstance(self.nodes, tree_store.TreeStore):
+            return self.nodes.add(node.x, node.y, parent)
+        node.parent = parent
+        self.nodes.append(node)
+        return node
+
+    def find_path(self):
+        start_time = time.perf_counter()
+        path = None
+        for i in range(10000):
+            self.iterations = i + 1
+            rand_node = Node(self.rng.randint(0, self.width), self.rng.randint(0, self.height))
+            nearest_node = self.find_nearest(rand_node)
+
+            new_node = Node(nearest_node.x + self.step_size * (rand_node.x - nearest_node.x) / math.sqrt(
+                (rand_node.x - nearest_node.x) ** 2 + (rand_node.y - nearest_node.y) ** 2),
+                            nearest_node.y + self.step_size * (rand_node.y - nearest_node.y) / math.sqrt(
+                                (rand_node.x - nearest_node.x) ** 2 + (rand_node.y - nearest_node.y) ** 2))
+            if not collision.collision(nearest_node, new_node, self.collision_map):
+                new_node = self.add_node(new_node, nearest_node)
+                if self.verbose:
+                    print(f"Random node position: ({rand_node.x}, {rand_node.y})")
+                    print(f"Nearest node position: ({nearest_node.x}, {nearest_node.y})")
+                    print(f"New node position: ({new_node.x}, {new_node.y})")
+            else:
+                # The new node was not added, so the goal cannot be reached through it
+                continue
+            final_node = Node(self.goal.x, self.goal.y)
+            if math.sqrt((new_node.x - self.goal.x) ** 2 + (
+                    new_node.y - self.goal.y) ** 2) < self.final_step and not collision.collision(new_node, final_node,
+                                                                                             self.collision_map):
+                    final_node = self.add_node(final_node, new_node)
+                    path = [final_node]
+                    while path[-1].parent is not None:
+                        path.append(path[-1].parent)
+                    path = [(node.x, node.y) for node in path[::-1]]
+                    break
+        self.elapsed = time.perf_counter() - start_time
+        return path
+
+    def stats(self):
+        return {
+            'nodes': len(self.nodes),
+            'iterations': self.iterations,
+            'time': self.elapsed,
+        }
+
+    def draw(self, screen):
+        import pygame
+
+        for node in self.nodes:
+            pygame.draw.circle(screen, cfg.YELLOW, (node.x, node.y), 3)
+            if node.parent is not None:
+                pygame.draw.line(screen, cfg.WHITE, (node.x, node.y), (node.parent.x, node.parent.y), 2)
+        pygame.draw.circle(screen, cfg.RED, (self.start.x, self.start.y), 10)
+        pygame.draw.circle(screen, cfg.GREEN, (self.goal.x, self.goal.y), 10)
+
+
+# Headless planning: grid is a bool array [y, x] (True = obstacle), start/goal are (x, y)
+# With smooth=True the path is shortcut/smoothed and the report is stored in stats['smoothing']
+def plan(grid, start, goal, robot_radius=0, smooth=False, planner_class=None, seed=None):
+    collision_map = collision.CollisionMap(grid, robot_radius)
+    rrt = (planner_class or RRT)(Node(*start), Node(*goal), collision_map, verbose=False, seed=seed)
+    path = rrt.find_path()
+    stats = rrt.stats()
+    if smooth and path is not None:
+        path, stats['smoothing'] = smoothing.smooth_path(path, collision_map, spline=cfg.SMOOTH_SPLINE,
+                                                         max_curvature=cfg.MAX_CURVATURE, seed=seed)
+    return path, stats
@@ -0,0 +1,91 @@
+import math
+import time
+
+import collision
+import rrt
+from rrt import Node, RRT
+
+
+# Bidirectional RRT-Connect: grows one tree from start and one from goal
+# and greedily connects them. Returns the same path format as RRT.find_path.
+class RRTConnect(RRT):
+    def __init__(self, start, goal, obstacles, verbose=True, seed=None):
+        super().__init__(start, goal, obstacles, verbose, seed)
+        self.start_tree = [start]
+        self.goal_tree = [goal]
+        self.nodes = [start, goal]
+        self.max_iterations = 10000
+
+    def nearest(self, tree, target):
+        nearest_node = tree[0]
+        min_dist = math.hypot(target.x - nearest_node.x, target.y - nearest_node.y)
+        for node in tree:
+            dist = math.hypot(target.x - node.x, target.y - node.y)
+            if dist < min_dist:
+                min_dist = dist
+                nearest_node = node
+        return nearest_node, min_dist
+
+    # Make one step from the tree towards target.
+    # Returns the new node (None if blocked) and whether target was reached.
+    def extend(self, tree, target):
+        nearest_node, dist = self.nearest(tree, target)
+        if dist <= self.step_size:
+            new_node = Node(target.x, target.y)
+            reached = True
+        else:
+            ratio = self.step_size / dist
+            new_node = Node(nearest_node.x + ratio * (target.x - nearest_node.x),
+                            nearest_node.y + ratio * (target.y - nearest_node.y))
+            reached = False
+        if collision.collision(nearest_node, new_node, self.collision_map):
+            return None, False
+        new_node.parent = nearest_node
+        tree.append(new_node)
+        self.nodes.append(new_node)
+        return new_node, reached
+
+    # Keep extending the tree towards target until it is reached or blocked
+    def connect(self, tree, target):
+        while True:
+            new_node, reached = self.extend(tree, target)
+            if new_node is None:
+                return None
+            if reached:
+                return new_node
+
+    def branch(self, node):
+        points = []
+        while node is not None:
+            points.append((node.x, node.y))
+            node = node.parent
+        return points
+
+    def find_path(self):
+        start_time = time.perf_counter()
+        path = None
+        tree_a, tree_b = self.start_tree, self.goal_tree
+        for i in range(self.max_iterations):
+            self.iterations = i + 1
+            rand_node = Node(self.rng.randint(0, self.width), self.rng.randint(0, self.height))
+            new_node, _ = self.extend(tree_a, rand_node)
+            if new_node is not None:
+                meeting_node = self.connect(tree_b, new_node)
+                if meeting_node is not None:
+                    if tree_a is self.start_tree:
+                        start_side, goal_side = new_node, meeting_node
+                    else:
+                        start_side, goal_side = meeting_node, new_node
+                    # Both sides end at the same point, keep it once
+                    path = self.branch(start_side)[::-1] + self.branch(goal_side)[1:]
+                    if self.verbose:
+                        print(f"Trees connected after {self.iterations} iterations, nodes: {len(self.nodes)}")
+                    break
+            tree_a, tree_b = tree_b, tree_a
+        self.elapsed = time.perf_counter() - start_time
+        return path
+
+
+# Headless planning with RRT-Connect, same interface as rrt.plan
+def plan(grid, start, goal, robot_radius=0, smooth=False, seed=None):
+    return rrt.plan(grid, start, goal, robot_radius, smooth, planner_class=RRTConnect, seed=seed)
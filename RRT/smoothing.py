@@ -0,0 +1,148 @@
+import math
+
+import numpy as np
+
+
+def path_length(path):
+    """Длина ломаной из точек (x, y)"""
+    return sum(math.dist(a, b) for a, b in zip(path, path[1:]))
+
+
+class Smoother:
+    """Постобработка пути: сокращение (shortcutting) и сглаживание сплайном.
+
+    collision_map - CollisionMap, по которой проверяются все новые отрезки.
+    Счётчик collision_checks показывает, сколько проверок потребовалось.
+    seed - зерно или numpy.random.Generator для случайных сокращений.
+    """
+
+    def __init__(self, collision_map, seed=None):
+        self.collision_map = collision_map
+        self.rng = np.random.default_rng(seed)
+        self.collision_checks = 0
+
+    def segment_free(self, a, b):
+        self.collision_checks += 1
+        return not self.collision_map.segment_collides(a[0], a[1], b[0], b[1])
+
+    def greedy_shortcut(self, path):
+        """Из каждой точки соединяется с самой дальней видимой точкой пути"""
+        result = [path[0]]
+        i = 0
+        while i < len(path) - 1:
+            j = len(path) - 1
+            while j > i + 1 and not self.segment_free(path[i], path[j]):
+                j -= 1
+            result.append(path[j])
+            i = j
+        return result
+
+    def random_shortcut(self, path, iterations):
+        """Случайные сокращения между точками на произвольных отрезках пути"""
+        path = list(path)
+        for _ in range(iterations):
+            if len(path) < 3:
+                break
+            i, j = sorted(self.rng.choice(len(path) - 1, 2, replace=False).tolist())
+            if j - i < 1:
+                continue
+            t_i, t_j = self.rng.random(2).tolist()
+            a = interpolate(path[i], path[i + 1], t_i)
+            b = interpolate(path[j], path[j + 1], t_j)
+            # Сокращение имеет смысл, только если оно короче заменяемого участка
+            old_length = math.dist(a, path[i + 1]) + path_length(path[i + 1:j + 1]) + math.dist(path[j], b)
+            if math.dist(a, b) < old_length - 1e-9 and self.segment_free(a, b):
+                path = path[:i + 1] + [a, b] + path[j + 1:]
+        return remove_duplicates(path)
+
+    def spline(self, path, samples_per_segment=8, max_curvature=None):
+        """Сглаживание сплайном Катмулла-Рома через точки пути.
+
+        Участок сплайна между двумя соседними точками принимается, только если он
+        не пересекает препятствия и его кривизна не больше max_curvature (1/пиксель);
+        иначе участок остаётся прямым. Возвращает путь и число отклонённых участков.
+        """
+        if len(path) < 3:
+            return list(path), 0
+        padded = [path[0]] + list(path) + [path[-1]]
+        result = [path[0]]
+        rejected = 0
+        for k in range(1, len(padded) - 2):
+            p0, p1, p2, p3 = padded[k - 1], padded[k], padded[k + 1], padded[k + 2]
+            points = [catmull_rom(p0, p1, p2, p3, s / samples_per_segment) for s in range(1, samples_per_segment)]
+            points.append(p2)
+            candidate = [p1] + points
+            ok = all(self.segment_free(a, b) for a, b in zip(candidate, candidate[1:]))
+            if ok and max_curvature is not None:
+                window = result[-1:] + points
+                ok = all(curvature(a, b, c) <= max_curvature for a, b, c in zip(window, window[1:], window[2:]))
+            if ok:
+                result.extend(points)
+            else:
+                rejected += 1
+                result.append(p2)
+        return result, rejected
+
+
+def smooth_path(path, collision_map, shortcut_iterations=100, spline=False,
+                samples_per_segment=8, max_curvature=None, seed=None):
+    """Сокращает путь и при необходимости сглаживает его сплайном.
+
+    Возвращает новый путь и отчёт: длина и число точек до и после,
+    число проверок столкновений и отклонённых участков сплайна.
+    """
+    report = {
+        'length_before': path_length(path) if path else 0.0,
+        'waypoints_before': len(path) if path else 0,
+    }
+    if not path or len(path) < 3:
+        report.update(length_after=report['length_before'], waypoints_after=report['waypoints_before'],
+                      collision_checks=0, spline_rejected=0)
+        return path, report
+
+    smoother = Smoother(collision_map, seed)
+    result = smoother.greedy_shortcut(path)
+    result = smoother.random_shortcut(result, shortcut_iterations)
+    result = smoother.greedy_shortcut(result)
+    rejected = 0
+    if spline:
+        result, rejected = smoother.spline(result, samples_per_segment, max_curvature)
+
+    report.update(
+        length_after=path_length(result),
+        waypoints_after=len(result),
+        collision_checks=smoother.collision_checks,
+        spline_rejected=rejected,
+    )
+    return result, report
+
+
+def interpolate(a, b, t):
+    return (a[0] + t * (b[0] - a[0]), a[1] + t * (b[1] - a[1]))
+
+
+def remove_duplicates(path):
+    result = [path[0]]
+    for point in path[1:]:
+        if math.dist(point, result[-1]) > 1e-9:
+            result.append(point)
+    return result
+
+
+def catmull_rom(p0, p1, p2, p3, t):
+    """Точка однородного сплайна Катмулла-Рома на участке p1-p2"""
+    t2, t3 = t * t, t * t * t
+    return tuple(
+        0.5 * (2 * p1[k] + (p2[k] - p0[k]) * t + (2 * p0[k] - 5 * p1[k] + 4 * p2[k] - p3[k]) * t2
+               + (3 * p1[k] - p0[k] - 3 * p2[k] + p3[k]) * t3)
+        for k in range(2)
+    )
+
+
+def curvature(a, b, c):
+    """Кривизна окружности через три точки (кривизна Менгера)"""
+    ab, bc, ca = math.dist(a, b), math.dist(b, c), math.dist(c, a)
+    if ab * bc * ca < 1e-12:
+        return 0.0
+    area2 = abs((b[0] - a[0]) * (c[1] - a[1]) - (b[1] - a[1]) * (c[0] - a[0]))
+    return 2 * area2 / (ab * bc * ca)
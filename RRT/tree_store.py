@@ -0,0 +1,164 @@
+import numpy as np
+
+
+class TreeStore:
+    """Дерево в виде структуры массивов NumPy (struct-of-arrays).
+
+    Координаты, стоимости и индексы родителей хранятся в заранее выделенных
+    массивах, которые удваиваются при заполнении. Дочерние узлы связаны
+    списками first_child/next_sibling, поэтому узел занимает десятки байт
+    вместо сотен у объекта Node, а поиск ближайших узлов - одна операция NumPy.
+
+    Узлы снаружи видны как NodeView с теми же полями, что у Node. Методы
+    insert, remove, nearest и near совпадают с пространственными индексами
+    из spatial_index, так что хранилище может служить индексом само для себя.
+    """
+
+    def __init__(self, capacity=1024):
+        self.x = np.empty(capacity)
+        self.y = np.empty(capacity)
+        self.cost = np.zeros(capacity)
+        self.parent = np.full(capacity, -1, dtype=np.int32)
+        self.first_child = np.full(capacity, -1, dtype=np.int32)
+        self.next_sibling = np.full(capacity, -1, dtype=np.int32)
+        self.alive = np.zeros(capacity, dtype=bool)
+        self.size = 0  # Занятая часть массивов
+        self.count = 0  # Количество неудалённых узлов
+
+    def __len__(self):
+        return self.count
+
+    def __iter__(self):
+        for index in np.flatnonzero(self.alive[:self.size]):
+            yield NodeView(self, int(index))
+
+    def grow(self):
+        """Удваивает ёмкость всех массивов"""
+        capacity = 2 * len(self.x)
+        for name, fill in (('x', 0.0), ('y', 0.0), ('cost', 0.0), ('parent', -1),
+                           ('first_child', -1), ('next_sibling', -1), ('alive', False)):
+            old = getattr(self, name)
+            new = np.full(capacity, fill, dtype=old.dtype)
+            new[:self.size] = old[:self.size]
+            setattr(self, name, new)
+
+    def add(self, x, y, parent=None, cost=0.0):
+        """Добавляет узел и возвращает его представление NodeView"""
+        if self.size == len(self.x):
+            self.grow()
+        index = self.size
+        self.x[index] = x
+        self.y[index] = y
+        self.cost[index] = cost
+        self.alive[index] = True
+        self.size += 1
+        self.count += 1
+        node = NodeView(self, index)
+        if parent is not None:
+            node.parent = parent
+            parent.add_child(node)
+        return node
+
+    def view(self, index):
+        return NodeView(self, int(index)) if index >= 0 else None
+
+    def nbytes(self):
+        """Память, занятая массивами хранилища, в байтах"""
+        return sum(a.nbytes for a in (self.x, self.y, self.cost, self.parent,
+                                      self.first_child, self.next_sibling, self.alive))
+
+    def insert(self, node):
+        """Узел уже лежит в массивах после add, отдельная вставка не нужна"""
+
+    def remove(self, node):
+        if self.alive[node.index]:
+            self.alive[node.index] = False
+            self.count -= 1
+
+    def squared_distances(self, x, y):
+        dx = self.x[:self.size] - x
+        dy = self.y[:self.size] - y
+        dist2 = dx * dx + dy * dy
+        if self.count < self.size:
+            dist2[~self.alive[:self.size]] = np.inf
+        return dist2
+
+    def nearest(self, x, y):
+        """Ближайший к точке (x, y) узел одной векторной операцией"""
+        if self.count == 0:
+            return None
+        return NodeView(self, int(np.argmin(self.squared_distances(x, y))))
+
+    def near(self, x, y, radius):
+        """Все узлы на расстоянии не больше radius от точки (x, y)"""
+        indices = np.flatnonzero(self.squared_distances(x, y) <= radius * radius)
+        return [NodeView(self, int(index)) for index in indices]
+
+
+class NodeView:
+    """Узел TreeStore с интерфейсом Node: x, y, parent, cost, children"""
+
+    __slots__ = ('store', 'index')
+
+    def __init__(self, store, index):
+        self.store = store
+        self.index = index
+
+    def __eq__(self, other):
+        return isinstance(other, NodeView) and other.store is self.store and other.index == self.index
+
+    def __hash__(self):
+        return hash((id(self.store), self.index))
+
+    @property
+    def x(self):
+        return float(self.store.x[self.index])
+
+    @property
+    def y(self):
+        return float(self.store.y[self.index])
+
+    @property
+    def cost(self):
+        return float(self.store.cost[self.index])
+
+    @cost.setter
+    def cost(self, value):
+        self.store.cost[self.index] = value
+
+    @property
+    def parent(self):
+        return self.store.view(self.store.parent[self.index])
+
+    @parent.setter
+    def parent(self, node):
+        self.store.parent[self.index] = -1 if node is None else node.index
+
+    @property
+    def children(self):
+        result = []
+        child = self.store.first_child[self.index]
+        while child >= 0:
+            result.append(NodeView(self.store, int(child)))
+            child = self.store.next_sibling[child]
+        return result
+
+    def add_child(self, node):
+        store = self.store
+        store.next_sibling[node.index] = store.first_child[self.index]
+        store.first_child[self.index] = node.index
+
+    def remove_child(self, node):
+        store = self.store
+        previous = -1
+        child = store.first_child[self.index]
+        while child >= 0 and child != node.index:
+            previous = child
+            child = store.next_sibling[child]
+        if child < 0:
+            return
+        if previous < 0:
+            store.first_child[self.index] = store.next_sibling[child]
+        else:
+            store.next_sibling[previous] = store.next_sibling[child]
+        store.next_sibling[child] = -1
@@ -1,5 +1,7 @@
 import math
 
+import numpy as np
+
 
 def normalize(vx, vy):
     norm = math.sqrt(vx * vx + vy * vy)
@@ -13,3 +15,25 @@ def dist(p1, p2):
     return math.hypot(p2.x - p1[0], p2.y - p1[1])
 
 
+# Random numbers from a numpy.random.Generator handed out in blocks, so the
+# generator is called once per `block` values instead of once per iteration.
+# seed may be an int, a SeedSequence or a Generator; random() and randint(a, b)
+# behave like the random.Random methods.
+class BlockRandom:
+    def __init__(self, seed=None, block=1024):
+        self.generator = np.random.default_rng(seed)
+        self.block = block
+        self.values = []
+        self.position = 0
+
+    def random(self):
+        if self.position == len(self.values):
+            self.values = self.generator.random(self.block).tolist()
+            self.position = 0
+        value = self.values[self.position]
+        self.position += 1
+        return value
+
+    # Integer from [a, b], both ends included
+    def randint(self, a, b):
+        return a + min(int(self.random() * (b - a + 1)), b - a)
@@ -0,0 +1,98 @@
+"""Замер стоимости поиска соседей в зависимости от размера дерева.
+
+Дерево растёт так же, как в RRT*: случайная точка, ближайший узел,
+шаг длиной STEP_SIZE. На контрольных размерах замеряется среднее время
+find_nearest и find_near_nodes (с динамическим радиусом RRT*).
+Вариант 'arrays' - хранилище TreeStore с векторным поиском по массивам NumPy.
+
+Запуск:
+    python RRTstar/benchmark_index.py
+"""
+import math
+import random
+import time
+
+import config as cfg
+import spatial_index
+import tree_store
+import utils
+
+CHECKPOINTS = [1000, 2000, 5000, 10000, 20000, 50000, 100000]
+BRUTE_FORCE_LIMIT = 10000  # Полный перебор дальше слишком медленный
+QUERIES = 200  # Количество запросов на каждой контрольной точке
+STEP_SIZE = 20
+SEED = 0
+
+
+class Point:
+    def __init__(self, x, y):
+        self.x = x
+        self.y = y
+
+
+def grow(index, rng, count):
+    """Добавляет в индекс count узлов по схеме RRT"""
+    for _ in range(count):
+        sample = Point(rng.uniform(0, cfg.WIDTH), rng.uniform(0, cfg.HEIGHT))
+        nearest = index.nearest(sample.x, sample.y)
+        dist = math.hypot(sample.x - nearest.x, sample.y - nearest.y)
+        if dist > STEP_SIZE:
+            ratio = STEP_SIZE / dist
+            sample = Point(nearest.x + ratio * (sample.x - nearest.x),
+                           nearest.y + ratio * (sample.y - nearest.y))
+        add(index, sample)
+
+
+def add(index, point):
+    if isinstance(index, tree_store.TreeStore):
+        index.add(point.x, point.y)
+    else:
+        index.insert(point)
+
+
+def measure(index, rng):
+    """Среднее время (мкс) запросов nearest и near и среднее число соседей"""
+    radius = utils.dynamic_radius(len(index), cfg.RADIUS, cfg.WIDTH, cfg.HEIGHT)
+    queries = [(rng.uniform(0, cfg.WIDTH), rng.uniform(0, cfg.HEIGHT)) for _ in range(QUERIES)]
+
+    start = time.perf_counter()
+    for x, y in queries:
+        index.nearest(x, y)
+    nearest_time = (time.perf_counter() - start) / QUERIES * 1e6
+
+    found = 0
+    start = time.perf_counter()
+    for x, y in queries:
+        found += len(index.near(x, y, radius))
+    near_time = (time.perf_counter() - start) / QUERIES * 1e6
+
+    return nearest_time, near_time, found / QUERIES, radius
+
+
+def run(kind, limit):
+    rng = random.Random(SEED)
+    index = tree_store.TreeStore() if kind == 'arrays' else spatial_index.create_index(kind)
+    add(index, Point(cfg.WIDTH / 2, cfg.HEIGHT / 2))
+    print(f"\nИндекс: {kind}")
+    print(f"{'узлов':>8} {'nearest, мкс':>13} {'near, мкс':>10} {'соседей':>8} {'радиус':>7} {'мкс/сосед':>10}")
+    for checkpoint in CHECKPOINTS:
+        if checkpoint > limit:
+            break
+        grow(index, rng, checkpoint - len(index))
+        nearest_time, near_time, neighbours, radius = measure(index, rng)
+        per_neighbour = near_time / max(neighbours, 1)
+        print(f"{len(index):>8} {nearest_time:>13.1f} {near_time:>10.1f} {neighbours:>8.1f} {radius:>7.1f} {per_neighbour:>10.2f}")
+    if kind == 'arrays':
+        print(f"Память массивов: {index.nbytes() / len(index):.1f} байт на узел")
+
+
+def main():
+    # Радиус RRT* ограничен снизу (cfg.RADIUS / 2), поэтому на плотном дереве
+    # число соседей растёт линейно; для near важна стоимость на одного соседа
+    run('kdtree', CHECKPOINTS[-1])
+    run('arrays', CHECKPOINTS[-1])
+    run('brute', BRUTE_FORCE_LIMIT)
+
+
+if __name__ == "__main__":
+    main()
@@ -1,6 +1,3 @@
-from pygame import font
-
-
 BLACK = (0, 0, 0)
 WHITE = (255, 255, 255)
 RED = (255, 0, 0)
@@ -11,11 +8,26 @@ PURPLE = (128, 0, 128)  # Добавлен фиолетовый цвет для
 
 WIDTH = 800
 HEIGHT = 600
-font.init()
-FONT = font.SysFont('Tahoma', 25, bold = True)
+FONT_NAME = 'Tahoma'
+FONT_SIZE = 25
 
 # Параметры алгоритма RRT*
 RADIUS = 100  # Увеличенный радиус поиска соседей для rewiring (было 50)
 MAX_ITERATIONS = 10000  # Увеличенное максимальное количество итераций (было 10000)
 MIN_ITERATIONS_AFTER_SOLUTION = 2000  # Продолжать поиск после нахождения первого решения
-GOAL_SAMPLE_RATE = 0.1  # Вероятность выбора цели в качестве случайного узла 
\ No newline at end of file
+GOAL_SAMPLE_RATE = 0.1  # Вероятность выбора цели в качестве случайного узла
+TREE_STORE = 'objects'  # Хранение дерева: 'objects' (объекты Node) или 'arrays' (массивы NumPy, векторный поиск соседей)
+SPATIAL_INDEX = 'kdtree'  # Индекс ближайших соседей: 'kdtree' или 'brute' (полный перебор для проверки), при TREE_STORE = 'objects'
+CHECK_COSTS = False  # Сверять закешированные стоимости узлов с пересчётом до корня на каждой итерации
+LAZY_COLLISION = False  # Ленивые проверки столкновений: родитель по возрастанию стоимости, rewiring только при улучшении
+COLLISION_BACKEND = 'bitmap'  # Проверка столкновений: 'bitmap' (карта занятости) или 'surface' (эталон по пикселям)
+ROBOT_RADIUS = 0  # Радиус робота для расширения препятствий на карте занятости
+CLEARANCE = True  # Карта расстояний до препятствий: проверка отрезка заканчивается, как только остаток заведомо свободен
+CLEARANCE_WEIGHT = 0.0  # Штраф стоимости рёбер у препятствий (0 - чистая длина пути)
+CLEARANCE_DISTANCE = 20  # Расстояние до препятствия (пиксели), с которого штраф не начисляется
+INFORMED_SAMPLING = False  # Informed RRT*: после первого решения выборка из эллипса лучшей стоимости и отсечение узлов
+SMOOTH_PATH = False  # Сокращать и сглаживать найденный путь перед отображением
+SMOOTH_SPLINE = False  # Дополнительно сглаживать сокращённый путь сплайном Катмулла-Рома (добавляет точки)
+MAX_CURVATURE = 0.1  # Максимальная кривизна сплайна (1/пиксель), None - без ограничения
+MAP_FILE = None  # Файл карты (PNG, PGM, ROS yaml, .npy) вместо рисования препятствий мышью
+MAP_OBSTACLE_COLOR = (0, 255, 255)  # Цвет препятствий в PNG; None - занятость по яркости, как в ROS
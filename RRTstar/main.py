@@ -1,4 +1,218 @@
-from rrtstar import main
+import os
+import sys
+import time
+
+import numpy as np
+import pygame
+
+import collision
+import config as cfg
+import smoothing
+from rrtstar import Node, RRTStar
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), '..', 'maps'))
+import map_loader
+
+
+# Определение функций для создания препятствий и получения начальной и конечной точек
+def create_obstacles():
+    """Создает препятствия, позволяя пользователю рисовать их мышью"""
+    done = False
+    flStartDraw = False
+    while not done:
+        for event in pygame.event.get():
+            if event.type == pygame.KEYDOWN and event.key == pygame.K_SPACE:
+                done = True
+            if event.type == pygame.MOUSEBUTTONDOWN and event.button == 1:
+                flStartDraw = True
+            elif event.type == pygame.MOUSEMOTION:
+                if flStartDraw:
+                    pos = event.pos
+                    pygame.draw.circle(screen, (0, 255, 255), pos, 10)
+                    pygame.display.update()
+            elif event.type == pygame.MOUSEBUTTONUP and event.button == 1:
+                flStartDraw = False
+    pygame.image.save(screen, 'map.png')
+    obstaclesSurface = pygame.image.load('map.png')
+    return obstaclesSurface
+
+
+def load_obstacles(path):
+    """Загружает карту из файла (PNG, PGM, ROS yaml, .npy) и рисует её препятствия на Surface"""
+    grid = map_loader.load_map(path, obstacle_color=cfg.MAP_OBSTACLE_COLOR).grid()
+    pixels = np.zeros((grid.shape[1], grid.shape[0], 3), dtype=np.uint8)
+    pixels[grid.T] = collision.OBSTACLE_COLOR
+    return pygame.surfarray.make_surface(pixels)
+
+
+def get_start_end_points():
+    """Получает от пользователя начальную и конечную точки"""
+    screen.fill(cfg.BLACK)
+    start = None
+    end = None
+    selecting_start = True
+    selecting_end = False
+    while selecting_start or selecting_end:
+        for event in pygame.event.get():
+            if event.type == pygame.QUIT:
+                pygame.quit()
+            elif event.type == pygame.MOUSEBUTTONDOWN:
+                pos = pygame.mouse.get_pos()
+                if selecting_start:
+                    start = Node(*pos)
+                    pygame.draw.circle(screen, cfg.RED, pos, 10)
+                    pygame.display.update()
+                    selecting_start = False
+                    selecting_end = True
+                elif selecting_end:
+                    end = Node(*pos)
+                    pygame.draw.circle(screen, cfg.GREEN, pos, 10)
+                    selecting_end = False
+
+        pygame.display.update()
+    return start, end
+
+
+def smooth_if_enabled(rrtstar, path):
+    """Сокращает и сглаживает путь, если это включено в конфигурации"""
+    if not cfg.SMOOTH_PATH or path is None or not isinstance(rrtstar.collision_map, collision.CollisionMap):
+        return path
+    path, report = smoothing.smooth_path(path, rrtstar.collision_map, spline=cfg.SMOOTH_SPLINE,
+                                         max_curvature=cfg.MAX_CURVATURE)
+    print(f"Сглаживание: длина {report['length_before']:.2f} -> {report['length_after']:.2f}, "
+          f"точек {report['waypoints_before']} -> {report['waypoints_after']}, "
+          f"проверок столкновений {report['collision_checks']}")
+    return path
+
+
+def main():
+    """Основная функция для запуска алгоритма RRT*"""
+    global screen
+    
+    pygame.init()
+    font = pygame.font.SysFont(cfg.FONT_NAME, cfg.FONT_SIZE, bold=True)
+    screen = pygame.display.set_mode((cfg.WIDTH, cfg.HEIGHT))
+    pygame.display.set_caption("RRT* Algorithm (Optimized RRT)")
+    
+    infoSurface = pygame.Surface((cfg.WIDTH, cfg.HEIGHT))
+    infoSurface.set_colorkey((0, 0, 0))
+    
+    # Получаем начальную и конечную точки
+    start, goal = get_start_end_points()
+    
+    # Создаем препятствия или загружаем карту из файла
+    obstacles = load_obstacles(cfg.MAP_FILE) if cfg.MAP_FILE else create_obstacles()
+    
+    # Создаем экземпляр RRT*
+    rrtstar = RRTStar(start, goal, obstacles)
+    
+    # Запускаем поиск пути и замеряем время
+    startTime = time.perf_counter()
+    path = smooth_if_enabled(rrtstar, rrtstar.find_path())
+    elapsed = time.perf_counter() - startTime
+    elapsed = format(elapsed, '.4f')
+    
+    # Отображаем информацию о найденном пути
+    info_text = f'Nodes: {len(rrtstar.nodes)} Time: {elapsed}s'
+    if rrtstar.path_found:
+        info_text += f' Path cost: {format(rrtstar.best_cost, ".2f")}'
+    temp = font.render(info_text, 0, (0, 255, 0), (0, 0, 1))
+    
+    # Основной цикл отображения
+    running = True
+    show_tree = False
+    show_detailed_info = False
+    
+    while running:
+        screen.blit(infoSurface, (0, 0))
+        infoSurface.blit(temp, (cfg.WIDTH - temp.get_width(), font.get_height()))
+        
+        for event in pygame.event.get():
+            if event.type == pygame.QUIT:
+                running = False
+            elif event.type == pygame.KEYDOWN:
+                if event.key == pygame.K_ESCAPE:
+                    running = False
+                elif event.key == pygame.K_TAB:
+                    show_tree = not show_tree
+                elif event.key == pygame.K_i:
+                    # Переключаем отображение подробной информации
+                    show_detailed_info = not show_detailed_info
+                elif event.key == pygame.K_r:
+                    # Перезапуск с новыми препятствиями
+                    screen.fill(cfg.BLACK)
+                    start, goal = get_start_end_points()
+                    obstacles = load_obstacles(cfg.MAP_FILE) if cfg.MAP_FILE else create_obstacles()
+                    rrtstar = RRTStar(start, goal, obstacles)
+                    startTime = time.perf_counter()
+                    path = smooth_if_enabled(rrtstar, rrtstar.find_path())
+                    elapsed = time.perf_counter() - startTime
+                    elapsed = format(elapsed, '.4f')
+                    info_text = f'Nodes: {len(rrtstar.nodes)} Time: {elapsed}s'
+                    if rrtstar.path_found:
+                        info_text += f' Path cost: {format(rrtstar.best_cost, ".2f")}'
+                    temp = font.render(info_text, 0, (0, 255, 0), (0, 0, 1))
+                elif event.key in (pygame.K_m, pygame.K_o) and isinstance(rrtstar.collision_map, collision.CollisionMap):
+                    # Перепланирование с переиспользованием дерева:
+                    # M - робот проходит до следующей точки пути, O - дорисовать препятствия
+                    startTime = time.perf_counter()
+                    if event.key == pygame.K_m and path and len(path) > 1:
+                        start = Node(*path[1])
+                        path = rrtstar.replan(position=path[1])
+                    elif event.key == pygame.K_o:
+                        screen.fill(cfg.BLACK)
+                        screen.blit(obstacles, (0, 0))
+                        obstacles = create_obstacles()
+                        path = rrtstar.replan(obstacles=obstacles)
+                    path = smooth_if_enabled(rrtstar, path)
+                    elapsed = format(time.perf_counter() - startTime, '.4f')
+                    info_text = f'Nodes: {len(rrtstar.nodes)} Replan: {elapsed}s'
+                    if rrtstar.path_found:
+                        info_text += f' Path cost: {format(rrtstar.best_cost, ".2f")}'
+                    temp = font.render(info_text, 0, (0, 255, 0), (0, 0, 1))
+        
+        # Отображаем обнаруженные препятствия
+        screen.blit(obstacles, (0, 0))
+        
+        # Если нажата клавиша TAB, показываем дерево
+        if show_tree:
+            rrtstar.draw(screen)
+        else:
+            # Иначе только начальную и конечную точки и найденный путь
+            pygame.draw.circle(screen, cfg.RED, (int(start.x), int(start.y)), 10)
+            pygame.draw.circle(screen, cfg.GREEN, (int(goal.x), int(goal.y)), 10)
+            
+            if path:
+                # Оптимизированная отрисовка пути - более толстые линии для лучшей видимости
+                pygame.draw.lines(screen, cfg.PURPLE, False, path, 4)
+                
+                # Добавляем маркеры в каждой точке пути
+                for point in path:
+                    pygame.draw.circle(screen, cfg.PURPLE, (int(point[0]), int(point[1])), 3)
+        
+        # Отображаем подробную информацию, если включено
+        if show_detailed_info and rrtstar.path_found:
+            info_lines = [
+                f"Всего узлов: {len(rrtstar.nodes)}",
+                f"Длина пути: {len(path)} точек",
+                f"Стоимость пути: {rrtstar.best_cost:.2f}",
+                f"Первое решение на итерации: {rrtstar.solution_iter}",
+                f"Улучшение: {(1 - rrtstar.best_cost / (rrtstar.solution_iter * 0.01)):.2f}%",
+                f"Нажмите TAB для просмотра дерева",
+                f"Нажмите R для перезапуска",
+                f"M - шаг робота по пути, O - новые препятствия"
+            ]
+            
+            y_offset = 50
+            for line in info_lines:
+                info_surf = font.render(line, 0, (255, 255, 0), (0, 0, 128))
+                screen.blit(info_surf, (20, y_offset))
+                y_offset += 30
+        
+        pygame.display.update()
+    
+    pygame.quit()
+
 
 if __name__ == "__main__":
-    main() 
\ No newline at end of file
+    main()
@@ -0,0 +1,89 @@
+"""Параллельный запуск нескольких независимых RRT* с выбором лучшего пути.
+
+Карта занятости и карта расстояний до препятствий один раз копируются
+в разделяемую память, каждый процесс подключается к ним без копирования. Зерна процессов выводятся из общего
+seed через numpy.random.SeedSequence, поэтому результат воспроизводим.
+"""
+import os
+import time
+from concurrent.futures import ProcessPoolExecutor
+from multiprocessing import shared_memory
+
+import numpy as np
+
+import collision
+import config as cfg
+from rrtstar import Node, RRTStar
+
+
+def worker_seeds(seed, count):
+    """Детерминированные независимые зерна для count процессов"""
+    return [int(child.generate_state(1)[0]) for child in np.random.SeedSequence(seed).spawn(count)]
+
+
+def _clearance_offset(shape):
+    """Смещение карты расстояний (float32) в разделяемой памяти: сразу за картой занятости, с выравниванием"""
+    return -(-shape[0] * shape[1] // 8) * 8
+
+
+def _run_worker(shm_name, shape, shared_clearance, start, goal, seed):
+    """Один запуск RRT* в дочернем процессе на карте из разделяемой памяти"""
+    shm = shared_memory.SharedMemory(name=shm_name)
+    try:
+        grid = np.ndarray(shape, dtype=bool, buffer=shm.buf)
+        collision_map = collision.CollisionMap(grid)
+        clearance = None
+        if shared_clearance:
+            clearance = np.ndarray(shape, dtype=np.float32, buffer=shm.buf, offset=_clearance_offset(shape))
+            collision_map.enable_clearance(clearance)
+        rrtstar = RRTStar(Node(*start), Node(*goal), collision_map, verbose=False, seed=seed)
+        path = rrtstar.find_path()
+        stats = rrtstar.stats()
+        stats['seed'] = seed
+        stats['pid'] = os.getpid()
+        # Все ссылки на буфер нужно отпустить до закрытия разделяемой памяти
+        del rrtstar, collision_map, grid, clearance
+        return path, stats
+    finally:
+        shm.close()
+
+
+def run_parallel(grid, start, goal, workers=None, seed=0, robot_radius=0):
+    """Запускает workers независимых RRT* и возвращает лучший по стоимости путь.
+
+    grid - булев массив [y, x] (True - препятствие), start и goal - точки (x, y).
+    Возвращает словарь с ключами path, cost, seed, time и workers (статистика каждого запуска).
+    """
+    workers = workers or os.cpu_count() or 1
+    # Расширяем препятствия и строим карту расстояний один раз здесь, а не в каждом процессе
+    collision_map = collision.CollisionMap(grid, robot_radius)
+    grid = collision_map.grid
+    clearance = collision_map.enable_clearance() if cfg.CLEARANCE else None
+    size = grid.nbytes if clearance is None else _clearance_offset(grid.shape) + clearance.nbytes
+
+    shm = shared_memory.SharedMemory(create=True, size=max(size, 1))
+    start_time = time.perf_counter()
+    try:
+        np.ndarray(grid.shape, dtype=bool, buffer=shm.buf)[:] = grid
+        if clearance is not None:
+            np.ndarray(grid.shape, dtype=np.float32, buffer=shm.buf, offset=_clearance_offset(grid.shape))[:] = clearance
+        with ProcessPoolExecutor(max_workers=workers) as executor:
+            futures = [executor.submit(_run_worker, shm.name, grid.shape, clearance is not None, start, goal, s)
+                       for s in worker_seeds(seed, workers)]
+            results = [future.result() for future in futures]
+    finally:
+        shm.close()
+        shm.unlink()
+
+    best_path, best_stats = None, None
+    for path, stats in results:
+        if path is not None and (best_stats is None or stats['cost'] < best_stats['cost']):
+            best_path, best_stats = path, stats
+
+    return {
+        'path': best_path,
+        'cost': best_stats['cost'] if best_stats else None,
+        'seed': best_stats['seed'] if best_stats else None,
+        'time': time.perf_counter() - start_time,
+        'workers': [stats for _, stats in results],
+    }
@@ -1,10 +1,13 @@
-import pygame
-import random
 import math
 import time
 
+import numpy as np
+
 import collision
 import config as cfg
+import smoothing
+import spatial_index
+import tree_store
 import utils
 
 # Определение класса узла
@@ -14,41 +17,78 @@ class Node:
         self.y = y
         self.parent = None
         self.cost = 0  # Стоимость пути от начала до этого узла
+        self.children = []  # Дочерние узлы, чтобы распространять изменение стоимости
+
+    def add_child(self, node):
+        self.children.append(node)
+
+    def remove_child(self, node):
+        self.children.remove(node)
 
 # Определение класса RRT*
 class RRTStar:
-    def __init__(self, start, goal, obstacles):
+    def __init__(self, start, goal, obstacles, verbose=True, seed=None):
+        """obstacles - CollisionMap, булев массив [y, x] или pygame.Surface с нарисованными препятствиями.
+
+        seed - зерно или numpy.random.Generator; случайные числа берутся из него блоками,
+        поэтому запуски воспроизводимы, а параллельные процессы получают независимые потоки.
+        """
         self.start = start
         self.goal = goal
         self.obstacles = obstacles
-        self.nodes = [start]
+        # Карта занятости строится один раз; 'surface' оставляет эталонную проверку по пикселям
+        self.collision_map = collision.as_collision_map(obstacles, cfg.COLLISION_BACKEND, cfg.ROBOT_RADIUS)
+        if isinstance(self.collision_map, collision.CollisionMap):
+            self.width, self.height = self.collision_map.width, self.collision_map.height
+            if cfg.CLEARANCE:
+                self.collision_map.enable_clearance()
+            self.clearance_weight = cfg.CLEARANCE_WEIGHT
+        else:
+            self.width, self.height = cfg.WIDTH, cfg.HEIGHT
+            self.clearance_weight = 0
+        self.verbose = verbose
+        self.rng = utils.BlockRandom(seed)
+        if cfg.TREE_STORE == 'arrays':
+            # Узлы в массивах NumPy; хранилище само служит индексом с векторным поиском
+            self.nodes = tree_store.TreeStore()
+            self.root = self.nodes.add(start.x, start.y)
+            self.index = self.nodes
+        elif cfg.TREE_STORE == 'objects':
+            self.nodes = [start]
+            self.root = start
+            # Пространственный индекс для поиска ближайших узлов
+            self.index = spatial_index.create_index(cfg.SPATIAL_INDEX)
+            self.index.insert(start)
+        else:
+            raise ValueError(f"Неизвестное хранилище дерева: {cfg.TREE_STORE}")
         self.step_size = 20
         self.final_step = 50
         self.base_radius = cfg.RADIUS  # Базовый радиус для rewiring
         self.path_found = False
         self.best_goal_node = None
         self.best_cost = float('inf')
+        self.goal_node = Node(goal.x, goal.y)  # Конец найденного пути, в дерево не входит
+        self.goal_candidates = {}  # Узлы, из которых видна цель; dict хранит порядок добавления
+        self.goal_dirty = False  # Стоимость одного из кандидатов изменилась
         self.solution_iter = 0  # Итерация, на которой найдено первое решение
+        self.pruned_count = 0  # Узлы, удалённые при отсечении Informed RRT*
+        self.collision_checks = 0  # Проверенные рёбра до близких узлов
+        self.checks_avoided = 0  # Рёбра, которые ленивый режим не стал проверять
+        self.iterations = 0
+        self.elapsed = 0.0
+    
+    def log(self, message):
+        """Печатает сообщение о ходе поиска, если включён подробный вывод"""
+        if self.verbose:
+            print(message)
     
     def calculate_dynamic_radius(self):
         """Вычисляет динамический радиус в зависимости от количества узлов"""
-        # Формула из теории RRT*: gamma * (log(n)/n)^(1/d), где d - размерность пространства (2)
-        n = max(1, len(self.nodes))
-        gamma = 2.0 * math.sqrt((cfg.WIDTH * cfg.HEIGHT) / math.pi)
-        radius = min(gamma * math.sqrt(math.log(n) / n), self.base_radius * 2)
-        # Ограничение снизу
-        return max(radius, self.base_radius / 2)
+        return utils.dynamic_radius(len(self.nodes), self.base_radius, self.width, self.height)
     
     def find_nearest(self, node):
         """Находит ближайший узел к заданному"""
-        nearest = self.nodes[0]
-        min_dist = float('inf')
-        for n in self.nodes:
-            dist = math.hypot(node.x - n.x, node.y - n.y)
-            if dist < min_dist:
-                min_dist = dist
-                nearest = n
-        return nearest
+        return self.index.nearest(node.x, node.y)
 
     def steer(self, from_node, to_node, step_size):
         """Создает новый узел в направлении целевого узла на расстоянии step_size"""
@@ -61,28 +101,46 @@ class RRTStar:
         new_y = from_node.y + ratio * (to_node.y - from_node.y)
         return Node(new_x, new_y)
     
+    def edge_cost(self, a, b):
+        """Стоимость ребра: длина, при cfg.CLEARANCE_WEIGHT > 0 увеличенная вблизи препятствий.
+
+        Штраф - средняя по концам и середине ребра доля (1 - расстояние / CLEARANCE_DISTANCE),
+        поэтому стоимость не меньше длины и эвристика остаётся допустимой.
+        """
+        length = math.hypot(b.x - a.x, b.y - a.y)
+        if not self.clearance_weight:
+            return length
+        points = ((a.x, a.y), ((a.x + b.x) / 2, (a.y + b.y) / 2), (b.x, b.y))
+        penalty = sum(max(0.0, 1.0 - self.collision_map.clearance_at(x, y) / cfg.CLEARANCE_DISTANCE)
+                      for x, y in points) / len(points)
+        return length * (1.0 + self.clearance_weight * penalty)
+    
     def find_near_nodes(self, new_node, radius):
         """Находит узлы рядом с новым узлом в заданном радиусе"""
-        near_nodes = []
-        for node in self.nodes:
-            if math.hypot(node.x - new_node.x, node.y - new_node.y) <= radius:
-                near_nodes.append(node)
-        return near_nodes
+        return self.index.near(new_node.x, new_node.y, radius)
     
-    def choose_parent(self, new_node, near_nodes):
-        """Выбирает родительский узел для нового узла из списка близких узлов"""
+    def choose_parent(self, new_node, near_nodes, edge_free=None):
+        """Выбирает родительский узел для нового узла из списка близких узлов.
+
+        Задаёт только parent и cost; в дерево узел добавляет add_node.
+
+        edge_free - результат collision.free_edges для рёбер new_node -> near_nodes,
+        общий с rewire; если не передан, вычисляется здесь.
+        """
         if not near_nodes:
             return new_node
+        if edge_free is None:
+            edge_free = collision.free_edges(new_node, near_nodes, self.collision_map)
         
         # Находим узел с минимальной стоимостью пути
         min_cost = float('inf')
         best_parent = None
         
-        for near_node in near_nodes:
+        for near_node, free in zip(near_nodes, edge_free):
             # Проверяем, можно ли соединить узлы без столкновений
-            if not collision.collision(near_node, new_node, self.obstacles):
+            if free:
                 # Вычисляем стоимость пути через этот узел
-                cost = utils.cost(near_node) + math.hypot(near_node.x - new_node.x, near_node.y - new_node.y)
+                cost = near_node.cost + self.edge_cost(near_node, new_node)
                 if cost < min_cost:
                     min_cost = cost
                     best_parent = near_node
@@ -93,114 +151,539 @@ class RRTStar:
         
         return new_node
     
-    def rewire(self, new_node, near_nodes):
+    def choose_parent_lazy(self, new_node, near_nodes, edge_free):
+        """Ленивый выбор родителя: кандидаты перебираются по возрастанию стоимости
+        пути через них, проверяется только ребро до первого свободного кандидата.
+
+        edge_free(i) - проверка ребра new_node -> near_nodes[i] с кешем (см. lazy_edges).
+        """
+        candidates = sorted(
+            (near_node.cost + self.edge_cost(near_node, new_node), i)
+            for i, near_node in enumerate(near_nodes)
+        )
+        for cost, i in candidates:
+            if edge_free(i):
+                new_node.parent = near_nodes[i]
+                new_node.cost = cost
+                break
+        return new_node
+    
+    def rewire_lazy(self, new_node, near_nodes, edge_free):
+        """Ленивый rewiring: ребро проверяется, только если оно снижает стоимость узла"""
+        for i, near_node in enumerate(near_nodes):
+            if near_node == self.root or near_node == new_node.parent:
+                continue
+            new_cost = new_node.cost + self.edge_cost(new_node, near_node)
+            if new_cost < near_node.cost and edge_free(i):
+                self.set_parent(near_node, new_node, new_cost)
+    
+    def lazy_edges(self, new_node, near_nodes):
+        """Возвращает функцию проверки ребра new_node -> near_nodes[i] по требованию.
+
+        Результаты кешируются в edge_free.checked, поэтому выбор родителя
+        и rewiring не проверяют одно ребро дважды.
+        """
+        checked = {}
+        
+        def edge_free(i):
+            if i not in checked:
+                checked[i] = not collision.collision(new_node, near_nodes[i], self.collision_map)
+            return checked[i]
+        
+        edge_free.checked = checked
+        return edge_free
+    
+    def ensure_parent(self, new_node, nearest_node):
+        """Если среди близких узлов не нашлось родителя, родитель - nearest_node:
+        ребро до него уже проверено, а узел без родителя стал бы вторым корнем"""
+        if new_node.parent is None:
+            new_node.parent = nearest_node
+            new_node.cost = nearest_node.cost + self.edge_cost(nearest_node, new_node)
+    
+    def add_node(self, node):
+        """Добавляет узел в дерево и индекс, возвращает узел, хранящийся в дереве"""
+        if isinstance(self.nodes, tree_store.TreeStore):
+            return self.nodes.add(node.x, node.y, node.parent, node.cost)
+        self.nodes.append(node)
+        if node.parent is not None:
+            node.parent.add_child(node)
+        self.index.insert(node)
+        return node
+    
+    def rewire(self, new_node, near_nodes, edge_free=None):
         """Перестраивает дерево для оптимизации путей"""
-        for near_node in near_nodes:
+        if edge_free is None:
+            edge_free = collision.free_edges(new_node, near_nodes, self.collision_map)
+        for near_node, free in zip(near_nodes, edge_free):
             # Проверяем не является ли near_node корнем или родителем нового узла
-            if near_node == self.start or near_node == new_node.parent:
+            if near_node == self.root or near_node == new_node.parent:
                 continue
             
             # Проверяем, можно ли соединить узлы без столкновений
-            if not collision.collision(new_node, near_node, self.obstacles):
+            if free:
                 # Вычисляем новую стоимость пути через новый узел
-                new_cost = new_node.cost + math.hypot(new_node.x - near_node.x, new_node.y - near_node.y)
+                new_cost = new_node.cost + self.edge_cost(new_node, near_node)
                 # Если новый путь короче, обновляем родителя
-                if new_cost < utils.cost(near_node):
-                    near_node.parent = new_node
+                if new_cost < near_node.cost:
+                    self.set_parent(near_node, new_node, new_cost)
+    
+    def set_parent(self, node, parent, cost):
+        """Переподвешивает узел и обновляет закешированную стоимость всего его поддерева"""
+        if node.parent is not None:
+            node.parent.remove_child(node)
+        node.parent = parent
+        parent.add_child(node)
+        delta = cost - node.cost
+        stack = [node]
+        while stack:
+            current = stack.pop()
+            current.cost += delta
+            if current in self.goal_candidates:
+                self.goal_dirty = True
+            stack.extend(current.children)
+    
+    def check_costs(self):
+        """Сверяет закешированные стоимости узлов с полным пересчётом до корня
+        и проверяет, что цепочка родителей каждого узла доходит до корня"""
+        for node in self.nodes:
+            top = node
+            while top.parent is not None:
+                top = top.parent
+            if top != self.root:
+                raise RuntimeError(f"Узел ({node.x:.1f}, {node.y:.1f}) не связан с корнем: "
+                                   f"цепочка родителей кончается в ({top.x:.1f}, {top.y:.1f})")
+            expected = utils.cost(node, self.edge_cost)
+            if abs(node.cost - expected) > 1e-6:
+                raise RuntimeError(f"Стоимость узла ({node.x:.1f}, {node.y:.1f}) в кеше {node.cost:.6f}, "
+                                   f"пересчёт даёт {expected:.6f}")
+        if self.goal_candidates:
+            expected = min(utils.cost(node, self.edge_cost) + self.edge_cost(node, self.goal)
+                           for node in self.goal_candidates)
+            if abs(self.best_cost - expected) > 1e-6:
+                raise RuntimeError(f"Лучшая стоимость пути {self.best_cost:.6f}, пересчёт даёт {expected:.6f}")
     
     def check_goal(self, new_node):
-        """Проверяет, достигнута ли цель и обновляет лучший путь"""
+        """Проверяет, можно ли из нового узла достичь цели, и обновляет лучший путь.
+
+        Узлы, из которых цель видна на расстоянии меньше final_step, хранятся
+        в отдельном наборе кандидатов, а не добавляются в дерево.
+        """
         dist_to_goal = math.hypot(new_node.x - self.goal.x, new_node.y - self.goal.y)
         
-        if dist_to_goal < self.final_step:
-            # Создаем узел цели
-            final_node = Node(self.goal.x, self.goal.y)
-            # Проверяем, можно ли соединить с целью без столкновений
-            if not collision.collision(new_node, final_node, self.obstacles):
-                # Устанавливаем родителя для финального узла
-                final_node.parent = new_node
-                # Вычисляем стоимость полного пути
-                final_cost = new_node.cost + dist_to_goal
-                
-                # Если это первый путь к цели или он лучше предыдущего, обновляем
-                if not self.path_found or final_cost < self.best_cost:
-                    if not self.path_found:
-                        self.path_found = True
-                        self.solution_iter = len(self.nodes)
-                        print(f"Первое решение найдено на итерации {self.solution_iter} с стоимостью {final_cost:.2f}")
-                    else:
-                        print(f"Найден лучший путь, стоимость улучшена с {self.best_cost:.2f} до {final_cost:.2f}")
-                    
-                    # Если у нас уже есть целевой узел в дереве, удаляем его
-                    if self.best_goal_node in self.nodes:
-                        self.nodes.remove(self.best_goal_node)
-                    
-                    self.best_goal_node = final_node
-                    self.best_cost = final_cost
-                    # Добавляем финальный узел в список узлов
-                    self.nodes.append(final_node)
+        # Проверяем, можно ли соединить с целью без столкновений
+        if dist_to_goal < self.final_step and not collision.collision(new_node, self.goal, self.collision_map):
+            self.goal_candidates[new_node] = None
+            self.goal_dirty = True
+        
+        if self.goal_dirty:
+            self.update_goal()
     
-    def find_path(self):
-        """Основной метод для поиска пути с помощью RRT*"""
-        for i in range(cfg.MAX_ITERATIONS):
-            # Вычисляем динамический радиус для этой итерации
-            radius = self.calculate_dynamic_radius()
+    def update_goal(self):
+        """Выбирает лучшего кандидата для соединения с целью.
+
+        Вызывается, когда появился новый кандидат или rewiring снизил стоимость
+        одного из существующих.
+        """
+        self.goal_dirty = False
+        best_node = None
+        best_cost = self.best_cost
+        for node in self.goal_candidates:
+            final_cost = node.cost + self.edge_cost(node, self.goal)
+            if final_cost < best_cost:
+                best_node, best_cost = node, final_cost
+        if best_node is None:
+            return
+        
+        if not self.path_found:
+            self.path_found = True
+            self.solution_iter = self.added_count()
+            self.log(f"Первое решение найдено на итерации {self.solution_iter} с стоимостью {best_cost:.2f}")
+        else:
+            self.log(f"Найден лучший путь, стоимость улучшена с {self.best_cost:.2f} до {best_cost:.2f}")
+        
+        # Узел цели не входит в дерево, поэтому его можно просто переподвесить
+        self.goal_node.parent = best_node
+        self.goal_node.cost = best_cost
+        self.best_goal_node = self.goal_node
+        self.best_cost = best_cost
+        
+        # Informed RRT*: узлы, которые не могут улучшить путь, больше не нужны
+        if cfg.INFORMED_SAMPLING:
+            self.prune()
+    
+    def added_count(self):
+        """Количество узлов, добавленных в дерево, включая отсечённые"""
+        return len(self.nodes) + self.pruned_count
+    
+    def heuristic(self, node):
+        """Допустимая оценка стоимости пути от узла до цели"""
+        return math.hypot(node.x - self.goal.x, node.y - self.goal.y)
+    
+    def prune(self):
+        """Удаляет узлы, у которых стоимость плюс эвристика больше лучшей стоимости.
+
+        Потомки такого узла тоже не могут её улучшить, поэтому удаляются целые поддеревья.
+        """
+        limit = self.best_cost + 1e-9
+        kept = []
+        pruned = set()
+        for node in self.nodes:
+            if node == self.root or node.cost + self.heuristic(node) <= limit:
+                kept.append(node)
+            else:
+                pruned.add(node)
+        if not pruned:
+            return
+        
+        self.pruned_count += len(pruned)
+        self.discard(pruned, kept)
+    
+    def discard(self, removed, kept=None):
+        """Убирает из дерева, индекса и кандидатов набор узлов, замкнутый по потомкам"""
+        for node in removed:
+            if node.parent is not None and node.parent not in removed:
+                node.parent.remove_child(node)
+        for node in removed:
+            self.goal_candidates.pop(node, None)
+        if isinstance(self.nodes, tree_store.TreeStore):
+            for node in removed:
+                self.nodes.remove(node)
+            return
+        self.nodes = kept if kept is not None else [node for node in self.nodes if node not in removed]
+        self.index = spatial_index.create_index(cfg.SPATIAL_INDEX)
+        for node in self.nodes:
+            self.index.insert(node)
+    
+    def subtree(self, node):
+        """Узел и все его потомки"""
+        result = []
+        stack = [node]
+        while stack:
+            current = stack.pop()
+            result.append(current)
+            stack.extend(current.children)
+        return result
+    
+    def update_obstacles(self, obstacles):
+        """Заменяет карту и удаляет только поддеревья, рёбра которых задевают новые препятствия.
+
+        obstacles - новая карта того же размера (как в конструкторе). Освободившиеся
+        ячейки рёбра не портят, поэтому проверяются только занятые заново.
+        Возвращает количество удалённых узлов.
+        """
+        new_map = collision.as_collision_map(obstacles, cfg.COLLISION_BACKEND, cfg.ROBOT_RADIUS)
+        if not isinstance(new_map, collision.CollisionMap) or not isinstance(self.collision_map, collision.CollisionMap):
+            raise ValueError("Перепланирование поддерживается только для карты занятости (COLLISION_BACKEND = 'bitmap')")
+        if new_map.grid.shape != self.collision_map.grid.shape:
+            raise ValueError("Размер новой карты отличается от исходной")
+        if new_map.is_occupied(self.root.x, self.root.y):
+            raise ValueError("Старт оказался внутри препятствия")
+        
+        added = new_map.grid & ~self.collision_map.grid
+        self.collision_map = new_map
+        self.obstacles = obstacles
+        if cfg.CLEARANCE:
+            new_map.enable_clearance()
+        if self.clearance_weight:
+            # Штраф за близость к препятствиям зависит от карты
+            self.update_costs()
+        if not added.any():
+            if self.clearance_weight:
+                self.reset_goal()
+            return 0
+        
+        # Рёбра проверяются по карте только из новых ячеек и только если задевают их габарит
+        rows = np.flatnonzero(added.any(axis=1))
+        cols = np.flatnonzero(added.any(axis=0))
+        x_min, x_max, y_min, y_max = cols[0], cols[-1] + 1, rows[0], rows[-1] + 1
+        added_map = collision.CollisionMap(added)
+        
+        def blocked(a, b):
+            if max(a.x, b.x) < x_min or min(a.x, b.x) > x_max or max(a.y, b.y) < y_min or min(a.y, b.y) > y_max:
+                return False
+            return added_map.segment_collides(a.x, a.y, b.x, b.y)
+        
+        removed = set()
+        for node in list(self.nodes):
+            if node not in removed and node.parent is not None and blocked(node.parent, node):
+                removed.update(self.subtree(node))
+        self.discard(removed)
+        self.goal_candidates = {node: None for node in self.goal_candidates if not blocked(node, self.goal)}
+        self.log(f"Карта изменилась: удалено {len(removed)} узлов, осталось {len(self.nodes)}")
+        self.reset_goal()
+        return len(removed)
+    
+    def reroot(self, position):
+        """Переносит корень дерева в новое положение робота (x, y).
+
+        Новый корень соединяется с ближайшим видимым узлом, родительские связи
+        на пути от этого узла до старого корня разворачиваются, затем стоимости
+        всего дерева пересчитываются от нового корня. Если ни один узел не виден,
+        дерево строится заново.
+        """
+        x, y = position
+        radius = self.calculate_dynamic_radius()
+        anchor = None
+        for node in sorted(self.find_near_nodes(Node(x, y), radius), key=lambda n: math.hypot(n.x - x, n.y - y)):
+            if not collision.collision(node, Node(x, y), self.collision_map):
+                anchor = node
+                break
+        
+        self.start = Node(x, y)
+        if anchor is None:
+            self.log("Ни один узел не виден из нового положения, дерево строится заново")
+            self.pruned_count += len(self.nodes)
+            self.discard(set(self.nodes))
+            self.root = self.add_node(self.start)
+            self.reset_goal()
+            return
+        
+        # Разворачиваем связи от узла привязки до старого корня
+        chain = [anchor]
+        while chain[-1].parent is not None:
+            chain.append(chain[-1].parent)
+        for child, parent in zip(chain, chain[1:]):
+            parent.remove_child(child)
+        for child, parent in zip(chain, chain[1:]):
+            parent.parent = child
+            child.add_child(parent)
+        self.root = self.add_node(self.start)
+        anchor.parent = self.root
+        self.root.add_child(anchor)
+        
+        self.update_costs()
+        self.reset_goal()
+    
+    def update_costs(self):
+        """Пересчитывает стоимости всех узлов от корня"""
+        stack = [self.root]
+        while stack:
+            current = stack.pop()
+            for child in current.children:
+                child.cost = current.cost + self.edge_cost(current, child)
+                stack.append(child)
+    
+    def reset_goal(self):
+        """Заново выбирает лучший путь после изменения дерева или карты"""
+        self.path_found = False
+        self.best_goal_node = None
+        self.best_cost = float('inf')
+        self.goal_node.parent = None
+        self.goal_dirty = False
+        if self.goal_candidates:
+            self.update_goal()
+    
+    def replan(self, position=None, obstacles=None, max_iterations=500, deadline_ms=None):
+        """Перепланирование с переиспользованием дерева.
+
+        position - новое положение робота (x, y), obstacles - изменившаяся карта.
+        После перестройки дерево улучшается ещё max_iterations итераций или до
+        истечения deadline_ms. Возвращает лучший путь или None.
+        """
+        start_time = time.perf_counter()
+        if obstacles is not None:
+            self.update_obstacles(obstacles)
+        if position is not None:
+            self.reroot(position)
+        for _ in self.find_path_anytime(deadline_ms, max_iterations):
+            pass
+        self.elapsed = time.perf_counter() - start_time
+        return self.get_path()
+    
+    def sample(self):
+        """Случайная точка для расширения дерева.
+
+        После нахождения пути (при cfg.INFORMED_SAMPLING) точки берутся равномерно
+        из части карты внутри эллипса с фокусами в старте и цели и большой осью,
+        равной лучшей стоимости: только там может пройти более короткий путь.
+        """
+        if self.rng.random() < cfg.GOAL_SAMPLE_RATE:  # Увеличенная вероятность выбора цели
+            return Node(self.goal.x, self.goal.y)
+        
+        if cfg.INFORMED_SAMPLING and self.path_found:
+            c_min = math.hypot(self.goal.x - self.start.x, self.goal.y - self.start.y)
+            major = self.best_cost / 2
+            minor = math.sqrt(max(self.best_cost ** 2 - c_min ** 2, 0.0)) / 2
+            center_x = (self.start.x + self.goal.x) / 2
+            center_y = (self.start.y + self.goal.y) / 2
+            angle = math.atan2(self.goal.y - self.start.y, self.goal.x - self.start.x)
+            cos_a, sin_a = math.cos(angle), math.sin(angle)
             
-            # Генерируем случайный узел
-            if random.random() < cfg.GOAL_SAMPLE_RATE:  # Увеличенная вероятность выбора цели
-                rand_node = Node(self.goal.x, self.goal.y)
+            if math.pi * major * minor < self.width * self.height:
+                # Равномерная точка в единичном круге, растянутая до эллипса и повернутая;
+                # точки за пределами карты отбрасываются
+                for _ in range(100):
+                    r = math.sqrt(self.rng.random())
+                    theta = 2 * math.pi * self.rng.random()
+                    ex = major * r * math.cos(theta)
+                    ey = minor * r * math.sin(theta)
+                    x = center_x + ex * cos_a - ey * sin_a
+                    y = center_y + ex * sin_a + ey * cos_a
+                    if 0 <= x <= self.width and 0 <= y <= self.height:
+                        return Node(x, y)
             else:
-                rand_node = Node(random.randint(0, cfg.WIDTH), random.randint(0, cfg.HEIGHT))
+                # Эллипс больше карты: выбираем точки в пересечении его габарита с картой
+                # и отбрасываем лежащие вне эллипса
+                half_w = math.hypot(major * cos_a, minor * sin_a)
+                half_h = math.hypot(major * sin_a, minor * cos_a)
+                x_min, x_max = max(0, center_x - half_w), min(self.width, center_x + half_w)
+                y_min, y_max = max(0, center_y - half_h), min(self.height, center_y + half_h)
+                for _ in range(100):
+                    x = x_min + (x_max - x_min) * self.rng.random()
+                    y = y_min + (y_max - y_min) * self.rng.random()
+                    ex = (x - center_x) * cos_a + (y - center_y) * sin_a
+                    ey = -(x - center_x) * sin_a + (y - center_y) * cos_a
+                    if (ex / major) ** 2 + (ey / minor) ** 2 <= 1:
+                        return Node(x, y)
+        
+        return Node(self.rng.randint(0, self.width), self.rng.randint(0, self.height))
+    
+    def step(self, i):
+        """Одна итерация RRT*: выборка, расширение дерева, rewiring и проверка цели.
+
+        Возвращает True, если в дерево добавлен новый узел.
+        """
+        # Вычисляем динамический радиус для этой итерации
+        radius = self.calculate_dynamic_radius()
+        
+        # Генерируем случайный узел
+        rand_node = self.sample()
+        
+        # Находим ближайший узел
+        nearest_node = self.find_nearest(rand_node)
+        
+        # Создаем новый узел в направлении случайного узла
+        new_node = self.steer(nearest_node, rand_node, self.step_size)
+        
+        # Проверяем на столкновения
+        if collision.collision(nearest_node, new_node, self.collision_map):
+            return False
+        
+        # Находим близкие узлы
+        near_nodes = self.find_near_nodes(new_node, radius)
+        
+        # Перестраиваем дерево (rewiring) только на каждой 5-й итерации или если число узлов < 1000
+        # Это оптимизация для ускорения работы
+        do_rewire = len(self.nodes) < 1000 or i % 5 == 0
+        
+        if cfg.LAZY_COLLISION:
+            # Рёбра проверяются по одному и только когда от них зависит решение
+            edge_free = self.lazy_edges(new_node, near_nodes)
+            new_node = self.choose_parent_lazy(new_node, near_nodes, edge_free)
+            self.ensure_parent(new_node, nearest_node)
+            new_node = self.add_node(new_node)
+            if do_rewire:
+                self.rewire_lazy(new_node, near_nodes, edge_free)
+            self.collision_checks += len(edge_free.checked)
+            self.checks_avoided += len(near_nodes) - len(edge_free.checked)
+        else:
+            # Проверяем все рёбра до близких узлов одним пакетом: результат нужен и для выбора родителя, и для rewiring
+            edge_free = collision.free_edges(new_node, near_nodes, self.collision_map)
+            self.collision_checks += len(near_nodes)
+            
+            # Выбираем лучшего родителя для нового узла
+            new_node = self.choose_parent(new_node, near_nodes, edge_free)
+            self.ensure_parent(new_node, nearest_node)
+            
+            # Добавляем новый узел в дерево и в пространственный индекс
+            new_node = self.add_node(new_node)
             
-            # Находим ближайший узел
-            nearest_node = self.find_nearest(rand_node)
+            if do_rewire:
+                self.rewire(new_node, near_nodes, edge_free)
+        
+        # Проверяем, можно ли достичь цели из нового узла
+        self.check_goal(new_node)
+        
+        # Режим проверки кеша стоимостей (очень медленно, только для тестирования)
+        if cfg.CHECK_COSTS:
+            self.check_costs()
+        return True
+    
+    def find_path(self):
+        """Основной метод для поиска пути с помощью RRT*"""
+        start_time = time.perf_counter()
+        for i in range(cfg.MAX_ITERATIONS):
+            self.iterations = i + 1
+            if not self.step(i):
+                continue
             
-            # Создаем новый узел в направлении случайного узла
-            new_node = self.steer(nearest_node, rand_node, self.step_size)
+            # Отображаем прогресс
+            if i % 1000 == 0:
+                self.log(f"Выполнено {i} итераций, количество узлов: {len(self.nodes)}")
             
-            # Проверяем на столкновения
-            if not collision.collision(nearest_node, new_node, self.obstacles):
-                # Находим близкие узлы
-                near_nodes = self.find_near_nodes(new_node, radius)
-                
-                # Выбираем лучшего родителя для нового узла
-                new_node = self.choose_parent(new_node, near_nodes)
-                
-                # Добавляем новый узел в список
-                self.nodes.append(new_node)
-                
-                # Перестраиваем дерево (rewiring) только на каждой 5-й итерации или если число узлов < 1000
-                # Это оптимизация для ускорения работы
-                if len(self.nodes) < 1000 or i % 5 == 0:
-                    self.rewire(new_node, near_nodes)
-                
-                # Проверяем, можно ли достичь цели из нового узла
-                self.check_goal(new_node)
-                
-                # Отображаем прогресс
-                if i % 1000 == 0:
-                    print(f"Выполнено {i} итераций, количество узлов: {len(self.nodes)}")
-                
-                # Если найден путь и прошло достаточно дополнительных итераций для его улучшения
-                if self.path_found and (len(self.nodes) - self.solution_iter) > cfg.MIN_ITERATIONS_AFTER_SOLUTION:
-                    print(f"Путь найден и оптимизирован, остановка после {len(self.nodes)} итераций")
-                    break
+            # Если найден путь и прошло достаточно дополнительных итераций для его улучшения
+            if self.path_found and (self.added_count() - self.solution_iter) > cfg.MIN_ITERATIONS_AFTER_SOLUTION:
+                self.log(f"Путь найден и оптимизирован, остановка после {self.added_count()} итераций")
+                break
+        
+        self.elapsed = time.perf_counter() - start_time
         
         # Если путь найден, возвращаем его
-        if self.path_found:
-            path = []
-            current = self.best_goal_node
-            while current is not None:
-                path.append((current.x, current.y))
-                current = current.parent
-            print(f"Финальный путь состоит из {len(path)} точек с общей стоимостью {self.best_cost:.2f}")
-            return path[::-1]  # Переворачиваем путь, чтобы он шел от старта к цели
+        path = self.get_path()
+        if path is not None:
+            self.log(f"Финальный путь состоит из {len(path)} точек с общей стоимостью {self.best_cost:.2f}")
         else:
-            print("Путь не найден после всех итераций")
+            self.log("Путь не найден после всех итераций")
+        return path
+    
+    def find_path_anytime(self, deadline_ms=None, max_iterations=None):
+        """Anytime-режим: генератор, выдающий каждое улучшение пути до истечения времени.
+
+        deadline_ms - бюджет времени в миллисекундах, max_iterations - бюджет итераций
+        (по умолчанию cfg.MAX_ITERATIONS). Каждое событие - словарь с ключами
+        cost, path, iteration и elapsed (мс от начала вызова). Поиск можно
+        прервать в любой момент и взять последний полученный путь.
+        """
+        if max_iterations is None:
+            max_iterations = cfg.MAX_ITERATIONS
+        start_time = time.perf_counter()
+        deadline = None if deadline_ms is None else start_time + deadline_ms / 1000
+        best_cost = self.best_cost
+        first = self.iterations
+        for i in range(first, first + max_iterations):
+            if deadline is not None and time.perf_counter() >= deadline:
+                break
+            self.iterations = i + 1
+            self.step(i)
+            if self.best_cost < best_cost:
+                best_cost = self.best_cost
+                self.elapsed = time.perf_counter() - start_time
+                yield {
+                    'cost': best_cost,
+                    'path': self.get_path(),
+                    'iteration': self.iterations,
+                    'elapsed': self.elapsed * 1000,
+                }
+        self.elapsed = time.perf_counter() - start_time
+    
+    def get_path(self):
+        """Возвращает лучший найденный путь от старта к цели или None"""
+        if not self.path_found:
             return None
+        path = []
+        current = self.best_goal_node
+        while current is not None:
+            path.append((current.x, current.y))
+            current = current.parent
+        return path[::-1]  # Переворачиваем путь, чтобы он шел от старта к цели
+    
+    def stats(self):
+        """Статистика последнего запуска find_path"""
+        return {
+            'path_found': self.path_found,
+            'cost': self.best_cost if self.path_found else None,
+            'nodes': len(self.nodes),
+            'iterations': self.iterations,
+            'solution_iter': self.solution_iter,
+            'collision_checks': self.collision_checks,
+            'checks_avoided': self.checks_avoided,
+            'time': self.elapsed,
+        }
     
     def draw(self, screen):
         """Отрисовка дерева RRT*"""
+        import pygame
+        
         # Рисуем все узлы и ребра
         for node in self.nodes:
             pygame.draw.circle(screen, cfg.YELLOW, (int(node.x), int(node.y)), 3)
@@ -213,175 +696,23 @@ class RRTStar:
         
         # Если путь найден, рисуем его
         if self.path_found:
-            path = []
-            current = self.best_goal_node
-            while current is not None:
-                path.append((current.x, current.y))
-                current = current.parent
-            path = path[::-1]  # Переворачиваем путь
+            path = self.get_path()
             if len(path) > 1:
                 pygame.draw.lines(screen, cfg.PURPLE, False, path, 3)
 
 
-# Определение функций для создания препятствий и получения начальной и конечной точек
-def create_obstacles():
-    """Создает препятствия, позволяя пользователю рисовать их мышью"""
-    done = False
-    flStartDraw = False
-    while not done:
-        for event in pygame.event.get():
-            if event.type == pygame.KEYDOWN and event.key == pygame.K_SPACE:
-                done = True
-            if event.type == pygame.MOUSEBUTTONDOWN and event.button == 1:
-                flStartDraw = True
-            elif event.type == pygame.MOUSEMOTION:
-                if flStartDraw:
-                    pos = event.pos
-                    pygame.draw.circle(screen, (0, 255, 255), pos, 10)
-                    pygame.display.update()
-            elif event.type == pygame.MOUSEBUTTONUP and event.button == 1:
-                flStartDraw = False
-    pygame.image.save(screen, 'map.png')
-    obstaclesSurface = pygame.image.load('map.png')
-    return obstaclesSurface
-
-
-def get_start_end_points():
-    """Получает от пользователя начальную и конечную точки"""
-    screen.fill(cfg.BLACK)
-    start = None
-    end = None
-    selecting_start = True
-    selecting_end = False
-    while selecting_start or selecting_end:
-        for event in pygame.event.get():
-            if event.type == pygame.QUIT:
-                pygame.quit()
-            elif event.type == pygame.MOUSEBUTTONDOWN:
-                pos = pygame.mouse.get_pos()
-                if selecting_start:
-                    start = Node(*pos)
-                    pygame.draw.circle(screen, cfg.RED, pos, 10)
-                    pygame.display.update()
-                    selecting_start = False
-                    selecting_end = True
-                elif selecting_end:
-                    end = Node(*pos)
-                    pygame.draw.circle(screen, cfg.GREEN, pos, 10)
-                    selecting_end = False
-
-        pygame.display.update()
-    return start, end
+def plan(grid, start, goal, robot_radius=0, seed=None, smooth=False):
+    """Поиск пути без интерфейса.
 
-
-def main():
-    """Основная функция для запуска алгоритма RRT*"""
-    global screen
-    
-    pygame.init()
-    screen = pygame.display.set_mode((cfg.WIDTH, cfg.HEIGHT))
-    pygame.display.set_caption("RRT* Algorithm (Optimized RRT)")
-    
-    infoSurface = pygame.Surface((cfg.WIDTH, cfg.HEIGHT))
-    infoSurface.set_colorkey((0, 0, 0))
-    
-    # Получаем начальную и конечную точки
-    start, goal = get_start_end_points()
-    
-    # Создаем препятствия
-    obstacles = create_obstacles()
-    
-    # Создаем экземпляр RRT*
-    rrtstar = RRTStar(start, goal, obstacles)
-    
-    # Запускаем поиск пути и замеряем время
-    startTime = time.perf_counter()
+    grid - булев массив [y, x] (True - препятствие), start и goal - точки (x, y).
+    Возвращает путь (список точек или None) и статистику поиска.
+    При smooth=True путь сокращается и сглаживается, отчёт кладётся в stats['smoothing'].
+    """
+    collision_map = collision.CollisionMap(grid, robot_radius)
+    rrtstar = RRTStar(Node(*start), Node(*goal), collision_map, verbose=False, seed=seed)
     path = rrtstar.find_path()
-    elapsed = time.perf_counter() - startTime
-    elapsed = format(elapsed, '.4f')
-    
-    # Отображаем информацию о найденном пути
-    info_text = f'Nodes: {len(rrtstar.nodes)} Time: {elapsed}s'
-    if rrtstar.path_found:
-        info_text += f' Path cost: {format(rrtstar.best_cost, ".2f")}'
-    temp = cfg.FONT.render(info_text, 0, (0, 255, 0), (0, 0, 1))
-    
-    # Основной цикл отображения
-    running = True
-    show_tree = False
-    show_detailed_info = False
-    
-    while running:
-        screen.blit(infoSurface, (0, 0))
-        infoSurface.blit(temp, (cfg.WIDTH - temp.get_width(), cfg.FONT.get_height()))
-        
-        for event in pygame.event.get():
-            if event.type == pygame.QUIT:
-                running = False
-            elif event.type == pygame.KEYDOWN:
-                if event.key == pygame.K_ESCAPE:
-                    running = False
-                elif event.key == pygame.K_TAB:
-                    show_tree = not show_tree
-                elif event.key == pygame.K_i:
-                    # Переключаем отображение подробной информации
-                    show_detailed_info = not show_detailed_info
-                elif event.key == pygame.K_r:
-                    # Перезапуск с новыми препятствиями
-                    screen.fill(cfg.BLACK)
-                    start, goal = get_start_end_points()
-                    obstacles = create_obstacles()
-                    rrtstar = RRTStar(start, goal, obstacles)
-                    startTime = time.perf_counter()
-                    path = rrtstar.find_path()
-                    elapsed = time.perf_counter() - startTime
-                    elapsed = format(elapsed, '.4f')
-                    info_text = f'Nodes: {len(rrtstar.nodes)} Time: {elapsed}s'
-                    if rrtstar.path_found:
-                        info_text += f' Path cost: {format(rrtstar.best_cost, ".2f")}'
-                    temp = cfg.FONT.render(info_text, 0, (0, 255, 0), (0, 0, 1))
-        
-        # Отображаем обнаруженные препятствия
-        screen.blit(obstacles, (0, 0))
-        
-        # Если нажата клавиша TAB, показываем дерево
-        if show_tree:
-            rrtstar.draw(screen)
-        else:
-            # Иначе только начальную и конечную точки и найденный путь
-            pygame.draw.circle(screen, cfg.RED, (int(start.x), int(start.y)), 10)
-            pygame.draw.circle(screen, cfg.GREEN, (int(goal.x), int(goal.y)), 10)
-            
-            if path:
-                # Оптимизированная отрисовка пути - более толстые линии для лучшей видимости
-                pygame.draw.lines(screen, cfg.PURPLE, False, path, 4)
-                
-                # Добавляем маркеры в каждой точке пути
-                for point in path:
-                    pygame.draw.circle(screen, cfg.PURPLE, (int(point[0]), int(point[1])), 3)
-        
-        # Отображаем подробную информацию, если включено
-        if show_detailed_info and rrtstar.path_found:
-            info_lines = [
-                f"Всего узлов: {len(rrtstar.nodes)}",
-                f"Длина пути: {len(path)} точек",
-                f"Стоимость пути: {rrtstar.best_cost:.2f}",
-                f"Первое решение на итерации: {rrtstar.solution_iter}",
-                f"Улучшение: {(1 - rrtstar.best_cost / (rrtstar.solution_iter * 0.01)):.2f}%",
-                f"Нажмите TAB для просмотра дерева",
-                f"Нажмите R для перезапуска"
-            ]
-            
-            y_offset = 50
-            for line in info_lines:
-                info_surf = cfg.FONT.render(line, 0, (255, 255, 0), (0, 0, 128))
-                screen.blit(info_surf, (20, y_offset))
-                y_offset += 30
-        
-        pygame.display.update()
-    
-    pygame.quit()
-
-
-if __name__ == "__main__":
-    main() 
\ No newline at end of file
+    stats = rrtstar.stats()
+    if smooth and path is not None:
+        path, stats['smoothing'] = smoothing.smooth_path(path, collision_map, spline=cfg.SMOOTH_SPLINE,
+                                                         max_curvature=cfg.MAX_CURVATURE, seed=seed)
+    return path, stats
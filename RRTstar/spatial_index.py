@@ -0,0 +1,167 @@
+import math
+
+
+class BruteForceIndex:
+    """Линейный перебор всех узлов (эталон для проверки KD-дерева)"""
+
+    def __init__(self):
+        self.nodes = []
+
+    def __len__(self):
+        return len(self.nodes)
+
+    def insert(self, node):
+        self.nodes.append(node)
+
+    def remove(self, node):
+        self.nodes.remove(node)
+
+    def nearest(self, x, y):
+        """Возвращает ближайший к точке (x, y) узел"""
+        nearest = None
+        min_dist = float('inf')
+        for n in self.nodes:
+            dist = math.hypot(x - n.x, y - n.y)
+            if dist < min_dist:
+                min_dist = dist
+                nearest = n
+        return nearest
+
+    def near(self, x, y, radius):
+        """Возвращает все узлы на расстоянии не больше radius от точки (x, y)"""
+        return [n for n in self.nodes if math.hypot(n.x - x, n.y - y) <= radius]
+
+
+class KDTreeIndex:
+    """Динамическое 2D KD-дерево с инкрементальной вставкой.
+
+    Вершина дерева хранится списком [узел, x, y, ось, левый, правый, удалён].
+    Удаление ленивое: вершина помечается и пропускается при поиске.
+    Если глубина дерева сильно превышает log2(n), оно перестраивается
+    по медианам, так что вставка и поиск остаются около O(log n).
+    """
+
+    NODE, X, Y, AXIS, LEFT, RIGHT, DELETED = range(7)
+
+    def __init__(self):
+        self.root = None
+        self.size = 0
+        self.deleted = 0
+        self.entries = {}  # id(узел) -> вершина дерева, для удаления
+
+    def __len__(self):
+        return self.size - self.deleted
+
+    def insert(self, node):
+        entry = [node, node.x, node.y, 0, None, None, False]
+        self.entries[id(node)] = entry
+        self.size += 1
+        if self.root is None:
+            self.root = entry
+            return
+
+        current = self.root
+        depth = 1
+        while True:
+            axis = current[self.AXIS]
+            coord = entry[self.X + axis]
+            side = self.LEFT if coord < current[self.X + axis] else self.RIGHT
+            depth += 1
+            if current[side] is None:
+                entry[self.AXIS] = 1 - axis
+                current[side] = entry
+                break
+            current = current[side]
+
+        # Перестраиваем дерево, если оно выродилось
+        if depth > 16 and depth > 3 * math.log2(self.size + 1):
+            self.rebuild()
+
+    def remove(self, node):
+        entry = self.entries.pop(id(node), None)
+        if entry is None or entry[self.DELETED]:
+            return
+        entry[self.DELETED] = True
+        self.deleted += 1
+        # Слишком много удалённых вершин замедляет поиск
+        if self.deleted > 64 and self.deleted * 2 > self.size:
+            self.rebuild()
+
+    def rebuild(self):
+        """Строит сбалансированное дерево из неудалённых узлов"""
+        alive = [entry for entry in self.entries.values() if not entry[self.DELETED]]
+        self.size = len(alive)
+        self.deleted = 0
+        self.root = self._build(alive, 0)
+
+    def _build(self, entries, axis):
+        if not entries:
+            return None
+        entries.sort(key=lambda e: e[self.X + axis])
+        mid = len(entries) // 2
+        entry = entries[mid]
+        entry[self.AXIS] = axis
+        entry[self.LEFT] = self._build(entries[:mid], 1 - axis)
+        entry[self.RIGHT] = self._build(entries[mid + 1:], 1 - axis)
+        return entry
+
+    def nearest(self, x, y):
+        """Возвращает ближайший к точке (x, y) узел"""
+        best = None
+        best_dist2 = float('inf')
+        # В стеке пары (вершина, квадрат расстояния до разделяющей прямой родителя)
+        stack = [(self.root, 0.0)] if self.root is not None else []
+        while stack:
+            entry, plane_dist2 = stack.pop()
+            if plane_dist2 >= best_dist2:
+                continue
+            dx = x - entry[self.X]
+            dy = y - entry[self.Y]
+            if not entry[self.DELETED]:
+                dist2 = dx * dx + dy * dy
+                if dist2 < best_dist2:
+                    best_dist2 = dist2
+                    best = entry[self.NODE]
+
+            diff = dx if entry[self.AXIS] == 0 else dy
+            near_side, far_side = (entry[self.LEFT], entry[self.RIGHT]) if diff < 0 else (entry[self.RIGHT], entry[self.LEFT])
+            # Дальнюю ветку кладём первой, чтобы сначала обойти ближнюю
+            if far_side is not None:
+                stack.append((far_side, diff * diff))
+            if near_side is not None:
+                stack.append((near_side, 0.0))
+        return best
+
+    def near(self, x, y, radius):
+        """Возвращает все узлы на расстоянии не больше radius от точки (x, y)"""
+        result = []
+        radius2 = radius * radius
+        stack = [self.root] if self.root is not None else []
+        while stack:
+            entry = stack.pop()
+            dx = x - entry[self.X]
+            dy = y - entry[self.Y]
+            if not entry[self.DELETED] and dx * dx + dy * dy <= radius2:
+                result.append(entry[self.NODE])
+
+            diff = dx if entry[self.AXIS] == 0 else dy
+            if diff < 0:
+                if entry[self.LEFT] is not None:
+                    stack.append(entry[self.LEFT])
+                if entry[self.RIGHT] is not None and diff * diff <= radius2:
+                    stack.append(entry[self.RIGHT])
+            else:
+                if entry[self.RIGHT] is not None:
+                    stack.append(entry[self.RIGHT])
+                if entry[self.LEFT] is not None and diff * diff <= radius2:
+                    stack.append(entry[self.LEFT])
+        return result
+
+
+def create_index(kind):
+    """Создаёт пространственный индекс по имени из конфигурации"""
+    if kind == 'kdtree':
+        return KDTreeIndex()
+    if kind == 'brute':
+        return BruteForceIndex()
+    raise ValueError(f"Неизвестный тип пространственного индекса: {kind}")
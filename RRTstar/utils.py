@@ -1,5 +1,7 @@
 import math
 
+import numpy as np
+
 
 def normalize(vx, vy):
     norm = math.sqrt(vx * vx + vy * vy)
@@ -19,11 +21,56 @@ def dist(p1, p2):
         return math.hypot(p2[0] - p1[0], p2[1] - p1[1])
 
 
-def cost(node):
-    """Вычисляет стоимость пути от корня до данного узла"""
+def cost(node, edge_cost=None):
+    """Вычисляет стоимость пути от корня до данного узла обходом родителей.
+
+    RRT* хранит эту стоимость в node.cost; функция используется для проверки кеша.
+    edge_cost(родитель, узел) задаёт стоимость ребра, по умолчанию - его длина.
+    """
     cost = 0
     current = node
     while current.parent is not None:
-        cost += math.hypot(current.x - current.parent.x, current.y - current.parent.y)
+        if edge_cost is None:
+            cost += math.hypot(current.x - current.parent.x, current.y - current.parent.y)
+        else:
+            cost += edge_cost(current.parent, current)
         current = current.parent
-    return cost 
\ No newline at end of file
+    return cost
+
+
+def dynamic_radius(n, base_radius, width, height):
+    """Радиус поиска соседей RRT* в зависимости от количества узлов"""
+    # Формула из теории RRT*: gamma * (log(n)/n)^(1/d), где d - размерность пространства (2)
+    n = max(1, n)
+    gamma = 2.0 * math.sqrt((width * height) / math.pi)
+    radius = min(gamma * math.sqrt(math.log(n) / n), base_radius * 2)
+    # Ограничение снизу
+    return max(radius, base_radius / 2)
+
+
+class BlockRandom:
+    """Случайные числа из numpy.random.Generator, которые выдаются блоками.
+
+    Генератор вызывается один раз на block чисел, а не на каждой итерации.
+    seed - зерно, SeedSequence или готовый Generator. Методы random() и
+    randint(a, b) совпадают с random.Random.
+    """
+
+    def __init__(self, seed=None, block=1024):
+        self.generator = np.random.default_rng(seed)
+        self.block = block
+        self.values = []
+        self.position = 0
+
+    def random(self):
+        """Число из [0, 1)"""
+        if self.position == len(self.values):
+            self.values = self.generator.random(self.block).tolist()
+            self.position = 0
+        value = self.values[self.position]
+        self.position += 1
+        return value
+
+    def randint(self, a, b):
+        """Целое число из [a, b], включая оба конца"""
+        return a + min(int(self.random() * (b - a + 1)), b - a)
@@ -1,14 +1,26 @@
+import collections
 import math
+import os
 import pygame
 import sys
-import random
+import numpy as np
 from heapq import heappush, heappop
-import copy
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), 'common'))
+from grid_graph import GridGraph, DIAGONAL_COST
+from reachability import Reachability
+import jump_points
+from jump_points import JumpTable
 
 # Константы для отображения
 GRID_SIZE = 40
 CELL_SIZE = 15
 WINDOW_SIZE = (GRID_SIZE * CELL_SIZE, GRID_SIZE * CELL_SIZE)
+SEED = None  # Зерно генератора лабиринтов (None - каждый запуск новый лабиринт)
+MODE = 'astar'  # Режим поиска в окне: 'astar', 'jps' или 'jps+'
+MODES = ('astar', 'jps', 'jps+')
+HEURISTIC = 'octile'  # Эвристика в окне
+WEIGHT = 1.0  # Вес эвристики в окне (1 - оптимальный путь)
 
 # Цвета
 WHITE = (255, 255, 255)
@@ -17,137 +29,213 @@ RED = (255, 0, 0)
 GREEN = (0, 255, 0)
 BLUE = (0, 0, 255)
 
+def octile_distance(dy, dx):
+    """Длина кратчайшего пути без препятствий при ходах стоимостью 1 и sqrt(2)"""
+    dy, dx = abs(dy), abs(dx)
+    return max(dy, dx) + (DIAGONAL_COST - 1) * min(dy, dx)
+
+
+def euclidean_distance(dy, dx):
+    return math.hypot(dy, dx)
+
+
+def manhattan_distance(dy, dx):
+    """Переоценивает диагональные ходы: путь быстрее находится, но может быть неоптимальным"""
+    return abs(dy) + abs(dx)
+
+
+def zero_distance(dy, dx):
+    """Без эвристики A* раскрывает клетки в том же порядке, что и алгоритм Дейкстры"""
+    return 0
+
+
+HEURISTICS = {
+    'octile': octile_distance,
+    'euclidean': euclidean_distance,
+    'manhattan': manhattan_distance,
+    'zero': zero_distance,
+}
+
+
 class AStar:
-    def __init__(self, start, goal, obstacles):
+    def __init__(self, start, goal, obstacles, grid=None, trace=True, mode='astar', jumps=None,
+                 heuristic='octile', weight=1.0):
+        # grid - готовый GridGraph или сетка [строка][столбец] (1 - препятствие) любого размера;
+        # GridGraph можно построить один раз и использовать для многих запросов.
+        # trace - сохранять рёбра поиска для отрисовки (на больших картах лучше выключить)
+        # mode - 'astar' (все соседи), 'jps' (Jump Point Search) или 'jps+' (JPS с таблицей прыжков);
+        # jumps - готовая JumpTable для этого графа, чтобы не строить её на каждый запрос
+        # heuristic - имя из HEURISTICS; weight >= 1 - вес эвристики (взвешенный A*): с допустимой
+        # эвристикой (octile, euclidean, zero) путь длиннее оптимального не более чем в weight раз
+        if mode not in MODES:
+            raise ValueError(f"Неизвестный режим A*: {mode}, доступны: {', '.join(MODES)}")
+        if heuristic not in HEURISTICS:
+            raise ValueError(f"Неизвестная эвристика: {heuristic}, доступны: {', '.join(HEURISTICS)}")
+        if not (math.isfinite(weight) and weight >= 1):
+            raise ValueError(f"Вес эвристики должен быть конечным и не меньше 1, получено {weight}")
         self.start = start
         self.goal = goal
         self.obstacles = obstacles
-        self.grid = [[0 for _ in range(GRID_SIZE)] for _ in range(GRID_SIZE)]
-        self.initialize_grid()
+        if grid is None:
+            self.graph = GridGraph(GRID_SIZE, GRID_SIZE, obstacles)
+        elif isinstance(grid, GridGraph):
+            self.graph = grid
+        else:
+            self.graph = GridGraph.from_grid(grid)
+        self.rows = self.graph.rows
+        self.cols = self.graph.cols
+        self.trace = trace
+        self.mode = mode
+        self.heuristic_name = heuristic
+        self.heuristic_function = HEURISTICS[heuristic]
+        self.weight = weight
+        self.jumps = None
+        if mode == 'jps+':
+            self.jumps = jumps if jumps is not None else JumpTable(self.graph)
         self.current_path = [start]
         self.current_pos = start
-        self.step_count = 0
+        self.step_count = 0  # Число раскрытых узлов
+        self.generated = 1  # Число записей, положенных в кучу
         self.path_complete = False
-        self.open_set = [(0, start)]
-        self.came_from = {start: None}
-        self.g_score = {start: 0}
-        self.f_score = {start: self.heuristic(start, goal)}
-        self.closed_set = set()
+        # Внутри поиск идёт по целочисленным индексам клеток графа
+        self.start_index = self.graph.index(start)
+        self.goal_index = self.graph.index(goal)
+        # Запись кучи (f, -g, индекс): при равном f первой раскрывается клетка с большим g, то есть
+        # ближе к цели, и поиск не расползается по клеткам с одинаковой оценкой
+        self.open_set = [(self.f_score(0, start), 0, self.start_index)]
+        self.came_from = {self.start_index: None}
+        self.g_score = {self.start_index: 0}
+        self.closed = bytearray(len(self.graph))
         self.path_edges = []
 
-    def initialize_grid(self):
-        # Инициализация сетки: 0 - свободно, 1 - препятствие
-        for i in range(GRID_SIZE):
-            for j in range(GRID_SIZE):
-                if (i, j) in self.obstacles:
-                    self.grid[i][j] = 1
+    def heuristic(self, a, b):
+        return self.heuristic_function(a[0] - b[0], a[1] - b[1])
 
-    def get_neighbors(self, current):
-        x, y = current
-        neighbors = []
-        # Проверяем все 8 направлений
-        for dx in [-1, 0, 1]:
-            for dy in [-1, 0, 1]:
-                if dx == 0 and dy == 0:
-                    continue
-                new_x, new_y = x + dx, y + dy
-                if (0 <= new_x < GRID_SIZE and 
-                    0 <= new_y < GRID_SIZE and 
-                    self.grid[new_x][new_y] == 0):
-                    neighbors.append((new_x, new_y))
-        return neighbors
+    def f_score(self, g, cell):
+        # Суммы 1 и sqrt(2) в разном порядке расходятся в последних битах; округление
+        # оставляет равные по смыслу оценки равными, и порядок решает g
+        return round(g + self.weight * self.heuristic(cell, self.goal), 9)
 
-    def heuristic(self, a, b):
-        # Евклидово расстояние как эвристика
-        return math.sqrt((a[0] - b[0])**2 + (a[1] - b[1])**2)
+    def stats(self):
+        return {
+            'expanded': self.step_count,
+            'generated': self.generated,
+            'heuristic': self.heuristic_name,
+            'weight': self.weight,
+        }
 
     def step(self):
         if not self.open_set or self.path_complete:
             return False
 
-        current = heappop(self.open_set)[1]
+        current = heappop(self.open_set)[2]
         
-        if current == self.goal:
+        if current == self.goal_index:
             self.path_complete = True
             return True
+        
+        # Устаревшая запись кучи: клетка уже раскрыта с меньшей стоимостью
+        if self.closed[current]:
+            return True
             
-        self.closed_set.add(current)
-        self.current_pos = current
+        self.closed[current] = 1
+        self.current_pos = self.graph.cell(current)
         
-        for neighbor in self.get_neighbors(current):
-            if neighbor in self.closed_set:
+        g_current = self.g_score[current]
+        if self.mode == 'astar':
+            neighbors = self.graph.neighbors(current)
+        else:
+            # В режимах JPS соседи - точки прыжка, стоимость - длина прыжка
+            neighbors = jump_points.successors(self.graph, current, self.came_from[current],
+                                               self.goal_index, self.jumps)
+        for neighbor, cost in neighbors:
+            if self.closed[neighbor]:
                 continue
                 
             # Стоимость перехода (1 для ортогональных, sqrt(2) для диагональных)
-            dx = abs(neighbor[0] - current[0])
-            dy = abs(neighbor[1] - current[1])
-            tentative_g_score = self.g_score[current] + (math.sqrt(2) if dx == 1 and dy == 1 else 1)
+            tentative_g_score = g_current + cost
             
-            if neighbor not in self.g_score or tentative_g_score < self.g_score[neighbor]:
+            if tentative_g_score < self.g_score.get(neighbor, math.inf):
                 self.came_from[neighbor] = current
                 self.g_score[neighbor] = tentative_g_score
-                self.f_score[neighbor] = self.g_score[neighbor] + self.heuristic(neighbor, self.goal)
-                heappush(self.open_set, (self.f_score[neighbor], neighbor))
-                # Добавляем ребро для отрисовки
-                self.path_edges.append((current, neighbor))
+                f_score = self.f_score(tentative_g_score, self.graph.cell(neighbor))
+                heappush(self.open_set, (f_score, -tentative_g_score, neighbor))
+                self.generated += 1
+                if self.trace:
+                    # Добавляем ребро для отрисовки
+                    self.path_edges.append((self.current_pos, self.graph.cell(neighbor)))
 
         self.step_count += 1
         # Обновляем текущий путь для визуализации
-        if current != self.start:
-            prev = self.came_from[current]
-            if prev is not None:
-                self.current_path.append(current)
+        if self.trace and current != self.start_index:
+            self.current_path.append(self.current_pos)
         
         return True
 
     def get_path(self):
         path = []
-        current = self.goal
+        current = self.goal_index
         while current is not None:
             path.append(current)
             current = self.came_from.get(current)
-        return list(reversed(path))
+        path.reverse()
+        # Между точками прыжка JPS путь идёт по прямой: восстанавливаем все клетки
+        cells = [self.graph.cell(path[0])]
+        for index in path[1:]:
+            row, col = cells[-1]
+            target_row, target_col = self.graph.cell(index)
+            dr, dc = jump_points.sign(target_row - row), jump_points.sign(target_col - col)
+            for _ in range(max(abs(target_row - row), abs(target_col - col))):
+                row, col = row + dr, col + dc
+                cells.append((row, col))
+        return cells
+
+def create_maze_with_pattern(rng=None, size=GRID_SIZE):
+    """Создаёт лабиринт с более структурированным паттерном и гарантированным путём.
 
-def create_maze_with_pattern():
-    """Создаёт лабиринт с более структурированным паттерном и гарантированным путём"""
+    rng - numpy.random.Generator или зерно; с одинаковым зерном лабиринт повторяется.
+    size - размер квадратного поля в клетках; число островов растёт с площадью.
+    """
+    rng = np.random.default_rng(rng)
     obstacles = []
     
     # Добавляем внешние стены
-    for i in range(GRID_SIZE):
+    for i in range(size):
         obstacles.append((i, 0))
-        obstacles.append((i, GRID_SIZE-1))
+        obstacles.append((i, size-1))
     
-    for j in range(GRID_SIZE):
+    for j in range(size):
         obstacles.append((0, j))
-        obstacles.append((GRID_SIZE-1, j))
+        obstacles.append((size-1, j))
     
     # Создаем горизонтальные стены с проходами
-    for i in range(5, GRID_SIZE-5, 6):
-        passage = random.randint(2, GRID_SIZE-3)
-        for j in range(1, GRID_SIZE-1):
+    for i in range(5, size-5, 6):
+        passage = int(rng.integers(2, size-2))
+        for j in range(1, size-1):
             if j != passage and j != passage+1:
                 obstacles.append((i, j))
     
     # Создаем вертикальные стены с проходами
-    for j in range(5, GRID_SIZE-5, 6):
-        passage = random.randint(2, GRID_SIZE-3)
-        for i in range(1, GRID_SIZE-1):
+    for j in range(5, size-5, 6):
+        passage = int(rng.integers(2, size-2))
+        for i in range(1, size-1):
             if i != passage and i != passage+1:
                 obstacles.append((i, j))
     
     # Добавляем случайные острова препятствий
-    for _ in range(8):  # Уменьшаем количество островов для большей проходимости
-        island_x = random.randint(5, GRID_SIZE-6)
-        island_y = random.randint(5, GRID_SIZE-6)
-        
+    # Центры и клетки всех островов выбираются одним блоком
+    island_count = max(8, 8 * size * size // (GRID_SIZE * GRID_SIZE))  # Уменьшаем количество островов для большей проходимости
+    islands = rng.integers(5, size-5, size=(island_count, 2))
+    island_cells = rng.random((island_count, 5, 5)) < 0.6  # Уменьшаем вероятность препятствия для большей проходимости
+    for (island_x, island_y), cells in zip(islands.tolist(), island_cells):
         for dx in range(-2, 3):
             for dy in range(-2, 3):
-                if random.random() < 0.6:  # Уменьшаем вероятность препятствия для большей проходимости
+                if cells[dx + 2, dy + 2]:
                     obstacles.append((island_x + dx, island_y + dy))
     
     # Определяем начальную и конечную точки
     start = (5, 5)
-    goal = (GRID_SIZE-6, GRID_SIZE-6)
+    goal = (size-6, size-6)
     
     # Убираем препятствия рядом с начальной и конечной точками
     filtered_obstacles = []
@@ -158,45 +246,48 @@ def create_maze_with_pattern():
         if start_dist > 3 and goal_dist > 3:  # Увеличиваем зону без препятствий
             filtered_obstacles.append(obs)
     
-    # Проверяем, существует ли путь от начала к концу
-    temp_astar = AStar(start, goal, filtered_obstacles)
-    path_exists = check_path_exists(temp_astar)
+    # Проверяем, существует ли путь от начала к концу: компоненты связности считаются один раз
+    reachability = Reachability(GridGraph(size, size, filtered_obstacles))
     
     # Если путь не существует, пробуем удалить препятствия до тех пор,
     # пока путь не появится
-    if not path_exists:
+    if not reachability.connected(start, goal):
         # Создаем список препятствий, которые могут быть удалены
         # (не внешние стены)
         removable_obstacles = [obs for obs in filtered_obstacles 
-                              if obs[0] != 0 and obs[0] != GRID_SIZE-1 
-                              and obs[1] != 0 and obs[1] != GRID_SIZE-1]
+                              if obs[0] != 0 and obs[0] != size-1 
+                              and obs[1] != 0 and obs[1] != size-1]
         
         # Перемешиваем список для случайного порядка удаления
-        random.shuffle(removable_obstacles)
+        rng.shuffle(removable_obstacles)
         
-        # Постепенно удаляем препятствия, пока не появится путь
+        # Постепенно удаляем препятствия, пока не появится путь. Клетка может встречаться
+        # в списке несколько раз (стена и остров) и освобождается, когда удалены все её копии
+        remaining = collections.Counter(filtered_obstacles)
+        removed = collections.Counter()
         for obs in removable_obstacles:
-            # Удаляем препятствие из списка
-            filtered_obstacles.remove(obs)
-            
-            # Проверяем, существует ли теперь путь
-            temp_astar = AStar(start, goal, filtered_obstacles)
-            if check_path_exists(temp_astar):
-                break
+            removed[obs] += 1
+            remaining[obs] -= 1
+            if remaining[obs] == 0:
+                # Присоединяем освободившуюся клетку к компонентам соседей и проверяем путь
+                reachability.remove_obstacle(obs)
+                if reachability.connected(start, goal):
+                    break
+        
+        # Из списка уходят первые вхождения удалённых препятствий, как при list.remove
+        kept = []
+        for obs in filtered_obstacles:
+            if removed[obs]:
+                removed[obs] -= 1
+            else:
+                kept.append(obs)
+        filtered_obstacles = kept
     
     return filtered_obstacles, start, goal
 
 def check_path_exists(astar_instance):
-    """Проверяет, существует ли путь от начала к концу"""
-    # Создаем глубокую копию для безопасной проверки
-    astar_copy = copy.deepcopy(astar_instance)
-    
-    # Запускаем алгоритм до завершения
-    while astar_copy.step():
-        if astar_copy.path_complete:
-            return True
-    
-    return False
+    """Проверяет, существует ли путь от начала к концу (по компонентам связности, без поиска)"""
+    return Reachability(astar_instance.graph).connected(astar_instance.start, astar_instance.goal)
 
 def main():
     try:
@@ -211,11 +302,12 @@ def main():
         
         clock = pygame.time.Clock()
         
-        # Используем функцию создания лабиринта
-        obstacles, start, goal = create_maze_with_pattern()
+        # Используем функцию создания лабиринта; генератор общий для всех перегенераций
+        rng = np.random.default_rng(SEED)
+        obstacles, start, goal = create_maze_with_pattern(rng)
         
         # Создаем объект алгоритма A*
-        astar = AStar(start, goal, obstacles)
+        astar = AStar(start, goal, obstacles, mode=MODE, heuristic=HEURISTIC, weight=WEIGHT)
         
         print(f"Начальная точка: {start}")
         print(f"Целевая точка: {goal}")
@@ -238,8 +330,8 @@ def main():
                         running = False
                     elif event.key == pygame.K_r:
                         # Перегенерация лабиринта
-                        obstacles, start, goal = create_maze_with_pattern()
-                        astar = AStar(start, goal, obstacles)
+                        obstacles, start, goal = create_maze_with_pattern(rng)
+                        astar = AStar(start, goal, obstacles, mode=MODE, heuristic=HEURISTIC, weight=WEIGHT)
                         print(f"Лабиринт перегенерирован. Препятствий: {len(obstacles)}")
             
             screen.fill(WHITE)
@@ -294,7 +386,7 @@ def main():
                     if astar.path_complete:
                         # Отображаем финальный путь
                         astar.current_path = astar.get_path()
-                        print(f"Путь построен! Количество шагов: {astar.step_count}")
+                        print(f"Путь построен ({astar.mode})! Раскрыто узлов: {astar.step_count}")
                         print(f"Длина пути: {len(astar.current_path)}")
                 else:
                     print("Путь не найден - такого не должно быть при корректной генерации лабиринта")
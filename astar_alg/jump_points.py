@@ -0,0 +1,165 @@
+"""Jump Point Search (JPS) и JPS+ на 8-связной сетке GridGraph.
+
+Переходы те же, что у обычного A*: в любую свободную соседнюю клетку, по
+диагонали без ограничений на углы, со стоимостью 1 или sqrt(2). JPS не кладёт
+в очередь клетки открытых участков, а прыгает по прямой до следующей точки
+прыжка - клетки с вынужденным соседом, через которую может пройти оптимальный
+путь. JPS+ берёт расстояния прыжков из заранее посчитанной таблицы.
+"""
+import os
+import sys
+from array import array
+
+import numpy as np
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), 'common'))
+from grid_graph import DIAGONAL_COST
+
+# Направления (строка, столбец) в том же порядке, что и смещения GridGraph.moves
+DIRECTIONS = tuple((dr, dc) for dr in (-1, 0, 1) for dc in (-1, 0, 1) if dr or dc)
+DIRECTION_INDEX = {direction: k for k, direction in enumerate(DIRECTIONS)}
+
+
+def sign(value):
+    return (value > 0) - (value < 0)
+
+
+def has_forced(blocked, stride, index, dr, dc):
+    """Есть ли у клетки, в которую пришли направлением (dr, dc), вынужденный сосед"""
+    if dr and dc:
+        return ((blocked[index - dr * stride] and not blocked[index - dr * stride + dc])
+                or (blocked[index - dc] and not blocked[index + dr * stride - dc]))
+    if dr:
+        return ((blocked[index - 1] and not blocked[index + dr * stride - 1])
+                or (blocked[index + 1] and not blocked[index + dr * stride + 1]))
+    return ((blocked[index - stride] and not blocked[index - stride + dc])
+            or (blocked[index + stride] and not blocked[index + stride + dc]))
+
+
+def pruned_directions(blocked, stride, index, dr, dc):
+    """Естественные и вынужденные направления из клетки, в которую пришли направлением (dr, dc)"""
+    if dr and dc:
+        directions = [(dr, 0), (0, dc), (dr, dc)]
+        if blocked[index - dr * stride]:
+            directions.append((-dr, dc))
+        if blocked[index - dc]:
+            directions.append((dr, -dc))
+    elif dr:
+        directions = [(dr, 0)]
+        if blocked[index - 1]:
+            directions.append((dr, -1))
+        if blocked[index + 1]:
+            directions.append((dr, 1))
+    else:
+        directions = [(0, dc)]
+        if blocked[index - stride]:
+            directions.append((-1, dc))
+        if blocked[index + stride]:
+            directions.append((1, dc))
+    return directions
+
+
+def jump(blocked, stride, index, dr, dc, goal):
+    """Первая точка прыжка из index в направлении (dr, dc); None, если впереди только стена"""
+    offset = dr * stride + dc
+    while True:
+        index += offset
+        if blocked[index]:
+            return None
+        if index == goal or has_forced(blocked, stride, index, dr, dc):
+            return index
+        # По диагонали клетка - точка прыжка, если из неё есть прыжок по одной из составляющих
+        if dr and dc and (jump(blocked, stride, index, dr, 0, goal) is not None
+                          or jump(blocked, stride, index, 0, dc, goal) is not None):
+            return index
+
+
+def _shifted(blocked, dr, dc):
+    """shifted[r, c] = blocked[r + dr, c + dc]; за краем массива - препятствие"""
+    rows, cols = blocked.shape
+    shifted = np.ones_like(blocked)
+    shifted[max(-dr, 0):rows - max(dr, 0), max(-dc, 0):cols - max(dc, 0)] = \
+        blocked[max(dr, 0):rows - max(-dr, 0), max(dc, 0):cols - max(-dc, 0)]
+    return shifted
+
+
+def _sweep(blocked, stop, dr, dc):
+    """Расстояния прыжков для направления с dr != 0: строки проходятся навстречу движению"""
+    rows, cols = blocked.shape
+    distances = np.zeros(blocked.shape, dtype=np.int32)
+    inner, ahead = slice(1, cols - 1), slice(1 + dc, cols - 1 + dc)
+    for r in (range(rows - 2, 0, -1) if dr > 0 else range(1, rows - 1)):
+        following = distances[r + dr, ahead]
+        step = np.where(following > 0, following + 1, following - 1)
+        step = np.where(stop[r + dr, ahead], 1, step)
+        distances[r, inner] = np.where(blocked[r + dr, ahead], 0, step)
+    return distances
+
+
+class JumpTable:
+    """Таблица JPS+: для каждой клетки и направления - расстояние до точки прыжка.
+
+    distances[k][index] > 0 - через столько шагов в направлении DIRECTIONS[k]
+    лежит точка прыжка; <= 0 - минус число свободных клеток до стены. Таблица
+    строится один раз на граф за O(8 * N^2) векторными проходами и годится для
+    любых пар старт/цель, пока препятствия не меняются.
+    """
+
+    def __init__(self, graph):
+        self.graph = graph
+        blocked = np.frombuffer(graph.blocked, dtype=np.uint8).reshape(graph.rows + 2, graph.stride) != 0
+        tables = {}
+        # Сначала прямые направления: от них зависят точки прыжка на диагоналях
+        for dr, dc in sorted(DIRECTIONS, key=lambda d: bool(d[0] and d[1])):
+            if dr and dc:
+                forced = ((_shifted(blocked, -dr, 0) & ~_shifted(blocked, -dr, dc))
+                          | (_shifted(blocked, 0, -dc) & ~_shifted(blocked, dr, -dc)))
+                stop = forced | (tables[(dr, 0)] > 0) | (tables[(0, dc)] > 0)
+            else:
+                forced = np.zeros_like(blocked)
+                for pr, pc in ((dc, dr), (-dc, -dr)):
+                    forced |= _shifted(blocked, pr, pc) & ~_shifted(blocked, pr + dr, pc + dc)
+                stop = forced
+            if dr:
+                tables[(dr, dc)] = _sweep(blocked, stop, dr, dc)
+            else:
+                # Движение вдоль строки - это проход по столбцам транспонированной сетки
+                tables[(dr, dc)] = _sweep(blocked.T, stop.T, dc, dr).T
+        self.distances = [array('i', np.ascontiguousarray(tables[d]).tobytes()) for d in DIRECTIONS]
+
+    def jump(self, index, dr, dc, goal):
+        """Точка прыжка из index в направлении (dr, dc) или клетка на пути к цели; None - стена"""
+        distance = self.distances[DIRECTION_INDEX[(dr, dc)]][index]
+        stride = self.graph.stride
+        row, col = divmod(index, stride)
+        goal_row, goal_col = divmod(goal, stride)
+        dy, dx = goal_row - row, goal_col - col
+        if sign(dy) == dr and sign(dx) == dc:
+            # Цель впереди по прямой или в четверти диагонали: останавливаемся на её строке или столбце
+            steps = min(abs(dy), abs(dx)) if dr and dc else abs(dy) + abs(dx)
+            if steps <= abs(distance):
+                return index + steps * (dr * stride + dc)
+        return index + distance * (dr * stride + dc) if distance > 0 else None
+
+
+def successors(graph, index, parent, goal, table=None):
+    """Точки прыжка из клетки index: список пар (индекс, стоимость); table - JumpTable для JPS+"""
+    blocked, stride = graph.blocked, graph.stride
+    row, col = divmod(index, stride)
+    if parent is None:
+        directions = DIRECTIONS
+    else:
+        parent_row, parent_col = divmod(parent, stride)
+        directions = pruned_directions(blocked, stride, index, sign(row - parent_row), sign(col - parent_col))
+    result = []
+    for dr, dc in directions:
+        if table is None:
+            target = jump(blocked, stride, index, dr, dc, goal)
+        else:
+            target = table.jump(index, dr, dc, goal)
+        if target is None:
+            continue
+        target_row, target_col = divmod(target, stride)
+        steps = max(abs(target_row - row), abs(target_col - col))
+        result.append((target, steps * DIAGONAL_COST if dr and dc else steps))
+    return result
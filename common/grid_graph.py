@@ -0,0 +1,63 @@
+import math
+
+import numpy as np
+
+DIAGONAL_COST = math.sqrt(2)
+
+
+class GridGraph:
+    """8-связная сетка клеток в плоском массиве.
+
+    Занятость хранится в bytearray (1 - препятствие) с рамкой из занятых клеток
+    шириной в одну клетку, поэтому соседи находятся прибавлением заранее
+    посчитанных смещений, без проверок границ. Клетка (строка, столбец) имеет
+    индекс (строка + 1) * stride + (столбец + 1).
+    """
+
+    def __init__(self, rows, cols, obstacles=()):
+        """Пустая сетка rows x cols с препятствиями из списка клеток (строка, столбец)"""
+        self.rows = rows
+        self.cols = cols
+        self.stride = cols + 2
+        frame = np.ones((rows + 2, self.stride), dtype=np.uint8)
+        frame[1:-1, 1:-1] = 0
+        self.blocked = bytearray(frame.tobytes())
+        for i, j in obstacles:
+            if 0 <= i < rows and 0 <= j < cols:
+                self.blocked[(i + 1) * self.stride + j + 1] = 1
+        # Смещения соседей и стоимости переходов (1 - по стороне, sqrt(2) - по диагонали)
+        # в том же порядке, в каком планировщики раньше перебирали dx, dy из [-1, 0, 1]
+        self.moves = tuple((dr * self.stride + dc, DIAGONAL_COST if dr and dc else 1)
+                           for dr in (-1, 0, 1) for dc in (-1, 0, 1) if dr or dc)
+
+    @classmethod
+    def from_grid(cls, grid):
+        """Сетка из массива или списка списков [строка][столбец] (ненулевое - препятствие)"""
+        grid = np.asarray(grid) != 0
+        graph = cls(*grid.shape)
+        graph.occupancy()[:] = grid
+        return graph
+
+    def __len__(self):
+        """Размер плоского массива вместе с рамкой"""
+        return len(self.blocked)
+
+    def occupancy(self):
+        """Представление занятости [строка, столбец] без рамки; изменения видны в графе"""
+        frame = np.frombuffer(self.blocked, dtype=np.uint8).reshape(self.rows + 2, self.stride)
+        return frame[1:-1, 1:-1]
+
+    def index(self, cell):
+        return (cell[0] + 1) * self.stride + cell[1] + 1
+
+    def cell(self, index):
+        row, col = divmod(index, self.stride)
+        return (row - 1, col - 1)
+
+    def is_free(self, cell):
+        return 0 <= cell[0] < self.rows and 0 <= cell[1] < self.cols and not self.blocked[self.index(cell)]
+
+    def neighbors(self, index):
+        """Свободные соседи клетки: список пар (индекс, стоимость перехода)"""
+        blocked = self.blocked
+        return [(index + offset, cost) for offset, cost in self.moves if not blocked[index + offset]]
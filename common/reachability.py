@@ -0,0 +1,83 @@
+from array import array
+
+import numpy as np
+
+
+class Reachability:
+    """Компоненты связности свободных клеток GridGraph по 8 соседям (как ходят A* и Dijkstra).
+
+    Компоненты хранятся в системе непересекающихся множеств. Начальная разметка
+    объединяет горизонтальные отрезки свободных клеток, поэтому на открытых
+    картах множеств немного; вопрос "связаны ли две клетки" - два поиска корня,
+    почти O(1). При удалении препятствия клетка присоединяется к соседям, без
+    пересчёта всей карты.
+    """
+
+    def __init__(self, graph):
+        self.graph = graph
+        free = np.frombuffer(graph.blocked, dtype=np.uint8) == 0
+        # Узел множества - горизонтальный отрезок свободных клеток; рамка графа не даёт
+        # отрезкам переходить со строки на строку в плоском массиве
+        starts = free.copy()
+        starts[1:] &= ~free[:-1]
+        nodes = np.where(free, np.cumsum(starts) - 1, -1).astype(np.int32)
+        # Пары отрезков, соседних по вертикали или диагонали
+        stride = graph.stride
+        pairs = []
+        for offset in (stride - 1, stride, stride + 1):
+            below = nodes[offset:]
+            above = nodes[:len(nodes) - offset]
+            both = (above >= 0) & (below >= 0)
+            pairs.append(above[both].astype(np.int64) * len(nodes) + below[both])
+        pairs = np.unique(np.concatenate(pairs))
+        self.node = array('i', nodes.tobytes())
+        self.parent = list(range(int(starts.sum())))
+        self.size = [1] * len(self.parent)
+        for first, second in zip((pairs // len(nodes)).tolist(), (pairs % len(nodes)).tolist()):
+            self.union(first, second)
+
+    def find(self, node):
+        parent = self.parent
+        while parent[node] != node:
+            parent[node] = parent[parent[node]]  # Сжатие пути делением пополам
+            node = parent[node]
+        return node
+
+    def union(self, first, second):
+        first, second = self.find(first), self.find(second)
+        if first == second:
+            return first
+        if self.size[first] < self.size[second]:
+            first, second = second, first
+        self.parent[second] = first
+        self.size[first] += self.size[second]
+        return first
+
+    def component(self, cell):
+        """Номер компоненты клетки (строка, столбец); None - препятствие или вне сетки"""
+        if not self.graph.is_free(cell):
+            return None
+        return self.find(self.node[self.graph.index(cell)])
+
+    def connected(self, a, b):
+        """Есть ли путь между клетками a и b"""
+        component = self.component(a)
+        return component is not None and component == self.component(b)
+
+    def remove_obstacle(self, cell):
+        """Освобождает клетку в графе и объединяет её компоненту со свободными соседями"""
+        graph = self.graph
+        if not 0 <= cell[0] < graph.rows or not 0 <= cell[1] < graph.cols:
+            return
+        index = graph.index(cell)
+        if not graph.blocked[index]:
+            return
+        graph.blocked[index] = 0
+        node = len(self.parent)
+        self.parent.append(node)
+        self.size.append(1)
+        self.node[index] = node
+        for offset, _ in graph.moves:
+            neighbor = self.node[index + offset]
+            if neighbor >= 0:
+                self.union(node, neighbor)
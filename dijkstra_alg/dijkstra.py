@@ -1,14 +1,20 @@
+import collections
 import math
+import os
 import pygame
 import sys
-import random
-import copy
+import numpy as np
 from heapq import heappush, heappop
 
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), 'common'))
+from grid_graph import GridGraph
+from reachability import Reachability
+
 # Константы для отображения
 GRID_SIZE = 40
 CELL_SIZE = 15
 WINDOW_SIZE = (GRID_SIZE * CELL_SIZE, GRID_SIZE * CELL_SIZE)
+SEED = None  # Зерно генератора лабиринтов (None - каждый запуск новый лабиринт)
 
 # Цвета
 WHITE = (255, 255, 255)
@@ -18,93 +24,83 @@ GREEN = (0, 255, 0)
 BLUE = (0, 0, 255)
 
 class Dijkstra:
-    def __init__(self, start, goal, obstacles):
+    def __init__(self, start, goal, obstacles, grid=None, trace=True):
+        # grid - готовый GridGraph или сетка [строка][столбец] (1 - препятствие) любого размера;
+        # GridGraph можно построить один раз и использовать для многих запросов.
+        # trace - сохранять рёбра поиска для отрисовки (на больших картах лучше выключить)
         self.start = start
         self.goal = goal
         self.obstacles = obstacles
-        self.grid = [[0 for _ in range(GRID_SIZE)] for _ in range(GRID_SIZE)]
-        self.initialize_grid()
+        if grid is None:
+            self.graph = GridGraph(GRID_SIZE, GRID_SIZE, obstacles)
+        elif isinstance(grid, GridGraph):
+            self.graph = grid
+        else:
+            self.graph = GridGraph.from_grid(grid)
+        self.rows = self.graph.rows
+        self.cols = self.graph.cols
+        self.trace = trace
         self.current_path = [start]
         self.current_pos = start
         self.step_count = 0
         self.path_complete = False
-        self.visited = set()
-        self.distances = {start: 0}
-        self.previous = {start: None}
-        self.pq = [(0, start)]
+        # Внутри поиск идёт по целочисленным индексам клеток графа
+        self.start_index = self.graph.index(start)
+        self.goal_index = self.graph.index(goal)
+        self.visited = bytearray(len(self.graph))
+        self.distances = {self.start_index: 0}
+        self.previous = {self.start_index: None}
+        self.pq = [(0, self.start_index)]
         self.path_edges = []
 
-    def initialize_grid(self):
-        # Инициализация сетки: 0 - свободно, 1 - препятствие
-        for i in range(GRID_SIZE):
-            for j in range(GRID_SIZE):
-                if (i, j) in self.obstacles:
-                    self.grid[i][j] = 1
-
-    def get_neighbors(self, current):
-        x, y = current
-        neighbors = []
-        # Проверяем все 8 направлений
-        for dx in [-1, 0, 1]:
-            for dy in [-1, 0, 1]:
-                if dx == 0 and dy == 0:
-                    continue
-                new_x, new_y = x + dx, y + dy
-                if (0 <= new_x < GRID_SIZE and 
-                    0 <= new_y < GRID_SIZE and 
-                    self.grid[new_x][new_y] == 0):
-                    neighbors.append((new_x, new_y))
-        return neighbors
-
     def step(self):
         if not self.pq or self.path_complete:
             return False
 
         current_distance, current = heappop(self.pq)
         
-        if current == self.goal:
+        if current == self.goal_index:
             self.path_complete = True
             return True
             
-        if current in self.visited:
+        if self.visited[current]:
             return True
             
-        self.visited.add(current)
-        self.current_pos = current
+        self.visited[current] = 1
+        self.current_pos = self.graph.cell(current)
         
-        for neighbor in self.get_neighbors(current):
+        blocked = self.graph.blocked
+        for offset, cost in self.graph.moves:
+            neighbor = current + offset
+            if blocked[neighbor]:
+                continue
             # Стоимость перехода (1 для ортогональных, sqrt(2) для диагональных)
-            dx = abs(neighbor[0] - current[0])
-            dy = abs(neighbor[1] - current[1])
-            cost = math.sqrt(2) if dx == 1 and dy == 1 else 1
-            
             distance = current_distance + cost
             
-            if neighbor not in self.distances or distance < self.distances[neighbor]:
+            if distance < self.distances.get(neighbor, math.inf):
                 self.distances[neighbor] = distance
                 self.previous[neighbor] = current
                 heappush(self.pq, (distance, neighbor))
-                # Добавляем ребро для отрисовки
-                self.path_edges.append((current, neighbor))
+                if self.trace:
+                    # Добавляем ребро для отрисовки
+                    self.path_edges.append((self.current_pos, self.graph.cell(neighbor)))
 
         self.step_count += 1
         # Обновляем текущий путь для визуализации
-        if current != self.start:
-            prev = self.previous[current]
-            if prev is not None:
-                self.current_path.append(current)
+        if self.trace and current != self.start_index:
+            self.current_path.append(self.current_pos)
         
         return True
 
     def get_path(self):
         path = []
-        current = self.goal
+        current = self.goal_index
         while current is not None:
-            path.append(current)
+            path.append(self.graph.cell(current))
             current = self.previous.get(current)
         return list(reversed(path))
 
-def generate_maze_obstacles(grid_size, start, goal, wall_density=0.3):
+def generate_maze_obstacles(grid_size, start, goal, wall_density=0.3, rng=None):
     """Генерирует лабиринт из препятствий
     
     Args:
@@ -112,10 +108,13 @@ def generate_maze_obstacles(grid_size, start, goal, wall_density=0.3):
         start: начальная точка (x, y)
         goal: целевая точка (x, y)
         wall_density: плотность препятствий (0.0 - 1.0)
+        rng: numpy.random.Generator или зерно
         
     Returns:
         list: список координат препятствий
     """
+    rng = np.random.default_rng(rng)
+    walls = rng.random((grid_size, grid_size)) < wall_density  # Все случайные числа одним блоком
     obstacles = []
     
     # Создаем препятствия с заданной плотностью
@@ -127,7 +126,7 @@ def generate_maze_obstacles(grid_size, start, goal, wall_density=0.3):
                 start_dist = math.sqrt((i - start[0])**2 + (j - start[1])**2)
                 goal_dist = math.sqrt((i - goal[0])**2 + (j - goal[1])**2)
                 
-                if start_dist > 3 and goal_dist > 3 and random.random() < wall_density:
+                if start_dist > 3 and goal_dist > 3 and walls[i, j]:
                     obstacles.append((i, j))
     
     # Добавляем внешние стены
@@ -146,57 +145,55 @@ def generate_maze_obstacles(grid_size, start, goal, wall_density=0.3):
     return obstacles
 
 def check_path_exists(dijkstra_instance):
-    """Проверяет, существует ли путь от начала к концу"""
-    # Создаем глубокую копию для безопасной проверки
-    dijkstra_copy = copy.deepcopy(dijkstra_instance)
-    
-    # Запускаем алгоритм до завершения
-    while dijkstra_copy.step():
-        if dijkstra_copy.path_complete:
-            return True
-    
-    return False
+    """Проверяет, существует ли путь от начала к концу (по компонентам связности, без поиска)"""
+    return Reachability(dijkstra_instance.graph).connected(dijkstra_instance.start, dijkstra_instance.goal)
+
+def create_maze_with_pattern(rng=None, size=GRID_SIZE):
+    """Создаёт лабиринт с более структурированным паттерном и гарантированным путём.
 
-def create_maze_with_pattern():
-    """Создаёт лабиринт с более структурированным паттерном и гарантированным путём"""
+    rng - numpy.random.Generator или зерно; с одинаковым зерном лабиринт повторяется.
+    size - размер квадратного поля в клетках; число островов растёт с площадью.
+    """
+    rng = np.random.default_rng(rng)
     obstacles = []
     
     # Добавляем внешние стены
-    for i in range(GRID_SIZE):
+    for i in range(size):
         obstacles.append((i, 0))
-        obstacles.append((i, GRID_SIZE-1))
+        obstacles.append((i, size-1))
     
-    for j in range(GRID_SIZE):
+    for j in range(size):
         obstacles.append((0, j))
-        obstacles.append((GRID_SIZE-1, j))
+        obstacles.append((size-1, j))
     
     # Создаем горизонтальные стены с проходами
-    for i in range(5, GRID_SIZE-5, 6):
-        passage = random.randint(2, GRID_SIZE-3)
-        for j in range(1, GRID_SIZE-1):
+    for i in range(5, size-5, 6):
+        passage = int(rng.integers(2, size-2))
+        for j in range(1, size-1):
             if j != passage and j != passage+1:
                 obstacles.append((i, j))
     
     # Создаем вертикальные стены с проходами
-    for j in range(5, GRID_SIZE-5, 6):
-        passage = random.randint(2, GRID_SIZE-3)
-        for i in range(1, GRID_SIZE-1):
+    for j in range(5, size-5, 6):
+        passage = int(rng.integers(2, size-2))
+        for i in range(1, size-1):
             if i != passage and i != passage+1:
                 obstacles.append((i, j))
     
     # Добавляем случайные острова препятствий
-    for _ in range(8):  # Уменьшаем количество островов для большей проходимости
-        island_x = random.randint(5, GRID_SIZE-6)
-        island_y = random.randint(5, GRID_SIZE-6)
-        
+    # Центры и клетки всех островов выбираются одним блоком
+    island_count = max(8, 8 * size * size // (GRID_SIZE * GRID_SIZE))  # Уменьшаем количество островов для большей проходимости
+    islands = rng.integers(5, size-5, size=(island_count, 2))
+    island_cells = rng.random((island_count, 5, 5)) < 0.6  # Уменьшаем вероятность препятствия для большей проходимости
+    for (island_x, island_y), cells in zip(islands.tolist(), island_cells):
         for dx in range(-2, 3):
             for dy in range(-2, 3):
-                if random.random() < 0.6:  # Уменьшаем вероятность препятствия для большей проходимости
+                if cells[dx + 2, dy + 2]:
                     obstacles.append((island_x + dx, island_y + dy))
     
     # Определяем начальную и конечную точки
     start = (5, 5)
-    goal = (GRID_SIZE-6, GRID_SIZE-6)
+    goal = (size-6, size-6)
     
     # Убираем препятствия рядом с начальной и конечной точками
     filtered_obstacles = []
@@ -207,31 +204,42 @@ def create_maze_with_pattern():
         if start_dist > 3 and goal_dist > 3:  # Увеличиваем зону без препятствий
             filtered_obstacles.append(obs)
     
-    # Проверяем, существует ли путь от начала к концу
-    temp_dijkstra = Dijkstra(start, goal, filtered_obstacles)
-    path_exists = check_path_exists(temp_dijkstra)
+    # Проверяем, существует ли путь от начала к концу: компоненты связности считаются один раз
+    reachability = Reachability(GridGraph(size, size, filtered_obstacles))
     
     # Если путь не существует, пробуем удалить препятствия до тех пор,
     # пока путь не появится
-    if not path_exists:
+    if not reachability.connected(start, goal):
         # Создаем список препятствий, которые могут быть удалены
         # (не внешние стены)
         removable_obstacles = [obs for obs in filtered_obstacles 
-                              if obs[0] != 0 and obs[0] != GRID_SIZE-1 
-                              and obs[1] != 0 and obs[1] != GRID_SIZE-1]
+                              if obs[0] != 0 and obs[0] != size-1 
+                              and obs[1] != 0 and obs[1] != size-1]
         
         # Перемешиваем список для случайного порядка удаления
-        random.shuffle(removable_obstacles)
+        rng.shuffle(removable_obstacles)
         
-        # Постепенно удаляем препятствия, пока не появится путь
+        # Постепенно удаляем препятствия, пока не появится путь. Клетка может встречаться
+        # в списке несколько раз (стена и остров) и освобождается, когда удалены все её копии
+        remaining = collections.Counter(filtered_obstacles)
+        removed = collections.Counter()
         for obs in removable_obstacles:
-            # Удаляем препятствие из списка
-            filtered_obstacles.remove(obs)
-            
-            # Проверяем, существует ли теперь путь
-            temp_dijkstra = Dijkstra(start, goal, filtered_obstacles)
-            if check_path_exists(temp_dijkstra):
-                break
+            removed[obs] += 1
+            remaining[obs] -= 1
+            if remaining[obs] == 0:
+                # Присоединяем освободившуюся клетку к компонентам соседей и проверяем путь
+                reachability.remove_obstacle(obs)
+                if reachability.connected(start, goal):
+                    break
+        
+        # Из списка уходят первые вхождения удалённых препятствий, как при list.remove
+        kept = []
+        for obs in filtered_obstacles:
+            if removed[obs]:
+                removed[obs] -= 1
+            else:
+                kept.append(obs)
+        filtered_obstacles = kept
     
     return filtered_obstacles, start, goal
 
@@ -248,8 +256,9 @@ def main():
         
         clock = pygame.time.Clock()
         
-        # Используем функцию создания лабиринта с гарантией пути
-        obstacles, start, goal = create_maze_with_pattern()
+        # Используем функцию создания лабиринта с гарантией пути; генератор общий для всех перегенераций
+        rng = np.random.default_rng(SEED)
+        obstacles, start, goal = create_maze_with_pattern(rng)
         
         # Создаем объект алгоритма Дейкстры
         dijkstra = Dijkstra(start, goal, obstacles)
@@ -275,7 +284,7 @@ def main():
                         running = False
                     elif event.key == pygame.K_r:
                         # Перегенерация лабиринта с гарантией пути
-                        obstacles, start, goal = create_maze_with_pattern()
+                        obstacles, start, goal = create_maze_with_pattern(rng)
                         dijkstra = Dijkstra(start, goal, obstacles)
                         print(f"Лабиринт перегенерирован. Препятствий: {len(obstacles)}")
             
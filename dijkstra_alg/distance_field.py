@@ -0,0 +1,194 @@
+"""Поля расстояний Дейкстры: поиск до конца от одного или нескольких источников.
+
+Обычный Dijkstra останавливается на цели, и каждый новый запрос из того же
+старта повторяет поиск. Поле расстояний считается один раз: плотный массив
+расстояний до ближайшего источника и массив предшественников, по которому путь
+к любой клетке восстанавливается за O(длины пути). Поля можно сохранять на диск:
+ключ кеша - хеш карты и набор источников; когда кеш больше CACHE_LIMIT, давно
+не использованные поля удаляются.
+
+Пример:
+    graph = GridGraph.from_grid(grid)
+    field = load_or_compute(graph, [dock_a, dock_b])  # клетки (строка, столбец)
+    path = field.path_to(pick)  # от ближайшего дока до pick; None - недостижимо
+"""
+import hashlib
+import math
+import os
+import sys
+from heapq import heappush, heappop
+
+import numpy as np
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), 'common'))
+from grid_graph import GridGraph
+
+CACHE_DIR = os.path.join(os.path.expanduser('~'), '.cache', 'pathplanning_fields')
+CACHE_VERSION = 1  # Меняется при изменении формата кеша
+CACHE_LIMIT = 256 * 1024 * 1024  # Предел размера кеша на диске, байты (поле - 12 байт на клетку)
+
+
+class DistanceField:
+    """Результат поиска до конца.
+
+    distances - float64 [строка, столбец], расстояние до ближайшего источника
+    (inf - препятствие или недостижимая клетка); predecessors - int32 того же
+    размера, плоский номер (строка * cols + столбец) предыдущей клетки пути,
+    -1 у источников и недостижимых клеток.
+    """
+
+    def __init__(self, distances, predecessors, sources, expanded=0):
+        self.distances = distances
+        self.predecessors = predecessors
+        self.sources = sources
+        self.expanded = expanded  # Число раскрытых клеток при построении; 0 - поле взято из кеша
+
+    @property
+    def shape(self):
+        return self.distances.shape
+
+    def distance(self, cell):
+        return float(self.distances[tuple(cell)])
+
+    def reachable(self, cell):
+        # Клетка может прийти списком: индекс массива списком выбрал бы строки, а не клетку
+        cell = tuple(cell)
+        rows, cols = self.shape
+        return 0 <= cell[0] < rows and 0 <= cell[1] < cols and self.distances[cell] < math.inf
+
+    def path_to(self, target):
+        """Путь от ближайшего источника до target: список клеток (строка, столбец) или None"""
+        target = tuple(target)
+        if not self.reachable(target):
+            return None
+        cols = self.shape[1]
+        predecessors = self.predecessors.ravel()
+        path = [target]
+        current = int(predecessors[target[0] * cols + target[1]])
+        while current >= 0:
+            path.append(divmod(current, cols))
+            current = int(predecessors[current])
+        path.reverse()
+        return path
+
+    def source_of(self, target):
+        """Источник, к которому ближе всего target; None - недостижимо"""
+        path = self.path_to(target)
+        return path[0] if path else None
+
+
+def compute(graph, sources):
+    """Dijkstra до конца из всех sources (клетки графа) одновременно"""
+    sources = sorted(set(map(tuple, sources)))
+    if not sources:
+        raise ValueError("Нужен хотя бы один источник")
+    for cell in sources:
+        if not graph.is_free(cell):
+            raise ValueError(f"Источник {cell} вне карты или в препятствии")
+
+    size = len(graph)
+    distances = [math.inf] * size
+    previous = [-1] * size
+    visited = bytearray(size)
+    blocked = graph.blocked
+    moves = graph.moves
+    queue = []
+    for cell in sources:
+        index = graph.index(cell)
+        distances[index] = 0
+        queue.append((0, index))
+    queue.sort()
+    expanded = 0
+    while queue:
+        current_distance, current = heappop(queue)
+        if visited[current]:
+            continue
+        visited[current] = 1
+        expanded += 1
+        for offset, cost in moves:
+            neighbor = current + offset
+            if blocked[neighbor]:
+                continue
+            # Стоимость перехода (1 для ортогональных, sqrt(2) для диагональных)
+            distance = current_distance + cost
+            if distance < distances[neighbor]:
+                distances[neighbor] = distance
+                previous[neighbor] = current
+                heappush(queue, (distance, neighbor))
+
+    # Плоские индексы графа с рамкой переводятся в индексы сетки rows x cols
+    frame = (graph.rows + 2, graph.stride)
+    distances = np.array(distances, dtype=np.float64).reshape(frame)[1:-1, 1:-1]
+    previous = np.array(previous, dtype=np.int64)
+    inner = previous >= 0
+    row, col = np.divmod(previous[inner], graph.stride)
+    previous[inner] = (row - 1) * graph.cols + (col - 1)
+    predecessors = previous.reshape(frame)[1:-1, 1:-1].astype(np.int32)
+    return DistanceField(np.ascontiguousarray(distances), np.ascontiguousarray(predecessors),
+                         sources, expanded)
+
+
+def cache_key(graph, sources):
+    """Ключ кеша: хеш размеров и занятости карты, затем хеш набора источников"""
+    map_hash = hashlib.sha1(f"{graph.rows}x{graph.cols}|".encode() + bytes(graph.blocked)).hexdigest()[:16]
+    cells = sorted(set(map(tuple, sources)))
+    source_hash = hashlib.sha1(f"{CACHE_VERSION}|{cells}".encode()).hexdigest()[:16]
+    return f"{map_hash}-{source_hash}"
+
+
+def load_or_compute(graph, sources, cache_dir=CACHE_DIR, use_cache=True, cache_limit=CACHE_LIMIT):
+    """Поле расстояний из кеша на диске (отображается в память) или новый расчёт с записью в кеш"""
+    if not use_cache:
+        return compute(graph, sources)
+    key = cache_key(graph, sources)
+    distances_file = os.path.join(cache_dir, key + '.distances.npy')
+    predecessors_file = os.path.join(cache_dir, key + '.predecessors.npy')
+    if os.path.exists(distances_file) and os.path.exists(predecessors_file):
+        try:
+            field = DistanceField(np.load(distances_file, mmap_mode='r'), np.load(predecessors_file, mmap_mode='r'),
+                                  sorted(set(map(tuple, sources))))
+            os.utime(predecessors_file)  # Время изменения - момент последнего использования, см. trim_cache
+            return field
+        except FileNotFoundError:  # Поле удалил trim_cache другого процесса
+            pass
+    field = compute(graph, sources)
+    save_cache(field, distances_file, predecessors_file)
+    trim_cache(cache_dir, cache_limit)
+    return field
+
+
+def save_cache(field, distances_file, predecessors_file):
+    """Атомарная запись: параллельные процессы не увидят недописанный файл"""
+    os.makedirs(os.path.dirname(distances_file), exist_ok=True)
+    suffix = f'.{os.getpid()}.tmp'
+    for name, values in ((distances_file, field.distances), (predecessors_file, field.predecessors)):
+        with open(name + suffix, 'wb') as f:
+            np.save(f, values)
+    # Массив предшественников записывается последним: по нему проверяется наличие кеша
+    os.replace(distances_file + suffix, distances_file)
+    os.replace(predecessors_file + suffix, predecessors_file)
+
+
+def trim_cache(cache_dir=CACHE_DIR, limit=CACHE_LIMIT):
+    """Удаляет давно не использованные поля, пока кеш на диске больше limit байт"""
+    fields = []
+    for name in os.listdir(cache_dir):
+        if not name.endswith('.predecessors.npy'):
+            continue
+        key = name[:-len('.predecessors.npy')]
+        files = [os.path.join(cache_dir, key + '.distances.npy'), os.path.join(cache_dir, name)]
+        try:
+            stats = [os.stat(file) for file in files]
+        except FileNotFoundError:
+            continue
+        fields.append((stats[1].st_mtime, stats[0].st_size + stats[1].st_size, files))
+    total = sum(size for _, size, _ in fields)
+    for _, size, files in sorted(fields):
+        if total <= limit:
+            break
+        for file in files:
+            try:
+                os.remove(file)
+            except FileNotFoundError:
+                pass
+        total -= size
@@ -5,7 +5,6 @@ import matplotlib.pyplot as plt
 import pygame
 import sys
 import math
-import random
 from matplotlib.patches import Circle
 import os
 
@@ -13,6 +12,7 @@ import os
 WINDOW_WIDTH = 800
 WINDOW_HEIGHT = 600
 FPS = 30
+SEED = None  # Зерно генератора случайных чисел симуляции (None - случайное)
 WHITE = (255, 255, 255)
 BLACK = (0, 0, 0)
 RED = (255, 0, 0)
@@ -143,7 +143,7 @@ class FuzzyLogicRobot:
                 return 0, 5.0  # Прямо со средней скоростью
 
 class Robot:
-    def __init__(self, x, y, angle=0, radius=15):
+    def __init__(self, x, y, angle=0, radius=15, rng=None):
         self.x = x
         self.y = y
         self.angle = angle  # угол в градусах
@@ -155,6 +155,7 @@ class Robot:
         self.stuck_counter = 0  # счетчик для определения, когда робот застрял
         self.last_positions = []  # список последних позиций для определения застревания
         self.obstacle_memory = []  # память о недавних препятствиях
+        self.rng = np.random.default_rng(rng)  # генератор для манёвров при застревании (зерно или Generator)
 
     def move(self, obstacles, target):
         # Сохраняем текущую позицию для определения застревания
@@ -182,7 +183,7 @@ class Robot:
             # Останавливаем робота и заставляем его повернуть в противоположную сторону
             self.speed = 0
             # Разворот от 120 до 240 градусов (отворачиваем от препятствия)
-            random_angle = random.randint(120, 240)
+            random_angle = int(self.rng.integers(120, 241))
             self.angle = (self.angle + random_angle) % 360
             return
 
@@ -204,7 +205,7 @@ class Robot:
         
         # Если робот застрял, добавляем небольшое случайное отклонение к направлению
         if self.stuck_counter > 0:
-            direction += random.uniform(-45, 45)  # Увеличиваем случайность при застревании
+            direction += self.rng.uniform(-45, 45)  # Увеличиваем случайность при застревании
             self.stuck_counter -= 1
         
         # Применяем дополнительное отклонение, чтобы избежать препятствий из памяти
@@ -248,7 +249,7 @@ class Robot:
             self.x, self.y = original_x, original_y
             self.speed = 0
             # Поворачиваем сильнее при столкновении
-            self.angle = (self.angle + 30 * random.choice([-1, 1])) % 360
+            self.angle = (self.angle + 30 * int(self.rng.choice([-1, 1]))) % 360
             # Увеличиваем счетчик застревания
             self.stuck_counter += 5
         else:
@@ -392,8 +393,8 @@ class Robot:
             
             # Если расстояние очень маленькое, добавим небольшое смещение, чтобы избежать деления на ноль
             if abs(dx) < 0.001 and abs(dy) < 0.001:
-                dx = random.uniform(-1, 1)
-                dy = random.uniform(-1, 1)
+                dx = self.rng.uniform(-1, 1)
+                dy = self.rng.uniform(-1, 1)
             
             # Нормализуем вектор
             length = math.sqrt(dx*dx + dy*dy)
@@ -420,16 +421,17 @@ class Robot:
             self.stuck_counter = 15
 
 class MovingObstacle:
-    def __init__(self, x, y, radius, speed=None):
+    def __init__(self, x, y, radius, speed=None, rng=None):
         self.x = x
         self.y = y
         self.radius = radius
+        self.rng = np.random.default_rng(rng)
         # Если скорость не задана, генерируем случайную скорость
         if speed is None:
             # Скорость от 0.5 до 2.0
-            speed_value = random.uniform(0.5, 2.0)
+            speed_value = self.rng.uniform(0.5, 2.0)
             # Случайное направление в радианах
-            angle = random.uniform(0, 2 * math.pi)
+            angle = self.rng.uniform(0, 2 * math.pi)
             self.vx = speed_value * math.cos(angle)
             self.vy = speed_value * math.sin(angle)
         else:
@@ -496,16 +498,20 @@ class MovingObstacle:
                         self.vy = -self.vy
                     
                     # Добавляем немного случайности, чтобы избежать зацикливания
-                    self.vx += random.uniform(-0.1, 0.1)
-                    self.vy += random.uniform(-0.1, 0.1)
+                    self.vx += self.rng.uniform(-0.1, 0.1)
+                    self.vy += self.rng.uniform(-0.1, 0.1)
                     break
     
     def to_tuple(self):
         """Возвращает кортеж (x, y, radius) для совместимости"""
         return (self.x, self.y, self.radius)
 
-def generate_obstacles(num_obstacles, min_radius=20, max_radius=40, moving_ratio=0.5):
-    """Генерирует список препятствий, часть из которых движется"""
+def generate_obstacles(num_obstacles, min_radius=20, max_radius=40, moving_ratio=0.5, rng=None):
+    """Генерирует список препятствий, часть из которых движется.
+
+    rng - зерно или numpy.random.Generator, общий для генерации и движения препятствий.
+    """
+    rng = np.random.default_rng(rng)
     obstacles = []
     
     # Определяем, сколько препятствий будут движущимися
@@ -514,9 +520,9 @@ def generate_obstacles(num_obstacles, min_radius=20, max_radius=40, moving_ratio
     for i in range(num_obstacles):
         valid = False
         while not valid:
-            radius = random.randint(min_radius, max_radius)
-            x = random.randint(radius, WINDOW_WIDTH - radius)
-            y = random.randint(radius, WINDOW_HEIGHT - radius)
+            radius = int(rng.integers(min_radius, max_radius + 1))
+            x = int(rng.integers(radius, WINDOW_WIDTH - radius + 1))
+            y = int(rng.integers(radius, WINDOW_HEIGHT - radius + 1))
             
             # Проверяем, не перекрывается ли с существующими препятствиями
             valid = True
@@ -543,7 +549,7 @@ def generate_obstacles(num_obstacles, min_radius=20, max_radius=40, moving_ratio
         
         # Создаем препятствие (движущееся или статическое)
         if i < num_moving:
-            obstacles.append(MovingObstacle(x, y, radius))
+            obstacles.append(MovingObstacle(x, y, radius, rng=rng))
         else:
             obstacles.append((x, y, radius))
     
@@ -556,11 +562,14 @@ def main():
     pygame.display.set_caption("Система планирования пути на основе нечеткой логики")
     clock = pygame.time.Clock()
     
+    # Один генератор на всю симуляцию, чтобы запуск с SEED повторялся
+    rng = np.random.default_rng(SEED)
+    
     # Генерация препятствий (половина движущихся, половина статических)
-    obstacles = generate_obstacles(10, moving_ratio=0.5)
+    obstacles = generate_obstacles(10, moving_ratio=0.5, rng=rng)
     
     # Создание робота в начальной позиции
-    robot = Robot(50, 50)
+    robot = Robot(50, 50, rng=rng)
     
     # Целевая точка
     target = (WINDOW_WIDTH - 50, WINDOW_HEIGHT - 50)
@@ -578,8 +587,8 @@ def main():
                 if event.key == pygame.K_ESCAPE:
                     running = False
                 elif event.key == pygame.K_r:  # Сброс симуляции
-                    robot = Robot(50, 50)
-                    obstacles = generate_obstacles(10, moving_ratio=0.5)
+                    robot = Robot(50, 50, rng=rng)
+                    obstacles = generate_obstacles(10, moving_ratio=0.5, rng=rng)
                     simulation_done = False
         
         # Обновление движущихся препятствий
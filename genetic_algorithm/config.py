@@ -1,5 +1,7 @@
 import numpy as np
 
+SEED = None  # Зерно генератора случайных чисел для воспроизводимых экспериментов (None - случайное)
+
 # Параметры функции
 X_MIN, X_MAX = -5, 5
 Y_MIN, Y_MAX = -5, 5
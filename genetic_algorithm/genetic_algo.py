@@ -3,7 +3,7 @@ import time
 from typing import Tuple, List, Dict
 from config import (
     X_MIN, X_MAX, Y_MIN, Y_MAX, POPULATION_SIZES, CROSSOVER_RATES,
-    MAX_GENERATIONS, STAGNATION_GENERATIONS, ELITE_PERCENTAGE
+    MAX_GENERATIONS, STAGNATION_GENERATIONS, ELITE_PERCENTAGE, SEED
 )
 from fitness import (
     calculate_population_fitness, calculate_diversity,
@@ -19,8 +19,11 @@ class GeneticAlgorithm:
         population_size: int,
         crossover_rate: float,
         selection_method: str = 'tournament',
-        crossover_method: str = 'arithmetic'
+        crossover_method: str = 'arithmetic',
+        seed=None
     ):
+        # seed - зерно, SeedSequence или numpy.random.Generator; все случайные числа берутся из него
+        self.rng = np.random.default_rng(seed)
         self.population_size = population_size
         self.crossover_rate = crossover_rate
         self.selection_method = selection_method
@@ -40,7 +43,7 @@ class GeneticAlgorithm:
 
     def initialize_population(self):
         """Инициализация начальной популяции"""
-        self.population = np.random.uniform(
+        self.population = self.rng.uniform(
             low=[X_MIN, Y_MIN],
             high=[X_MAX, Y_MAX],
             size=(self.population_size, 2)
@@ -59,9 +62,9 @@ class GeneticAlgorithm:
         """Выбор родителей с использованием выбранного метода селекции"""
         num_parents = int(self.population_size * (1 - ELITE_PERCENTAGE))
         if self.selection_method == 'tournament':
-            return tournament_selection(self.population, self.fitness, num_parents)
+            return tournament_selection(self.population, self.fitness, num_parents, self.rng)
         else:
-            return roulette_selection(self.population, self.fitness, num_parents)
+            return roulette_selection(self.population, self.fitness, num_parents, self.rng)
 
     def create_next_generation(self):
         """Создание следующего поколения"""
@@ -73,11 +76,11 @@ class GeneticAlgorithm:
 
         # Выбор родителей и создание потомков
         parents = self.select_parents()
-        offspring = create_offspring(parents, self.crossover_method)
+        offspring = create_offspring(parents, self.crossover_method, self.rng)
         
         # Мутация потомков
         mutation_rate = calculate_mutation_rate(self.generation, MAX_GENERATIONS)
-        offspring = mutate_population(offspring, mutation_rate)
+        offspring = mutate_population(offspring, mutation_rate, rng=self.rng)
         
         # Оценка приспособленности потомков
         offspring_fitness = calculate_population_fitness(offspring)
@@ -137,9 +140,13 @@ class GeneticAlgorithm:
             }
         }
 
-def run_experiments() -> List[Dict]:
-    """Проведение экспериментов с разными параметрами"""
+def run_experiments(seed=SEED) -> List[Dict]:
+    """Проведение экспериментов с разными параметрами
+
+    Каждый эксперимент получает независимый поток случайных чисел из общего seed
+    """
     results = []
+    seed_sequence = np.random.SeedSequence(seed)
     
     for pop_size in POPULATION_SIZES:
         for crossover_rate in CROSSOVER_RATES:
@@ -155,7 +162,8 @@ def run_experiments() -> List[Dict]:
                         population_size=pop_size,
                         crossover_rate=crossover_rate,
                         selection_method=selection_method,
-                        crossover_method=crossover_method
+                        crossover_method=crossover_method,
+                        seed=seed_sequence.spawn(1)[0]
                     )
                     
                     result = ga.run()
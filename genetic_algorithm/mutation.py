@@ -4,24 +4,6 @@ from config import (
     DIVERSITY_THRESHOLD, MAX_MUTATION_SIGMA
 )
 
-def gaussian_mutation(x: float, y: float, sigma: float = MUTATION_SIGMA) -> tuple[float, float]:
-    """
-    Гауссова мутация
-    """
-    # Генерация случайных отклонений с нормальным распределением
-    dx = np.random.normal(MUTATION_MEAN, sigma)
-    dy = np.random.normal(MUTATION_MEAN, sigma)
-    
-    # Применение мутации
-    new_x = x + dx
-    new_y = y + dy
-    
-    # Ограничение значений в допустимом диапазоне
-    new_x = np.clip(new_x, X_MIN, X_MAX)
-    new_y = np.clip(new_y, Y_MIN, Y_MAX)
-    
-    return new_x, new_y
-
 def adaptive_mutation(population: np.ndarray, diversity: float) -> float:
     """
     Адаптивная мутация: корректировка σ в зависимости от разнообразия популяции
@@ -34,11 +16,14 @@ def adaptive_mutation(population: np.ndarray, diversity: float) -> float:
 def mutate_population(
     population: np.ndarray,
     mutation_rate: float,
-    diversity: float = None
+    diversity: float = None,
+    rng: np.random.Generator = None
 ) -> np.ndarray:
     """
     Мутация популяции с адаптивным σ
+    Случайные числа для всей популяции генерируются одним блоком
     """
+    rng = np.random if rng is None else rng
     n = len(population)
     mutated_population = population.copy()
     
@@ -46,13 +31,14 @@ def mutate_population(
     current_sigma = adaptive_mutation(population, diversity) if diversity is not None else MUTATION_SIGMA
     
     # Применение мутации к каждой особи с вероятностью mutation_rate
-    for i in range(n):
-        if np.random.random() < mutation_rate:
-            mutated_population[i] = gaussian_mutation(
-                population[i][0],
-                population[i][1],
-                current_sigma
-            )
+    mutated = rng.random(n) < mutation_rate
+    deltas = rng.normal(MUTATION_MEAN, current_sigma, size=(int(mutated.sum()), 2))
+    moved = population[mutated] + deltas
+    
+    # Ограничение значений в допустимом диапазоне
+    moved[:, 0] = np.clip(moved[:, 0], X_MIN, X_MAX)
+    moved[:, 1] = np.clip(moved[:, 1], Y_MIN, Y_MAX)
+    mutated_population[mutated] = moved
     
     return mutated_population
 
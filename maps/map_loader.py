@@ -0,0 +1,251 @@
+"""Загрузка карт из файлов с кешем упакованной карты занятости.
+
+Поддерживаются PNG, PGM (P2/P5), карты ROS (.yaml с изображением) и массивы
+NumPy (.npy). Карта один раз преобразуется в упакованный битовый массив
+(np.packbits по строкам, 1 - препятствие) и сохраняется в кеш; повторная
+загрузка того же файла - это отображение кеша в память без декодирования.
+Когда кеш больше CACHE_LIMIT, давно не использованные карты удаляются.
+
+Пример:
+    occupancy = load_map('warehouse.yaml')
+    grid = occupancy.grid()  # булев массив [y, x], True - препятствие
+"""
+import hashlib
+import json
+import os
+
+import numpy as np
+
+CACHE_DIR = os.path.join(os.path.expanduser('~'), '.cache', 'pathplanning_maps')
+CACHE_VERSION = 1  # Меняется при изменении формата кеша
+CACHE_LIMIT = 256 * 1024 * 1024  # Предел размера кеша на диске, байты
+OCCUPIED_THRESH = 0.65  # Порог занятости ROS map_server по умолчанию
+FREE_THRESH = 0.196  # Порог свободной ячейки ROS map_server по умолчанию
+
+
+class OccupancyMap:
+    """Карта занятости в упакованном виде: по биту на ячейку.
+
+    packed - массив uint8 [height, ceil(width / 8)], обычно отображённый в память.
+    resolution (метров на ячейку) и origin (x, y, theta) берутся из ROS yaml.
+    """
+
+    def __init__(self, packed, width, height, resolution=1.0, origin=(0.0, 0.0, 0.0)):
+        self.packed = packed
+        self.width = width
+        self.height = height
+        self.resolution = resolution
+        self.origin = tuple(origin)
+        self.unpacked = None
+
+    @classmethod
+    def from_grid(cls, grid, **kwargs):
+        grid = np.asarray(grid, dtype=bool)
+        height, width = grid.shape
+        return cls(np.packbits(grid, axis=1), width, height, **kwargs)
+
+    def grid(self):
+        """Распакованный булев массив [y, x], считается один раз"""
+        if self.unpacked is None:
+            self.unpacked = np.unpackbits(self.packed, axis=1, count=self.width).view(bool)
+        return self.unpacked
+
+    def is_occupied(self, x, y):
+        """Проверка одной ячейки прямо по упакованным битам"""
+        if 0 <= x < self.width and 0 <= y < self.height:
+            return bool(self.packed[y, x >> 3] & (0x80 >> (x & 7)))
+        return False
+
+    def nbytes(self):
+        return self.packed.nbytes
+
+
+def load_map(path, obstacle_color=None, cache_dir=CACHE_DIR, use_cache=True, cache_limit=CACHE_LIMIT):
+    """Загружает карту из файла, используя кеш, если он есть.
+
+    obstacle_color - цвет препятствий (R, G, B) для цветных изображений, например
+    карт, нарисованных в интерфейсе RRT; без него ячейка занята, если её тёмность
+    больше порога занятости ROS (неизвестные ячейки тоже считаются занятыми).
+    """
+    path = os.path.abspath(path)
+    if not use_cache:
+        return convert(path, obstacle_color)
+
+    key = cache_key(path, obstacle_color)
+    bits_file = os.path.join(cache_dir, key + '.npy')
+    meta_file = os.path.join(cache_dir, key + '.json')
+    if os.path.exists(bits_file) and os.path.exists(meta_file):
+        try:
+            with open(meta_file) as f:
+                meta = json.load(f)
+            packed = np.load(bits_file, mmap_mode='r')
+            os.utime(meta_file)  # Время изменения - момент последнего использования, см. trim_cache
+            return OccupancyMap(packed, meta['width'], meta['height'], meta['resolution'], meta['origin'])
+        except FileNotFoundError:  # Карту удалил trim_cache другого процесса
+            pass
+
+    occupancy = convert(path, obstacle_color)
+    # Место под новую карту освобождается до записи, чтобы она сама не попала под удаление
+    trim_cache(cache_dir, cache_limit - occupancy.nbytes())
+    save_cache(occupancy, bits_file, meta_file)
+    try:
+        packed = np.load(bits_file, mmap_mode='r')
+    except FileNotFoundError:  # Карту удалил trim_cache другого процесса
+        return occupancy
+    return OccupancyMap(packed, occupancy.width, occupancy.height, occupancy.resolution, occupancy.origin)
+
+
+def cache_key(path, obstacle_color):
+    """Ключ кеша: путь, размер и время изменения файла (и изображения для yaml), параметры"""
+    parts = [str(CACHE_VERSION), repr(obstacle_color)]
+    files = [path]
+    if path.lower().endswith(('.yaml', '.yml')):
+        files.append(resolve_image(path, read_yaml(path)))
+    for name in files:
+        stat = os.stat(name)
+        parts += [name, str(stat.st_size), str(stat.st_mtime_ns)]
+    digest = hashlib.sha1('|'.join(parts).encode()).hexdigest()[:16]
+    return f"{os.path.splitext(os.path.basename(path))[0]}-{digest}"
+
+
+def save_cache(occupancy, bits_file, meta_file):
+    """Атомарная запись кеша: параллельные процессы не увидят недописанный файл"""
+    os.makedirs(os.path.dirname(bits_file), exist_ok=True)
+    suffix = f'.{os.getpid()}.tmp'
+    with open(bits_file + suffix, 'wb') as f:
+        np.save(f, np.ascontiguousarray(occupancy.packed))
+    with open(meta_file + suffix, 'w') as f:
+        json.dump({'width': occupancy.width, 'height': occupancy.height,
+                   'resolution': occupancy.resolution, 'origin': list(occupancy.origin)}, f)
+    os.replace(bits_file + suffix, bits_file)
+    os.replace(meta_file + suffix, meta_file)
+
+
+def trim_cache(cache_dir=CACHE_DIR, limit=CACHE_LIMIT):
+    """Удаляет давно не использованные карты, пока кеш на диске больше limit байт"""
+    if not os.path.isdir(cache_dir):
+        return
+    maps = []
+    for name in os.listdir(cache_dir):
+        if not name.endswith('.json'):
+            continue
+        files = [os.path.join(cache_dir, name[:-len('.json')] + '.npy'), os.path.join(cache_dir, name)]
+        try:
+            stats = [os.stat(file) for file in files]
+        except FileNotFoundError:
+            continue
+        maps.append((stats[1].st_mtime, stats[0].st_size + stats[1].st_size, files))
+    total = sum(size for _, size, _ in maps)
+    for _, size, files in sorted(maps):
+        if total <= limit:
+            break
+        for file in files:
+            try:
+                os.remove(file)
+            except FileNotFoundError:
+                pass
+        total -= size
+
+
+def convert(path, obstacle_color=None):
+    """Читает файл карты и строит OccupancyMap без кеша"""
+    extension = os.path.splitext(path)[1].lower()
+    if extension in ('.yaml', '.yml'):
+        return convert_ros(path)
+    if extension == '.npy':
+        return OccupancyMap.from_grid(np.load(path, mmap_mode='r') != 0)
+    if extension in ('.pgm', '.pnm'):
+        return OccupancyMap.from_grid(threshold(read_pgm(path)))
+    if extension == '.png':
+        pixels = read_png(path)
+        if obstacle_color is not None:
+            return OccupancyMap.from_grid(np.all(pixels == np.array(obstacle_color, dtype=pixels.dtype), axis=2))
+        return OccupancyMap.from_grid(threshold(pixels.mean(axis=2)))
+    raise ValueError(f"Неподдерживаемый формат карты: {path}")
+
+
+def convert_ros(path):
+    """Карта в формате ROS map_server: yaml с параметрами и изображение"""
+    meta = read_yaml(path)
+    image = resolve_image(path, meta)
+    if image.lower().endswith('.png'):
+        values = read_png(image).mean(axis=2)
+    else:
+        values = read_pgm(image)
+    grid = threshold(values, float(meta.get('occupied_thresh', OCCUPIED_THRESH)),
+                     float(meta.get('free_thresh', FREE_THRESH)), bool(int(meta.get('negate', 0))))
+    origin = meta.get('origin', [0.0, 0.0, 0.0])
+    return OccupancyMap.from_grid(grid, resolution=float(meta.get('resolution', 1.0)),
+                                  origin=[float(v) for v in origin])
+
+
+def threshold(values, occupied_thresh=OCCUPIED_THRESH, free_thresh=FREE_THRESH, negate=False,
+              unknown_occupied=True):
+    """Яркость 0..255 -> занятость по правилу ROS: p = (255 - v) / 255.
+
+    Ячейка занята при p > occupied_thresh и свободна при p < free_thresh;
+    неизвестные ячейки между порогами по умолчанию считаются занятыми.
+    """
+    values = np.asarray(values, dtype=np.float32)
+    p = values / 255.0 if negate else (255.0 - values) / 255.0
+    return p >= free_thresh if unknown_occupied else p > occupied_thresh
+
+
+def read_yaml(path):
+    """Разбор плоского yaml из ROS map_server (ключ: значение, списки в [ ])"""
+    meta = {}
+    with open(path) as f:
+        for line in f:
+            line = line.split('#', 1)[0].strip()
+            if ':' not in line:
+                continue
+            key, value = (part.strip() for part in line.split(':', 1))
+            if value.startswith('[') and value.endswith(']'):
+                meta[key] = [v.strip() for v in value[1:-1].split(',') if v.strip()]
+            else:
+                meta[key] = value.strip('\'"')
+    return meta
+
+
+def resolve_image(path, meta):
+    if 'image' not in meta:
+        raise ValueError(f"В {path} не указано изображение карты (image)")
+    return os.path.join(os.path.dirname(path), meta['image'])
+
+
+def read_pgm(path):
+    """PGM (P5 - двоичный, P2 - текстовый) в массив [y, x] со значениями 0..255"""
+    with open(path, 'rb') as f:
+        data = f.read()
+    tokens = []
+    position = 0
+    # Заголовок: магическое число, ширина, высота, максимум; комментарии начинаются с #
+    while len(tokens) < 4:
+        while data[position:position + 1].isspace():
+            position += 1
+        if data[position:position + 1] == b'#':
+            position = data.index(b'\n', position) + 1
+            continue
+        end = position
+        while not data[end:end + 1].isspace():
+            end += 1
+        tokens.append(data[position:end])
+        position = end
+    magic, width, height, maxval = tokens[0], int(tokens[1]), int(tokens[2]), int(tokens[3])
+    if magic == b'P5':
+        dtype = np.uint8 if maxval < 256 else np.dtype('>u2')
+        values = np.frombuffer(data, dtype=dtype, count=width * height, offset=position + 1)
+    elif magic == b'P2':
+        values = np.array(data[position:].split()[:width * height], dtype=np.int64)
+    else:
+        raise ValueError(f"{path}: поддерживаются только PGM P2 и P5")
+    values = values.reshape(height, width).astype(np.float32)
+    return values * (255.0 / maxval) if maxval != 255 else values
+
+
+def read_png(path):
+    """PNG в массив [y, x, rgb]; декодирование через pygame, как в интерфейсе"""
+    import pygame
+
+    surface = pygame.image.load(path)
+    return pygame.surfarray.array3d(surface).transpose(1, 0, 2)
@@ -1,13 +1,14 @@
 import math
 import pygame
 import sys
-import random
+import numpy as np
 import copy
 
 # Константы для отображения
 GRID_SIZE = 40
 CELL_SIZE = 15
 WINDOW_SIZE = (GRID_SIZE * CELL_SIZE, GRID_SIZE * CELL_SIZE)
+SEED = None  # Зерно генератора случайных выходов из локальных минимумов (None - случайное)
 
 # Цвета
 WHITE = (255, 255, 255)
@@ -17,19 +18,39 @@ GREEN = (0, 255, 0)
 BLUE = (0, 0, 255)
 
 class PotentialField:
-    def __init__(self, start, goal, obstacles):
+    def __init__(self, start, goal, obstacles, seed=None, shape=(GRID_SIZE, GRID_SIZE), verbose=True):
+        # Точки и препятствия задаются как (строка, столбец); shape - размер поля (строк, столбцов)
         self.start = start
         self.goal = goal
         self.obstacles = obstacles
+        self.rows, self.cols = shape
         self.influence_range = 7.0
         self.repulsive_gain = 150.0
         self.attractive_gain = 0.5
-        self.grid = [[0.0 for _ in range(GRID_SIZE)] for _ in range(GRID_SIZE)]
+        self.grid = [[0.0 for _ in range(self.cols)] for _ in range(self.rows)]
         self.collision_distance = 0.4  # Уменьшаем дистанцию обнаружения столкновений
         # Добавляем счетчик неудачных попыток
         self.failed_attempts = 0
         # Запоминаем неудачные направления
         self.failed_directions = []
+        # Генератор для выхода из локальных минимумов: зерно или numpy.random.Generator
+        self.rng = np.random.default_rng(seed)
+        self.verbose = verbose
+        # Состояние построения пути, step() делает один шаг
+        self.current_path = [start]
+        self.current_pos = start
+        self.step_count = 0  # Шаги по градиенту
+        self.iterations = 0  # Все вызовы step(), включая попытки выхода из локальных минимумов
+        self.max_steps = 3000
+        self.path_complete = False
+        self.goal_reached = False
+        self.stuck_counter = 0
+        self.local_minimum_detected = False
+        self.last_positions = []
+
+    def log(self, message):
+        if self.verbose:
+            print(message)
 
     def attractive_potential(self, x, y):
         # Притягивающий потенциал к цели
@@ -67,16 +88,16 @@ class PotentialField:
         return 0
 
     def calculate_potential_field(self):
-        for i in range(GRID_SIZE):
-            for j in range(GRID_SIZE):
-                # Комбинируем притягивающий и отталкивающий потенциалы
-                self.grid[i][j] = self.attractive_potential(j, i) + self.repulsive_potential(j, i)
+        for i in range(self.rows):
+            for j in range(self.cols):
+                # Комбинируем притягивающий и отталкивающий потенциалы в точке (строка i, столбец j)
+                self.grid[i][j] = self.attractive_potential(i, j) + self.repulsive_potential(i, j)
 
     def is_collision(self, point):
         """Проверяет столкновение с препятствием"""
         x, y = point
         # Проверяем границы поля
-        if x < 1 or x > GRID_SIZE-2 or y < 1 or y > GRID_SIZE-2:
+        if not self.inside(x, y):
             return True
             
         for obs in self.obstacles:
@@ -98,6 +119,226 @@ class PotentialField:
                 
         return False
 
+    def inside(self, x, y):
+        """Точка внутри поля, не ближе клетки к краю"""
+        return 1 <= x <= self.rows-2 and 1 <= y <= self.cols-2
+
+    def step(self):
+        """Один шаг построения пути: движение по градиенту или выход из локального минимума.
+
+        Возвращает False, когда путь завершён или исчерпан лимит шагов.
+        """
+        if self.path_complete or self.step_count >= self.max_steps:
+            return False
+        self.iterations += 1
+        x, y = self.current_pos
+        x_int = int(x)
+        y_int = int(y)
+
+        # Проверка на выход за границы и коррекция позиции если необходимо
+        if x_int < 1:
+            x = 1.0
+            self.current_pos = (x, y)
+        elif x_int >= self.rows-2:
+            x = self.rows-2.0
+            self.current_pos = (x, y)
+
+        if y_int < 1:
+            y = 1.0
+            self.current_pos = (x, y)
+        elif y_int >= self.cols-2:
+            y = self.cols-2.0
+            self.current_pos = (x, y)
+
+        if x_int < 0 or x_int >= self.rows or y_int < 0 or y_int >= self.cols:
+            self.log(f"Выход за границы: x={x_int}, y={y_int}")
+            self.path_complete = True
+        else:
+            # Если обнаружен локальный минимум, добавляем случайное возмущение
+            if self.local_minimum_detected:
+                # Добавление случайного возмущения в направлении цели
+                goal_dir_x = self.goal[0] - x
+                goal_dir_y = self.goal[1] - y
+                norm = math.sqrt(goal_dir_x**2 + goal_dir_y**2)
+                if norm > 0:
+                    goal_dir_x /= norm
+                    goal_dir_y /= norm
+
+                    # Увеличиваем область поиска с ростом числа неудачных попыток
+                    noise_amplitude = min(0.8 + self.failed_attempts * 0.1, 2.0)
+                    step_size = min(0.5 + self.failed_attempts * 0.1, 1.5)
+
+                    # Пробуем несколько возмущений, пока не найдем безопасное
+                    found_safe_path = False
+                    for attempt in range(20):  # Увеличиваем число попыток
+                        # Случайное возмущение с уклоном в сторону цели
+                        # Чем больше неудачных попыток, тем более случайным делаем направление
+                        if self.failed_attempts > 5:
+                            # Более случайное направление, когда много неудач
+                            random_perturb_x = self.rng.uniform(-1.0, 1.0)
+                            random_perturb_y = self.rng.uniform(-1.0, 1.0)
+                        else:
+                            # Направление с уклоном к цели для первых попыток
+                            random_perturb_x = goal_dir_x + self.rng.uniform(-noise_amplitude, noise_amplitude)
+                            random_perturb_y = goal_dir_y + self.rng.uniform(-noise_amplitude, noise_amplitude)
+
+                        # Нормализуем вектор возмущения
+                        perturb_norm = math.sqrt(random_perturb_x**2 + random_perturb_y**2)
+                        if perturb_norm > 0:
+                            random_perturb_x /= perturb_norm
+                            random_perturb_y /= perturb_norm
+
+                        # Проверяем, не пробовали ли мы уже это направление
+                        too_similar = False
+                        for dir_x, dir_y in self.failed_directions:
+                            similarity = dir_x * random_perturb_x + dir_y * random_perturb_y
+                            if similarity > 0.9:  # Если направления очень похожи
+                                too_similar = True
+                                break
+
+                        if too_similar and len(self.failed_directions) < 20:
+                            continue  # Пропускаем похожие направления
+
+                        new_x = x + random_perturb_x * step_size
+                        new_y = y + random_perturb_y * step_size
+
+                        # Проверяем, что новая позиция в пределах поля
+                        if self.inside(new_x, new_y):
+                            # Проверка на столкновение
+                            new_point = (new_x, new_y)
+                            if not self.is_collision(new_point):
+                                self.current_pos = new_point
+                                self.current_path.append(self.current_pos)
+                                self.local_minimum_detected = False
+                                self.stuck_counter = 0
+                                self.last_positions = []
+                                self.failed_attempts = 0  # Сбрасываем счетчик неудач
+                                self.failed_directions = []  # Очищаем историю неудачных направлений
+                                self.log("Выход из локального минимума с помощью случайного возмущения")
+                                found_safe_path = True
+                                break
+                            else:
+                                # Запоминаем неудачное направление
+                                if len(self.failed_directions) > 20:
+                                    self.failed_directions.pop(0)  # Удаляем самое старое
+                                self.failed_directions.append((random_perturb_x, random_perturb_y))
+
+                    # Если не смогли найти безопасный путь, пробуем отступить назад
+                    if not found_safe_path:
+                        self.failed_attempts += 1  # Увеличиваем счетчик неудач
+
+                        # Если много неудач, делаем большой прыжок в случайном направлении
+                        if self.failed_attempts > 10:
+                            for _ in range(20):  # Пробуем до 20 направлений
+                                random_dir_x = self.rng.uniform(-1.0, 1.0)
+                                random_dir_y = self.rng.uniform(-1.0, 1.0)
+                                dir_norm = math.sqrt(random_dir_x**2 + random_dir_y**2)
+                                if dir_norm > 0:
+                                    random_dir_x /= dir_norm
+                                    random_dir_y /= dir_norm
+
+                                jump_x = x + random_dir_x * 2.0  # Большой прыжок
+                                jump_y = y + random_dir_y * 2.0
+
+                                if self.inside(jump_x, jump_y):
+                                    if not self.is_collision((jump_x, jump_y)):
+                                        self.current_pos = (jump_x, jump_y)
+                                        self.current_path.append(self.current_pos)
+                                        self.local_minimum_detected = False
+                                        self.stuck_counter = 0
+                                        self.last_positions = []
+                                        self.failed_attempts = 0
+                                        self.failed_directions = []
+                                        self.log("Делаем большой прыжок для выхода из тупика")
+                                        found_safe_path = True
+                                        break
+
+                        # Если все еще не удалось, отступаем от препятствия
+                        if not found_safe_path:
+                            back_step = 0.7 + self.failed_attempts * 0.1  # Увеличиваем шаг отступления
+                            back_x = x - goal_dir_x * back_step
+                            back_y = y - goal_dir_y * back_step
+
+                            if self.inside(back_x, back_y):
+                                if not self.is_collision((back_x, back_y)):
+                                    self.current_pos = (back_x, back_y)
+                                    self.current_path.append(self.current_pos)
+                                    self.local_minimum_detected = False
+                                    self.stuck_counter = 0
+                                    self.last_positions = []
+                                    self.log("Отступаем от препятствия в обратном направлении")
+
+                        # Если количество неудач больше 20, обнуляем путь и начинаем сначала
+                        if not found_safe_path and self.failed_attempts > 20:
+                            self.log("Слишком много неудачных попыток - возвращаемся к началу")
+                            self.current_path = [self.start]
+                            self.current_pos = self.start
+                            self.local_minimum_detected = False
+                            self.stuck_counter = 0
+                            self.last_positions = []
+                            self.failed_attempts = 0
+                            self.failed_directions = []
+            else:
+                # Обычное движение по градиенту потенциального поля
+                dx = self.grid[min(x_int+1, self.rows-1)][y_int] - self.grid[max(x_int-1, 0)][y_int]
+                dy = self.grid[x_int][min(y_int+1, self.cols-1)] - self.grid[x_int][max(y_int-1, 0)]
+
+                norm = math.sqrt(dx*dx + dy*dy)
+                if norm > 0:
+                    dx = dx/norm
+                    dy = dy/norm
+
+                    # Стандартный шаг движения
+                    step_size = 0.2
+                    new_x = x - dx * step_size
+                    new_y = y - dy * step_size
+
+                    if math.isnan(new_x) or math.isnan(new_y):
+                        self.log("Обнаружен NaN в координатах")
+                        self.path_complete = True
+                    else:
+                        # Проверка на столкновение без сложных проверок пути
+                        new_point = (new_x, new_y)
+                        if not self.is_collision(new_point):
+                            self.current_pos = new_point
+                            self.last_positions.append(self.current_pos)
+                            if len(self.last_positions) > 10:
+                                self.last_positions.pop(0)
+                                avg_movement = 0
+                                for p in self.last_positions:
+                                    avg_movement += math.sqrt((p[0]-self.current_pos[0])**2 + (p[1]-self.current_pos[1])**2)
+                                avg_movement /= len(self.last_positions)
+
+                                if avg_movement < 0.1:  # Мало движения - застряли
+                                    self.stuck_counter += 1
+                                    if self.stuck_counter > 5:
+                                        self.log("Застряли в локальном минимуме - применяем случайное возмущение")
+                                        self.local_minimum_detected = True
+                                else:
+                                    self.stuck_counter = 0
+
+                            self.current_path.append(self.current_pos)
+                            self.step_count += 1
+                        else:
+                            self.log("Обнаружено столкновение, ищем другой путь")
+                            self.local_minimum_detected = True
+                else:
+                    self.log("Нулевой градиент - активируем случайное возмущение")
+                    self.local_minimum_detected = True
+
+            # Проверка достижения цели
+            if math.sqrt((self.current_pos[0] - self.goal[0])**2 + (self.current_pos[1] - self.goal[1])**2) <= 0.5:
+                self.path_complete = True
+                self.goal_reached = True
+                self.log(f"Путь построен! Количество шагов: {self.step_count}")
+                self.log(f"Длина пути: {len(self.current_path)}")
+        return not self.path_complete
+
+    def get_path(self):
+        """Построенный путь (список точек) или None, если цель не достигнута"""
+        return list(self.current_path) if self.goal_reached else None
+
+
 def create_simple_walls():
     """Создаёт минимальное количество препятствий в левой части поля"""
     obstacles = []
@@ -140,18 +381,10 @@ def main():
         obstacles, start, goal = create_simple_walls()
         
         # Создаем объект потенциального поля
-        pf = PotentialField(start, goal, obstacles)
+        pf = PotentialField(start, goal, obstacles, SEED)
         pf.calculate_potential_field()
         
-        # Инициализация для анимации
-        current_path = [start]
-        current_pos = start
-        step_count = 0
-        max_steps = 3000
-        path_complete = False
-        stuck_counter = 0
-        local_minimum_detected = False
-        last_positions = []
+        # Инициализация для анимации (состояние пути хранится в pf)
         last_update_time = pygame.time.get_ticks()
         update_interval = 30  # миллисекунды между обновлениями (сделаем быстрее)
         
@@ -178,15 +411,8 @@ def main():
                     elif event.key == pygame.K_r:
                         # Перегенерация стенок
                         obstacles, start, goal = create_simple_walls()
-                        pf = PotentialField(start, goal, obstacles)
+                        pf = PotentialField(start, goal, obstacles, SEED)
                         pf.calculate_potential_field()
-                        current_path = [start]
-                        current_pos = start
-                        step_count = 0
-                        path_complete = False
-                        stuck_counter = 0
-                        local_minimum_detected = False
-                        last_positions = []
                         print(f"Стенки перегенерированы. Препятствий: {len(obstacles)}")
                     elif event.key == pygame.K_p:
                         # Переключаем отображение потенциального поля
@@ -245,6 +471,7 @@ def main():
                              CELL_SIZE//2)
             
             # Отрисовка текущего пути
+            current_path = pf.current_path
             if len(current_path) > 1:
                 for i in range(len(current_path)-1):
                     try:
@@ -263,208 +490,9 @@ def main():
                         continue
             
             # Построение пути с задержкой
-            if not path_complete and step_count < max_steps and current_time - last_update_time >= update_interval:
-                x, y = current_pos
-                x_int = int(x)
-                y_int = int(y)
-                
-                # Проверка на выход за границы и коррекция позиции если необходимо
-                if x_int < 1:
-                    x = 1.0
-                    current_pos = (x, y)
-                elif x_int >= GRID_SIZE-2:
-                    x = GRID_SIZE-2.0
-                    current_pos = (x, y)
-                
-                if y_int < 1:
-                    y = 1.0
-                    current_pos = (x, y)
-                elif y_int >= GRID_SIZE-2:
-                    y = GRID_SIZE-2.0
-                    current_pos = (x, y)
-                
-                if x_int < 0 or x_int >= GRID_SIZE or y_int < 0 or y_int >= GRID_SIZE:
-                    print(f"Выход за границы: x={x_int}, y={y_int}")
-                    path_complete = True
-                else:
-                    # Если обнаружен локальный минимум, добавляем случайное возмущение
-                    if local_minimum_detected:
-                        # Добавление случайного возмущения в направлении цели
-                        goal_dir_x = goal[0] - x
-                        goal_dir_y = goal[1] - y
-                        norm = math.sqrt(goal_dir_x**2 + goal_dir_y**2)
-                        if norm > 0:
-                            goal_dir_x /= norm
-                            goal_dir_y /= norm
-                            
-                            # Увеличиваем область поиска с ростом числа неудачных попыток
-                            noise_amplitude = min(0.8 + pf.failed_attempts * 0.1, 2.0)
-                            step_size = min(0.5 + pf.failed_attempts * 0.1, 1.5)
-                            
-                            # Пробуем несколько возмущений, пока не найдем безопасное
-                            found_safe_path = False
-                            for attempt in range(20):  # Увеличиваем число попыток
-                                # Случайное возмущение с уклоном в сторону цели
-                                # Чем больше неудачных попыток, тем более случайным делаем направление
-                                if pf.failed_attempts > 5:
-                                    # Более случайное направление, когда много неудач
-                                    random_perturb_x = random.uniform(-1.0, 1.0)
-                                    random_perturb_y = random.uniform(-1.0, 1.0)
-                                else:
-                                    # Направление с уклоном к цели для первых попыток
-                                    random_perturb_x = goal_dir_x + random.uniform(-noise_amplitude, noise_amplitude)
-                                    random_perturb_y = goal_dir_y + random.uniform(-noise_amplitude, noise_amplitude)
-                                
-                                # Нормализуем вектор возмущения
-                                perturb_norm = math.sqrt(random_perturb_x**2 + random_perturb_y**2)
-                                if perturb_norm > 0:
-                                    random_perturb_x /= perturb_norm
-                                    random_perturb_y /= perturb_norm
-                                
-                                # Проверяем, не пробовали ли мы уже это направление
-                                too_similar = False
-                                for dir_x, dir_y in pf.failed_directions:
-                                    similarity = dir_x * random_perturb_x + dir_y * random_perturb_y
-                                    if similarity > 0.9:  # Если направления очень похожи
-                                        too_similar = True
-                                        break
-                                
-                                if too_similar and len(pf.failed_directions) < 20:
-                                    continue  # Пропускаем похожие направления
-                                    
-                                new_x = x + random_perturb_x * step_size
-                                new_y = y + random_perturb_y * step_size
-                                
-                                # Проверяем, что новая позиция в пределах поля
-                                if 1 <= new_x <= GRID_SIZE-2 and 1 <= new_y <= GRID_SIZE-2:
-                                    # Проверка на столкновение
-                                    new_point = (new_x, new_y)
-                                    if not pf.is_collision(new_point):
-                                        current_pos = new_point
-                                        current_path.append(current_pos)
-                                        local_minimum_detected = False
-                                        stuck_counter = 0
-                                        last_positions = []
-                                        pf.failed_attempts = 0  # Сбрасываем счетчик неудач
-                                        pf.failed_directions = []  # Очищаем историю неудачных направлений
-                                        print("Выход из локального минимума с помощью случайного возмущения")
-                                        found_safe_path = True
-                                        break
-                                    else:
-                                        # Запоминаем неудачное направление
-                                        if len(pf.failed_directions) > 20:
-                                            pf.failed_directions.pop(0)  # Удаляем самое старое
-                                        pf.failed_directions.append((random_perturb_x, random_perturb_y))
-                            
-                            # Если не смогли найти безопасный путь, пробуем отступить назад
-                            if not found_safe_path:
-                                pf.failed_attempts += 1  # Увеличиваем счетчик неудач
-                                
-                                # Если много неудач, делаем большой прыжок в случайном направлении
-                                if pf.failed_attempts > 10:
-                                    for _ in range(20):  # Пробуем до 20 направлений
-                                        random_dir_x = random.uniform(-1.0, 1.0)
-                                        random_dir_y = random.uniform(-1.0, 1.0)
-                                        dir_norm = math.sqrt(random_dir_x**2 + random_dir_y**2)
-                                        if dir_norm > 0:
-                                            random_dir_x /= dir_norm
-                                            random_dir_y /= dir_norm
-                                        
-                                        jump_x = x + random_dir_x * 2.0  # Большой прыжок
-                                        jump_y = y + random_dir_y * 2.0
-                                        
-                                        if 1 <= jump_x <= GRID_SIZE-2 and 1 <= jump_y <= GRID_SIZE-2:
-                                            if not pf.is_collision((jump_x, jump_y)):
-                                                current_pos = (jump_x, jump_y)
-                                                current_path.append(current_pos)
-                                                local_minimum_detected = False
-                                                stuck_counter = 0
-                                                last_positions = []
-                                                pf.failed_attempts = 0
-                                                pf.failed_directions = []
-                                                print("Делаем большой прыжок для выхода из тупика")
-                                                found_safe_path = True
-                                                break
-                                
-                                # Если все еще не удалось, отступаем от препятствия
-                                if not found_safe_path:
-                                    back_step = 0.7 + pf.failed_attempts * 0.1  # Увеличиваем шаг отступления
-                                    back_x = x - goal_dir_x * back_step
-                                    back_y = y - goal_dir_y * back_step
-                                    
-                                    if 1 <= back_x <= GRID_SIZE-2 and 1 <= back_y <= GRID_SIZE-2:
-                                        if not pf.is_collision((back_x, back_y)):
-                                            current_pos = (back_x, back_y)
-                                            current_path.append(current_pos)
-                                            local_minimum_detected = False
-                                            stuck_counter = 0
-                                            last_positions = []
-                                            print("Отступаем от препятствия в обратном направлении")
-                                
-                                # Если количество неудач больше 20, обнуляем путь и начинаем сначала
-                                if not found_safe_path and pf.failed_attempts > 20:
-                                    print("Слишком много неудачных попыток - возвращаемся к началу")
-                                    current_path = [start]
-                                    current_pos = start
-                                    local_minimum_detected = False
-                                    stuck_counter = 0
-                                    last_positions = []
-                                    pf.failed_attempts = 0
-                                    pf.failed_directions = []
-                    else:
-                        # Обычное движение по градиенту потенциального поля
-                        dx = pf.grid[min(x_int+1, GRID_SIZE-1)][y_int] - pf.grid[max(x_int-1, 0)][y_int]
-                        dy = pf.grid[x_int][min(y_int+1, GRID_SIZE-1)] - pf.grid[x_int][max(y_int-1, 0)]
-                        
-                        norm = math.sqrt(dx*dx + dy*dy)
-                        if norm > 0:
-                            dx = dx/norm
-                            dy = dy/norm
-                            
-                            # Стандартный шаг движения
-                            step_size = 0.2
-                            new_x = x - dx * step_size
-                            new_y = y - dy * step_size
-                            
-                            if math.isnan(new_x) or math.isnan(new_y):
-                                print("Обнаружен NaN в координатах")
-                                path_complete = True
-                            else:
-                                # Проверка на столкновение без сложных проверок пути
-                                new_point = (new_x, new_y)
-                                if not pf.is_collision(new_point):
-                                    current_pos = new_point
-                                    last_positions.append(current_pos)
-                                    if len(last_positions) > 10:
-                                        last_positions.pop(0)
-                                        avg_movement = 0
-                                        for p in last_positions:
-                                            avg_movement += math.sqrt((p[0]-current_pos[0])**2 + (p[1]-current_pos[1])**2)
-                                        avg_movement /= len(last_positions)
-                                        
-                                        if avg_movement < 0.1:  # Мало движения - застряли
-                                            stuck_counter += 1
-                                            if stuck_counter > 5:
-                                                print("Застряли в локальном минимуме - применяем случайное возмущение")
-                                                local_minimum_detected = True
-                                        else:
-                                            stuck_counter = 0
-                                    
-                                    current_path.append(current_pos)
-                                    step_count += 1
-                                    last_update_time = current_time
-                                else:
-                                    print("Обнаружено столкновение, ищем другой путь")
-                                    local_minimum_detected = True
-                        else:
-                            print("Нулевой градиент - активируем случайное возмущение")
-                            local_minimum_detected = True
-                    
-                    # Проверка достижения цели
-                    if math.sqrt((current_pos[0] - goal[0])**2 + (current_pos[1] - goal[1])**2) <= 0.5:
-                        path_complete = True
-                        print(f"Путь построен! Количество шагов: {step_count}")
-                        print(f"Длина пути: {len(current_path)}")
+            if not pf.path_complete and pf.step_count < pf.max_steps and current_time - last_update_time >= update_interval:
+                pf.step()
+                last_update_time = current_time
             
             pygame.display.flip()
             clock.tick(30)
@@ -0,0 +1,107 @@
+"""Пакетные запросы: много пар старт/цель на одной загруженной карте.
+
+Карта загружается один раз (maps/map_loader, с кешем), планировщик готовит
+структуры для неё один раз (сетку A*/Dijkstra или карту столкновений RRT),
+после чего запросы решаются подряд. Результат - JSONL, по строке на запрос.
+
+Запросы - JSONL ({"id": ..., "start": [x, y], "goal": [x, y]}) или CSV
+с колонками sx, sy, gx, gy (колонка id необязательна).
+
+Пример:
+    python tools/batch.py warehouse.yaml queries.jsonl --planner astar --output paths.jsonl
+"""
+import argparse
+import csv
+import json
+import os
+import sys
+import time
+
+import numpy as np
+
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), 'maps'))
+
+import map_loader
+import planners
+
+
+def read_queries(path):
+    """Читает запросы из JSONL или CSV; возвращает список словарей id, start, goal"""
+    queries = []
+    with open(path, newline='') as f:
+        if path.lower().endswith('.csv'):
+            for number, row in enumerate(csv.DictReader(f)):
+                queries.append({
+                    'id': row.get('id') or number,
+                    'start': [float(row['sx']), float(row['sy'])],
+                    'goal': [float(row['gx']), float(row['gy'])],
+                })
+        else:
+            for number, line in enumerate(f):
+                if not line.strip():
+                    continue
+                query = json.loads(line)
+                query.setdefault('id', number)
+                queries.append(query)
+    return queries
+
+
+def run_batch(grid, queries, planner='astar', seed=None, robot_radius=0, **options):
+    """Решает запросы на одной карте, выдавая результат каждого по мере готовности.
+
+    grid - булев массив [y, x] (True - препятствие). seed задаёт зерно первого
+    запроса, следующие получают seed + 1, seed + 2, ... для воспроизводимости.
+    options - эвристика и вес A* (heuristic, weight) для всех запросов, см. planners.solve.
+    """
+    planners.check_options(planner, options)
+    grid = np.asarray(grid, dtype=bool)
+    prepared = planners.prepare(planner, grid, robot_radius)
+    for number, query in enumerate(queries):
+        query_seed = None if seed is None else seed + number
+        result = planners.solve(prepared, query['start'], query['goal'], query_seed, **options)
+        yield {'id': query['id'], **result}
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Пакетный поиск путей на одной карте")
+    parser.add_argument('map', help="файл карты: .png, .pgm, .yaml (ROS) или .npy")
+    parser.add_argument('queries', help="запросы: .jsonl или .csv")
+    parser.add_argument('--planner', default='astar', choices=planners.PLANNERS)
+    parser.add_argument('--output', help="файл результатов JSONL (по умолчанию stdout)")
+    parser.add_argument('--seed', type=int, default=0, help="зерно для RRT-планировщиков")
+    parser.add_argument('--robot-radius', type=int, default=0)
+    parser.add_argument('--no-cache', action='store_true', help="не использовать кеш карт")
+    parser.add_argument('--heuristic', help="эвристика A*/JPS: octile, euclidean, manhattan, zero")
+    parser.add_argument('--weight', type=float, help="вес эвристики A*/JPS (>= 1): путь не длиннее оптимального "
+                                                     "в weight раз, поиск быстрее")
+    args = parser.parse_args()
+    options = {name: value for name, value in (('heuristic', args.heuristic), ('weight', args.weight))
+               if value is not None}
+
+    start_time = time.perf_counter()
+    occupancy = map_loader.load_map(args.map, use_cache=not args.no_cache)
+    grid = occupancy.grid()
+    queries = read_queries(args.queries)
+    load_ms = (time.perf_counter() - start_time) * 1000
+
+    output = open(args.output, 'w') if args.output else sys.stdout
+    solved = 0
+    total_ms = 0.0
+    start_time = time.perf_counter()
+    try:
+        for result in run_batch(grid, queries, args.planner, args.seed, args.robot_radius, **options):
+            output.write(json.dumps(result, ensure_ascii=False) + '\n')
+            solved += result['path'] is not None
+            total_ms += result['time_ms']
+    finally:
+        if output is not sys.stdout:
+            output.close()
+    elapsed_ms = (time.perf_counter() - start_time) * 1000
+    print(f"Карта {occupancy.width}x{occupancy.height} и {len(queries)} запросов загружены за {load_ms:.1f} мс; "
+          f"подготовка {args.planner}: {elapsed_ms - total_ms:.1f} мс, поиск: {total_ms:.1f} мс, "
+          f"найдено путей: {solved}/{len(queries)}", file=sys.stderr)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,297 @@
+"""Единый замер планировщиков на фиксированном наборе сгенерированных карт.
+
+Набор карт воспроизводим: каждое семейство (лабиринт create_maze_with_pattern,
+случайная плотность generate_maze_obstacles, узкие проходы) строится для
+нескольких размеров из фиксированных зёрен. Все планировщики решают одни и те
+же задачи через tools/planners; RRT и RRT* работают на той же карте,
+увеличенной до PIXELS_PER_CELL пикселей на клетку, а их пути пересчитываются
+обратно в клетки, чтобы длины были сравнимы.
+
+Для каждого сочетания планировщик/семейство/размер в JSON пишутся перцентили
+задержки, число раскрытых узлов, пик памяти (tracemalloc, отдельный прогон) и
+качество пути: доля найденных, длина, отношение к оптимуму A* на 8-связной
+сетке, суммарный поворот и доля корректных путей (от старта к цели без
+пересечения препятствий).
+
+Пример:
+    python tools/benchmark.py --output bench.json
+    python tools/benchmark.py --planners astar dijkstra --sizes 40 80 160 --compare bench.json
+"""
+import argparse
+import json
+import math
+import os
+import platform
+import subprocess
+import sys
+import time
+import tracemalloc
+
+import numpy as np
+
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+
+import planners
+
+FAMILIES = ('maze', 'random', 'narrow')
+BENCHMARK_PLANNERS = ('astar', 'jps', 'jps_plus', 'dijkstra', 'potential_field', 'rrt', 'rrtstar')
+SIZES = (40, 80)
+MAPS = 2  # Карт каждого семейства и размера
+REPEATS = 3  # Запусков каждой задачи; у RRT и RRT* у каждого запуска своё зерно
+SEED = 0
+PIXELS_PER_CELL = 10  # Масштаб карты для RRT и RRT*: их шаг дерева задан в пикселях (20)
+SIZE_LIMITS = {'potential_field': 40, 'rrtstar': 80}  # Дальше планировщик слишком медленный для набора
+RANDOM_DENSITY = 0.3  # Доля занятых клеток в семействе 'random'
+NARROW_GAP = 2  # Ширина проходов в стенах семейства 'narrow', клетки
+REGRESSION_THRESHOLD = 0.2  # Относительный рост медианы задержки, считающийся регрессией
+
+
+def maze_map(size, rng):
+    """Лабиринт из A*: стены с проходами и случайные острова"""
+    astar = planners.import_planner('astar_alg', 'astar')
+    obstacles, start, goal = astar.create_maze_with_pattern(rng, size)
+    return cells_to_grid(obstacles, size), (start[1], start[0]), (goal[1], goal[0])
+
+
+def random_map(size, rng):
+    """Случайные препятствия с плотностью RANDOM_DENSITY; карта перегенерируется, пока путь не появится"""
+    dijkstra = planners.import_planner('dijkstra_alg', 'dijkstra')
+    start, goal = (2, 2), (size - 3, size - 3)
+    while True:
+        grid = cells_to_grid(dijkstra.generate_maze_obstacles(size, start, goal, RANDOM_DENSITY, rng), size)
+        if dijkstra.Reachability(dijkstra.GridGraph.from_grid(grid)).connected(start, goal):
+            return grid, (start[1], start[0]), (goal[1], goal[0])
+
+
+def narrow_map(size, rng):
+    """Три поперечные стены, в каждой один проход шириной NARROW_GAP"""
+    grid = np.zeros((size, size), dtype=bool)
+    grid[[0, -1], :] = True
+    grid[:, [0, -1]] = True
+    for column in (size // 4, size // 2, 3 * size // 4):
+        gap = int(rng.integers(1, size - 1 - NARROW_GAP))
+        grid[1:-1, column] = True
+        grid[gap:gap + NARROW_GAP, column] = False
+    return grid, (2, size // 2), (size - 3, size // 2)
+
+
+GENERATORS = {'maze': maze_map, 'random': random_map, 'narrow': narrow_map}
+
+
+def cells_to_grid(obstacles, size):
+    grid = np.zeros((size, size), dtype=bool)
+    for row, col in obstacles:
+        grid[row, col] = True
+    return grid
+
+
+def corpus(families, sizes, maps, seed):
+    """Набор задач: для каждого семейства и размера maps карт из своих фиксированных зёрен"""
+    tasks = []
+    for family in families:
+        for size in sizes:
+            for number in range(maps):
+                rng = np.random.default_rng([seed, FAMILIES.index(family), size, number])
+                grid, start, goal = GENERATORS[family](size, rng)
+                tasks.append({'family': family, 'size': size, 'map': number,
+                              'grid': grid, 'start': start, 'goal': goal})
+    return tasks
+
+
+def path_quality(path, grid, start, goal):
+    """Длина, суммарный поворот (радианы) и корректность пути в клетках.
+
+    Путь корректен, если он идёт от старта к цели и не пересекает препятствия.
+    """
+    length = planners.path_length(path)
+    turning = 0.0
+    headings = [math.atan2(b[1] - a[1], b[0] - a[0]) for a, b in zip(path, path[1:]) if a != b]
+    for a, b in zip(headings, headings[1:]):
+        turning += abs((b - a + math.pi) % (2 * math.pi) - math.pi)
+    valid = math.dist(path[0], start) < 0.5 and math.dist(path[-1], goal) < 0.5
+    points = list(path)
+    # Точки внутри отрезков берутся со сдвигом на полшага: диагональный ход A* между
+    # двумя занятыми клетками проходит ровно через их общий угол и не считается пересечением
+    for a, b in zip(path, path[1:]):
+        samples = max(1, int(math.dist(a, b) / 0.1))
+        points += [(a[0] + (k + 0.5) / samples * (b[0] - a[0]), a[1] + (k + 0.5) / samples * (b[1] - a[1]))
+                   for k in range(samples)]
+    cells = np.rint(np.array(points)).astype(int)
+    rows, cols = grid.shape
+    inside = (cells[:, 0] >= 0) & (cells[:, 0] < cols) & (cells[:, 1] >= 0) & (cells[:, 1] < rows)
+    valid = valid and bool(inside.all()) and not grid[cells[:, 1], cells[:, 0]].any()
+    return length, turning, valid
+
+
+def distribution(values):
+    if not values:
+        return None
+    values = np.asarray(values, dtype=float)
+    p50, p90, p99 = np.percentile(values, [50, 90, 99])
+    return {'p50': p50, 'p90': p90, 'p99': p99, 'mean': values.mean(), 'min': values.min(), 'max': values.max()}
+
+
+def mean(values):
+    return float(np.mean(values)) if values else None
+
+
+def run_case(planner, tasks, references, repeats, seed):
+    """Все задачи одного семейства и размера одним планировщиком"""
+    scale = PIXELS_PER_CELL if planner in ('rrt', 'rrt_connect', 'rrtstar') else 1
+    latencies, prepare_times, expanded, memory = [], [], [], []
+    lengths, ratios, turnings, valid, found = [], [], [], [], 0
+    for task in tasks:
+        grid = task['grid']
+        if scale > 1:
+            grid = np.repeat(np.repeat(grid, scale, axis=0), scale, axis=1)
+        start = [c * scale + scale // 2 for c in task['start']]
+        goal = [c * scale + scale // 2 for c in task['goal']]
+
+        started = time.perf_counter()
+        prepared = planners.prepare(planner, grid)
+        prepare_times.append((time.perf_counter() - started) * 1000)
+
+        for repeat in range(repeats):
+            result = planners.solve(prepared, start, goal, seed + repeat)
+            latencies.append(result['time_ms'])
+            expanded.append(result.get('expanded', result.get('nodes', 0)))
+            if result['path'] is None:
+                continue
+            found += 1
+            path = [((x - scale // 2) / scale, (y - scale // 2) / scale) for x, y in result['path']]
+            length, turning, correct = path_quality(path, task['grid'], task['start'], task['goal'])
+            lengths.append(length)
+            ratios.append(length / references[id(task)])
+            turnings.append(turning)
+            valid.append(correct)
+
+        # Пик памяти - в отдельном прогоне: tracemalloc замедляет выполнение и исказил бы задержки
+        tracemalloc.start()
+        planners.solve(prepared, start, goal, seed)
+        memory.append(tracemalloc.get_traced_memory()[1] / 1024)
+        tracemalloc.stop()
+
+    runs = len(latencies)
+    return {
+        'planner': planner,
+        'family': tasks[0]['family'],
+        'size': tasks[0]['size'],
+        'maps': len(tasks),
+        'runs': runs,
+        'prepare_ms': mean(prepare_times),
+        'latency_ms': distribution(latencies),
+        'expanded': mean(expanded),
+        'memory_peak_kb': max(memory),
+        'success_rate': found / runs,
+        'length': mean(lengths),
+        'length_ratio': mean(ratios),
+        'turning': mean(turnings),
+        'valid': mean(valid),
+    }
+
+
+def run_benchmark(planner_names=BENCHMARK_PLANNERS, families=FAMILIES, sizes=SIZES, maps=MAPS,
+                  repeats=REPEATS, seed=SEED, log=None):
+    """Прогоняет набор карт и возвращает отчёт: метаданные и список результатов"""
+    tasks = corpus(families, sizes, maps, seed)
+    # Эталон качества - оптимальная длина пути A* по 8-связной сетке
+    references = {}
+    for task in tasks:
+        result = planners.solve(planners.prepare('astar', task['grid']), task['start'], task['goal'])
+        references[id(task)] = result['cost']
+
+    results = []
+    for planner in planner_names:
+        for family in families:
+            for size in sizes:
+                if size > SIZE_LIMITS.get(planner, size):
+                    continue
+                case = [t for t in tasks if t['family'] == family and t['size'] == size]
+                result = run_case(planner, case, references, repeats, seed)
+                results.append(result)
+                if log:
+                    log(format_result(result))
+    return {'meta': metadata(planner_names, families, sizes, maps, repeats, seed), 'results': results}
+
+
+def metadata(planner_names, families, sizes, maps, repeats, seed):
+    try:
+        commit = subprocess.run(['git', 'rev-parse', 'HEAD'], capture_output=True, text=True,
+                                cwd=planners.ROOT, check=True).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        commit = None
+    return {
+        'timestamp': time.strftime('%Y-%m-%dT%H:%M:%S%z'),
+        'commit': commit,
+        'python': platform.python_version(),
+        'numpy': np.__version__,
+        'platform': platform.platform(),
+        'planners': list(planner_names),
+        'families': list(families),
+        'sizes': list(sizes),
+        'maps': maps,
+        'repeats': repeats,
+        'seed': seed,
+        'pixels_per_cell': PIXELS_PER_CELL,
+    }
+
+
+def format_result(result):
+    latency = result['latency_ms']
+    ratio = '-' if result['length_ratio'] is None else f"{result['length_ratio']:.3f}"
+    valid = '-' if result['valid'] is None else f"{result['valid']:.0%}"
+    return (f"{result['planner']:>15} {result['family']:>7} {result['size']:>5} "
+            f"p50 {latency['p50']:>9.1f} мс  p99 {latency['p99']:>9.1f} мс  "
+            f"узлов {result['expanded']:>9.0f}  память {result['memory_peak_kb']:>8.0f} КБ  "
+            f"найдено {result['success_rate']:>4.0%}  длина/оптимум {ratio:>5}  корректных {valid:>4}")
+
+
+def compare(report, baseline, threshold=REGRESSION_THRESHOLD):
+    """Сравнивает медианы задержки с прошлым отчётом; возвращает список регрессий"""
+    key = lambda r: (r['planner'], r['family'], r['size'])
+    previous = {key(r): r for r in baseline['results']}
+    regressions = []
+    for result in report['results']:
+        old = previous.get(key(result))
+        if old is None:
+            continue
+        change = result['latency_ms']['p50'] / old['latency_ms']['p50'] - 1
+        line = f"{'/'.join(map(str, key(result)))}: p50 {old['latency_ms']['p50']:.1f} -> {result['latency_ms']['p50']:.1f} мс ({change:+.0%})"
+        if change > threshold:
+            regressions.append(line)
+        print(line, file=sys.stderr)
+    return regressions
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Сравнительный замер планировщиков на наборе карт")
+    parser.add_argument('--planners', nargs='+', default=BENCHMARK_PLANNERS, choices=planners.PLANNERS)
+    parser.add_argument('--families', nargs='+', default=FAMILIES, choices=FAMILIES)
+    parser.add_argument('--sizes', nargs='+', type=int, default=SIZES)
+    parser.add_argument('--maps', type=int, default=MAPS)
+    parser.add_argument('--repeats', type=int, default=REPEATS)
+    parser.add_argument('--seed', type=int, default=SEED)
+    parser.add_argument('--output', help="файл отчёта JSON (по умолчанию stdout)")
+    parser.add_argument('--compare', help="прошлый отчёт: код возврата 1 при росте медианы задержки больше порога")
+    parser.add_argument('--threshold', type=float, default=REGRESSION_THRESHOLD)
+    args = parser.parse_args()
+
+    report = run_benchmark(args.planners, args.families, args.sizes, args.maps, args.repeats, args.seed,
+                           log=lambda line: print(line, file=sys.stderr))
+    text = json.dumps(report, indent=2, ensure_ascii=False, default=float)
+    if args.output:
+        with open(args.output, 'w') as f:
+            f.write(text + '\n')
+    else:
+        print(text)
+
+    if args.compare:
+        with open(args.compare) as f:
+            regressions = compare(report, json.load(f), args.threshold)
+        if regressions:
+            print(f"Регрессии задержки (порог {args.threshold:.0%}):", *regressions, sep='\n', file=sys.stderr)
+            sys.exit(1)
+
+
+if __name__ == '__main__':
+    main()
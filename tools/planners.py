@@ -0,0 +1,236 @@
+"""Единый интерфейс к планировщикам репозитория для пакетных запусков.
+
+Каждый алгоритм живёт в своей папке и импортирует соседние модули по имени
+(collision, config, utils), причём у RRT и RRT* эти имена совпадают. Поэтому
+модули планировщика загружаются с его папкой в sys.path, а после загрузки
+убираются из sys.modules, чтобы следующий планировщик получил свои копии.
+
+Планировщик готовится один раз на карту (prepare), затем решает любое число
+запросов (solve). Точки везде задаются как (x, y), карта - булев массив [y, x].
+"""
+import collections
+import importlib
+import math
+import os
+import sys
+import time
+
+import numpy as np
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+DIRECTORIES = {
+    'astar': 'astar_alg',
+    'jps': 'astar_alg',
+    'jps_plus': 'astar_alg',
+    'dijkstra': 'dijkstra_alg',
+    'dijkstra_field': 'dijkstra_alg',
+    'rrt': 'RRT',
+    'rrt_connect': 'RRT',
+    'rrtstar': 'RRTstar',
+    'potential_field': 'potential_field_alg',
+}
+PLANNERS = tuple(DIRECTORIES)
+GRID_PLANNERS = ('astar', 'jps', 'jps_plus', 'dijkstra')
+ASTAR_MODES = {'astar': 'astar', 'jps': 'jps', 'jps_plus': 'jps+'}  # Режимы AStar для сеточных планировщиков
+ASTAR_HEURISTICS = ('octile', 'euclidean', 'manhattan', 'zero')  # Имена astar_alg/astar.HEURISTICS
+ASTAR_OPTIONS = ('heuristic', 'weight')  # Параметры AStar, задаваемые на каждый запрос
+FIELD_CACHE_SIZE = 16  # Сколько полей расстояний dijkstra_field держит в памяти
+POTENTIAL_FIELD_ITERATIONS = 20000  # Предел шагов потенциального поля: выход из локальных минимумов может не сойтись
+
+_modules = {}
+
+
+def import_planner(directory, name):
+    """Импортирует модуль name из папки алгоритма, не смешивая одноимённые модули разных папок"""
+    key = (directory, name)
+    if key in _modules:
+        return _modules[key]
+    folders = [os.path.join(ROOT, d) for d in set(DIRECTORIES.values())]
+
+    def local(module):
+        path = getattr(module, '__file__', None) or ''
+        return any(path.startswith(folder + os.sep) for folder in folders)
+
+    saved = {n: m for n, m in sys.modules.items() if local(m)}
+    for n in saved:
+        del sys.modules[n]
+    sys.path.insert(0, os.path.join(ROOT, directory))
+    try:
+        module = importlib.import_module(name)
+    finally:
+        sys.path.remove(os.path.join(ROOT, directory))
+        for n in [n for n, m in sys.modules.items() if local(m)]:
+            del sys.modules[n]
+        sys.modules.update(saved)
+    _modules[key] = module
+    return module
+
+
+class GridPlanner:
+    """A* (в том числе JPS и JPS+) или Dijkstra на сетке: сетка строится один раз, запрос - новый экземпляр"""
+
+    def __init__(self, name, grid):
+        self.name = name
+        self.grid = grid
+        self.options = {}
+        if name == 'dijkstra':
+            module = import_planner(DIRECTORIES[name], 'dijkstra')
+            self.planner_class = module.Dijkstra
+        else:
+            module = import_planner(DIRECTORIES[name], 'astar')
+            self.planner_class = module.AStar
+            self.options['mode'] = ASTAR_MODES[name]
+        # Граф сетки индексируется (строка, столбец), то есть (y, x); строится один раз на карту
+        self.graph = module.GridGraph.from_grid(grid)
+        if name == 'jps_plus':
+            # Таблица прыжков JPS+ тоже считается один раз на карту
+            self.options['jumps'] = module.JumpTable(self.graph)
+
+    def solve(self, start, goal, seed=None, **options):
+        start_cell, goal_cell = (int(start[1]), int(start[0])), (int(goal[1]), int(goal[0]))
+        planner = self.planner_class(start_cell, goal_cell, None, grid=self.graph, trace=False,
+                                     **self.options, **options)
+        while planner.step():
+            if planner.path_complete:
+                break
+        path = None
+        if planner.path_complete:
+            path = [(col, row) for row, col in planner.get_path()]
+        stats = planner.stats() if hasattr(planner, 'stats') else {'expanded': planner.step_count}
+        return path, stats
+
+
+class FieldPlanner:
+    """Dijkstra до конца от каждого нового старта: поле расстояний хранится в памяти и на диске,
+    путь к любой цели из того же старта восстанавливается за O(длины пути)"""
+
+    def __init__(self, grid):
+        self.name = 'dijkstra_field'
+        self.grid = grid
+        self.module = import_planner(DIRECTORIES[self.name], 'distance_field')
+        self.graph = self.module.GridGraph.from_grid(grid)
+        self.fields = collections.OrderedDict()
+
+    def solve(self, start, goal, seed=None):
+        start_cell, goal_cell = (int(start[1]), int(start[0])), (int(goal[1]), int(goal[0]))
+        field = self.fields.get(start_cell)
+        expanded = 0
+        if field is None:
+            field = self.module.load_or_compute(self.graph, [start_cell])
+            expanded = field.expanded
+            self.fields[start_cell] = field
+            if len(self.fields) > FIELD_CACHE_SIZE:
+                self.fields.popitem(last=False)
+        self.fields.move_to_end(start_cell)
+        path = field.path_to(goal_cell)
+        if path is not None:
+            path = [(col, row) for row, col in path]
+        return path, {'expanded': expanded}
+
+
+class SamplingPlanner:
+    """RRT, RRT-Connect или RRT*: карта занятости (и карта расстояний) строится один раз"""
+
+    def __init__(self, name, grid):
+        self.name = name
+        self.grid = grid
+        module = import_planner(DIRECTORIES[name], name)
+        self.planner_class = getattr(module, {'rrt': 'RRT', 'rrt_connect': 'RRTConnect', 'rrtstar': 'RRTStar'}[name])
+        self.node_class = module.Node
+        # collision берётся у самого планировщика: его проверка типа карты должна узнать CollisionMap
+        self.collision_map = module.collision.CollisionMap(grid)
+        if getattr(import_planner(DIRECTORIES[name], 'config'), 'CLEARANCE', False):
+            self.collision_map.enable_clearance()
+
+    def solve(self, start, goal, seed=None):
+        planner = self.planner_class(self.node_class(*start), self.node_class(*goal), self.collision_map,
+                                     verbose=False, seed=seed)
+        path = planner.find_path()
+        stats = planner.stats()
+        stats.pop('time', None)
+        stats.pop('cost', None)
+        return path, stats
+
+
+class PotentialFieldPlanner:
+    """Метод потенциальных полей: препятствия - центры занятых клеток, поле считается на каждый запрос"""
+
+    def __init__(self, grid):
+        self.name = 'potential_field'
+        self.grid = grid
+        self.module = import_planner(DIRECTORIES[self.name], self.name)
+        self.shape = grid.shape
+        self.obstacles = [tuple(cell) for cell in np.argwhere(grid).tolist()]
+
+    def solve(self, start, goal, seed=None):
+        # Поле индексируется (строка, столбец), то есть (y, x)
+        pf = self.module.PotentialField((start[1], start[0]), (goal[1], goal[0]), self.obstacles,
+                                        seed, shape=self.shape, verbose=False)
+        pf.calculate_potential_field()
+        while pf.iterations < POTENTIAL_FIELD_ITERATIONS and pf.step():
+            pass
+        path = pf.get_path()
+        if path is not None:
+            path = [(col, row) for row, col in path]
+        return path, {'expanded': pf.iterations, 'steps': pf.step_count}
+
+
+def check_options(name, options):
+    """Проверяет параметры запроса планировщика name (heuristic, weight); ValueError - некорректны"""
+    if not options:
+        return
+    unknown = [option for option in options if option not in ASTAR_OPTIONS]
+    if unknown:
+        raise ValueError(f"Неизвестные параметры: {', '.join(unknown)}, доступны: {', '.join(ASTAR_OPTIONS)}")
+    if name not in ASTAR_MODES:
+        raise ValueError(f"Параметры {', '.join(options)} поддерживаются только планировщиками "
+                         f"{', '.join(ASTAR_MODES)}")
+    if 'heuristic' in options and options['heuristic'] not in ASTAR_HEURISTICS:
+        raise ValueError(f"Неизвестная эвристика: {options['heuristic']}, доступны: {', '.join(ASTAR_HEURISTICS)}")
+    # Бесконечный вес даёт inf * 0 = NaN в оценке f у цели, и порядок раскрытия теряет смысл
+    if 'weight' in options and not (math.isfinite(options['weight']) and options['weight'] >= 1):
+        raise ValueError(f"Вес эвристики должен быть конечным и не меньше 1, получено {options['weight']}")
+
+
+def prepare(name, grid, robot_radius=0):
+    """Готовит планировщик name к запросам на карте grid (булев массив [y, x]).
+
+    robot_radius - радиус робота в ячейках: препятствия расширяются на него один раз
+    для любого планировщика, и точки запросов проверяются по расширенной карте.
+    """
+    if name not in DIRECTORIES:
+        raise ValueError(f"Неизвестный планировщик: {name}, доступны: {', '.join(PLANNERS)}")
+    grid = np.asarray(grid, dtype=bool)
+    if robot_radius > 0:
+        grid = import_planner('RRT', 'collision').inflate(grid, robot_radius)
+    if name in GRID_PLANNERS:
+        return GridPlanner(name, grid)
+    if name == 'dijkstra_field':
+        return FieldPlanner(grid)
+    if name == 'potential_field':
+        return PotentialFieldPlanner(grid)
+    return SamplingPlanner(name, grid)
+
+
+def path_length(path):
+    return sum(math.dist(a, b) for a, b in zip(path, path[1:])) if path else None
+
+
+def solve(planner, start, goal, seed=None, **options):
+    """Один запрос с проверкой точек по карте планировщика и замером времени; возвращает словарь результата.
+
+    options - параметры AStar этого запроса для astar, jps и jps_plus: heuristic и weight.
+    """
+    check_options(planner.name, options)
+    result = {'planner': planner.name, 'start': list(start), 'goal': list(goal)}
+    height, width = planner.grid.shape
+    for label, (x, y) in (('start', start), ('goal', goal)):
+        if not (0 <= x < width and 0 <= y < height) or planner.grid[int(y), int(x)]:
+            result.update(path=None, cost=None, time_ms=0.0, error=f"{label} вне карты или в препятствии")
+            return result
+    start_time = time.perf_counter()
+    path, stats = planner.solve(tuple(start), tuple(goal), seed, **options)
+    elapsed = (time.perf_counter() - start_time) * 1000
+    result.update(path=[[float(x), float(y)] for x, y in path] if path else None,
+                  cost=path_length(path), time_ms=elapsed, **stats)
+    return result
@@ -0,0 +1,333 @@
+"""Локальный HTTP-сервис планирования на asyncio (только стандартная библиотека).
+
+Карты загружаются при старте и остаются в памяти: главный процесс создаёт кеш
+(maps/map_loader), процессы-исполнители отображают его в память и один раз на
+пару карта/планировщик готовят структуры поиска (tools/planners). Запросы
+ставятся в ограниченную очередь; если она заполнена, сервис сразу отвечает
+503 с заголовком Retry-After, а не копит задержку.
+
+Запросы:
+    GET  /maps     - загруженные карты
+    POST /plan     - {"map": "warehouse", "planner": "astar", "start": [x, y], "goal": [x, y], "seed": 0}
+                     необязательные "heuristic" и "weight" - эвристика и вес A*/JPS: под нагрузкой
+                     weight > 1 заметно сокращает поиск ценой пути не длиннее оптимального в weight раз
+    GET  /metrics  - очередь, счётчики, задержки (p50/p95/p99) и пропускная способность
+
+Пример:
+    python tools/service.py --map warehouse=warehouse.yaml --port 8080 --workers 4
+    curl -d '{"map": "warehouse", "start": [10, 10], "goal": [200, 150]}' localhost:8080/plan
+"""
+import argparse
+import asyncio
+import collections
+import json
+import math
+import os
+import signal
+import sys
+import time
+from concurrent.futures import ProcessPoolExecutor
+from http import HTTPStatus
+
+import numpy as np
+
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), 'maps'))
+
+import map_loader
+import planners
+
+SERVICE_PLANNERS = ('astar', 'jps', 'jps_plus', 'dijkstra', 'dijkstra_field', 'rrtstar')
+QUEUE_SIZE = 64  # Максимум ожидающих запросов, дальше - 503
+LATENCY_WINDOW = 1000  # Сколько последних запросов учитывается в перцентилях задержки
+THROUGHPUT_WINDOW = 60  # Окно расчёта пропускной способности, секунды
+MAX_BODY = 1 << 20  # Максимальный размер тела запроса, байты
+
+# Состояние процесса-исполнителя: карты и подготовленные планировщики
+_grids = {}
+_prepared = {}
+
+
+def init_worker(map_files, robot_radius):
+    """Инициализация исполнителя: карты берутся из кеша, отображённого в память"""
+    for name, path in map_files.items():
+        _grids[name] = map_loader.load_map(path).grid()
+    _prepared['robot_radius'] = robot_radius
+
+
+def solve_in_worker(map_name, planner, start, goal, seed, options=None):
+    """Решение одного запроса в процессе-исполнителе"""
+    # Подготовка не зависит от эвристики и веса: они передаются в каждый запрос
+    key = (map_name, planner)
+    if key not in _prepared:
+        _prepared[key] = planners.prepare(planner, _grids[map_name], _prepared['robot_radius'])
+    return planners.solve(_prepared[key], start, goal, seed, **(options or {}))
+
+
+class Metrics:
+    """Счётчики запросов, скользящие окна задержек и моментов завершения"""
+
+    def __init__(self):
+        self.started = time.monotonic()
+        self.counters = collections.Counter()
+        self.latencies = collections.deque(maxlen=LATENCY_WINDOW)
+        self.queue_waits = collections.deque(maxlen=LATENCY_WINDOW)
+        self.finished = collections.deque()
+
+    def record(self, latency_ms, queue_wait_ms):
+        now = time.monotonic()
+        self.latencies.append(latency_ms)
+        self.queue_waits.append(queue_wait_ms)
+        self.finished.append(now)
+        self.prune(now)
+
+    def prune(self, now):
+        """Убирает моменты завершения старше окна пропускной способности"""
+        while self.finished and self.finished[0] < now - THROUGHPUT_WINDOW:
+            self.finished.popleft()
+
+    def report(self, queue, in_flight):
+        now = time.monotonic()
+        self.prune(now)  # Без новых запросов окно иначе не сдвигается
+        uptime = now - self.started
+        window = min(uptime, THROUGHPUT_WINDOW)
+        return {
+            'uptime_s': uptime,
+            'queue_depth': queue.qsize(),
+            'queue_size': queue.maxsize,
+            'in_flight': in_flight,
+            **self.counters,
+            'latency_ms': percentiles(self.latencies),
+            'queue_wait_ms': percentiles(self.queue_waits),
+            'throughput_rps': len(self.finished) / window if window > 0 else 0.0,
+        }
+
+
+def parse_plan(body):
+    """Разбирает тело POST /plan в задание (карта, планировщик, старт, цель, зерно, параметры).
+
+    Всё, что исполнитель не сможет обработать, отвергается здесь ValueError, чтобы
+    некорректный запрос не занимал место в очереди.
+    """
+    query = json.loads(body)
+    if not isinstance(query, dict):
+        raise ValueError("тело запроса должно быть объектом JSON")
+    for name in ('map', 'start', 'goal'):
+        if name not in query:
+            raise ValueError(f"нет поля {name}")
+    map_name, planner = query['map'], query.get('planner', 'astar')
+    for name, value in (('map', map_name), ('planner', planner)):
+        if not isinstance(value, str):
+            raise ValueError(f"{name} должно быть строкой")
+    points = []
+    for name in ('start', 'goal'):
+        point = query[name]
+        if (not isinstance(point, list) or len(point) != 2
+                or not all(isinstance(v, (int, float)) and not isinstance(v, bool) and math.isfinite(v)
+                           for v in point)):
+            raise ValueError(f"{name} должно быть парой конечных чисел [x, y]")
+        points.append([float(v) for v in point])
+    seed = query.get('seed')
+    if seed is not None and (not isinstance(seed, int) or isinstance(seed, bool)):
+        raise ValueError("seed должно быть целым числом или null")
+    options = {name: query[name] for name in ('heuristic', 'weight') if query.get(name) is not None}
+    if 'weight' in options:
+        if not isinstance(options['weight'], (int, float)) or isinstance(options['weight'], bool):
+            raise ValueError("weight должно быть числом")
+        options['weight'] = float(options['weight'])
+    return map_name, planner, points[0], points[1], seed, options
+
+
+def percentiles(values):
+    if not values:
+        return None
+    p50, p95, p99 = np.percentile(np.fromiter(values, dtype=float), [50, 95, 99])
+    return {'p50': p50, 'p95': p95, 'p99': p99, 'max': max(values), 'count': len(values)}
+
+
+class PlanningService:
+    """HTTP-сервер: разбор запросов, очередь с ограничением и диспетчеры пула процессов"""
+
+    def __init__(self, map_files, workers=os.cpu_count(), queue_size=QUEUE_SIZE, robot_radius=0):
+        self.maps = {}
+        for name, path in map_files.items():
+            occupancy = map_loader.load_map(path)  # Заодно создаёт кеш для исполнителей
+            self.maps[name] = {'path': os.path.abspath(path), 'width': occupancy.width,
+                               'height': occupancy.height, 'resolution': occupancy.resolution}
+        self.workers = workers
+        self.pool = ProcessPoolExecutor(workers, initializer=init_worker,
+                                        initargs=({n: m['path'] for n, m in self.maps.items()}, robot_radius))
+        self.queue = asyncio.Queue(queue_size)
+        self.metrics = Metrics()
+        self.in_flight = 0
+        self.dispatchers = []
+
+    async def start(self, host='127.0.0.1', port=8080):
+        # Диспетчеров столько же, сколько исполнителей: очередь не опустошается быстрее, чем работает пул
+        self.dispatchers = [asyncio.create_task(self.dispatch()) for _ in range(self.workers)]
+        return await asyncio.start_server(self.handle_connection, host, port)
+
+    async def close(self):
+        for task in self.dispatchers:
+            task.cancel()
+        await asyncio.gather(*self.dispatchers, return_exceptions=True)
+        self.pool.shutdown(cancel_futures=True)
+
+    async def dispatch(self):
+        loop = asyncio.get_running_loop()
+        while True:
+            job, future, queued = await self.queue.get()
+            if future.cancelled():  # Клиент отключился, пока запрос ждал в очереди
+                self.queue.task_done()
+                continue
+            self.in_flight += 1
+            started = time.perf_counter()
+            try:
+                result = await loop.run_in_executor(self.pool, solve_in_worker, *job)
+            except Exception as error:
+                if not future.done():
+                    future.set_exception(error)
+            else:
+                if not future.done():
+                    future.set_result(result)
+                # Отклонённые точки старта и цели - ошибка запроса, а не выполненная работа
+                if 'error' not in result:
+                    self.metrics.record((time.perf_counter() - queued) * 1000, (started - queued) * 1000)
+            finally:
+                self.in_flight -= 1
+                self.queue.task_done()
+
+    async def handle_connection(self, reader, writer):
+        try:
+            while True:
+                request = await read_request(reader)
+                if request is None:
+                    break
+                method, path, headers, body = request
+                status, payload, extra = await self.route(method, path, body)
+                keep_alive = headers.get('connection', '').lower() != 'close'
+                await write_response(writer, status, payload, extra, keep_alive)
+                if not keep_alive:
+                    break
+        except (ConnectionError, asyncio.IncompleteReadError):
+            pass
+        except ValueError as error:
+            await write_response(writer, HTTPStatus.BAD_REQUEST, {'error': str(error)}, {}, False)
+        finally:
+            writer.close()
+
+    async def route(self, method, path, body):
+        self.metrics.counters['requests'] += 1
+        if path == '/plan' and method == 'POST':
+            return await self.plan(body)
+        if path == '/metrics' and method == 'GET':
+            return HTTPStatus.OK, self.metrics.report(self.queue, self.in_flight), {}
+        if path == '/maps' and method == 'GET':
+            return HTTPStatus.OK, self.maps, {}
+        return HTTPStatus.NOT_FOUND, {'error': f"Нет обработчика {method} {path}"}, {}
+
+    async def plan(self, body):
+        try:
+            job = parse_plan(body)
+        except (ValueError, OverflowError) as error:  # ValueError - в том числе json.JSONDecodeError
+            self.metrics.counters['bad_requests'] += 1
+            return HTTPStatus.BAD_REQUEST, {'error': f"Некорректный запрос: {error}"}, {}
+        if job[0] not in self.maps:
+            self.metrics.counters['bad_requests'] += 1
+            return HTTPStatus.NOT_FOUND, {'error': f"Карта {job[0]} не загружена"}, {}
+        if job[1] not in SERVICE_PLANNERS:
+            self.metrics.counters['bad_requests'] += 1
+            return HTTPStatus.BAD_REQUEST, {'error': f"Планировщик {job[1]} не поддерживается, "
+                                                     f"доступны: {', '.join(SERVICE_PLANNERS)}"}, {}
+        try:
+            planners.check_options(job[1], job[5])
+        except ValueError as error:
+            self.metrics.counters['bad_requests'] += 1
+            return HTTPStatus.BAD_REQUEST, {'error': str(error)}, {}
+
+        future = asyncio.get_running_loop().create_future()
+        try:
+            self.queue.put_nowait((job, future, time.perf_counter()))
+        except asyncio.QueueFull:
+            self.metrics.counters['rejected'] += 1
+            return HTTPStatus.SERVICE_UNAVAILABLE, {'error': "Очередь заполнена"}, {'Retry-After': '1'}
+        try:
+            result = await future
+        except Exception as error:
+            self.metrics.counters['errors'] += 1
+            return HTTPStatus.INTERNAL_SERVER_ERROR, {'error': f"{type(error).__name__}: {error}"}, {}
+        if 'error' in result:  # Старт или цель вне карты или в препятствии
+            self.metrics.counters['bad_requests'] += 1
+            return HTTPStatus.BAD_REQUEST, {'map': job[0], **result}, {}
+        self.metrics.counters['completed'] += 1
+        return HTTPStatus.OK, {'map': job[0], **result}, {}
+
+
+async def read_request(reader):
+    """Читает один HTTP/1.1 запрос; None, если клиент закрыл соединение"""
+    line = await reader.readline()
+    if not line:
+        return None
+    parts = line.decode('latin-1').split()
+    if len(parts) != 3:
+        raise ValueError("Некорректная строка запроса")
+    method, path = parts[0], parts[1].split('?', 1)[0]
+    headers = {}
+    while True:
+        line = await reader.readline()
+        if line in (b'\r\n', b'\n', b''):
+            break
+        name, _, value = line.decode('latin-1').partition(':')
+        headers[name.strip().lower()] = value.strip()
+    length = int(headers.get('content-length', 0))
+    if length > MAX_BODY:
+        raise ValueError("Слишком большое тело запроса")
+    body = await reader.readexactly(length) if length else b''
+    return method, path, headers, body
+
+
+async def write_response(writer, status, payload, extra_headers, keep_alive):
+    body = json.dumps(payload, ensure_ascii=False).encode()
+    headers = {
+        'Content-Type': 'application/json; charset=utf-8',
+        'Content-Length': str(len(body)),
+        'Connection': 'keep-alive' if keep_alive else 'close',
+        **extra_headers,
+    }
+    head = f"HTTP/1.1 {status.value} {status.phrase}\r\n"
+    head += ''.join(f"{name}: {value}\r\n" for name, value in headers.items())
+    writer.write(head.encode('latin-1') + b'\r\n' + body)
+    await writer.drain()
+
+
+async def serve(args):
+    map_files = dict(entry.split('=', 1) for entry in args.map)
+    service = PlanningService(map_files, args.workers, args.queue_size, args.robot_radius)
+    server = await service.start(args.host, args.port)
+    print(f"Сервис слушает http://{args.host}:{args.port}, карты: {', '.join(service.maps)}, "
+          f"исполнителей: {service.workers}, очередь: {service.queue.maxsize}", file=sys.stderr)
+    stop = asyncio.Event()
+    for signum in (signal.SIGINT, signal.SIGTERM):
+        asyncio.get_running_loop().add_signal_handler(signum, stop.set)
+    try:
+        async with server:
+            await stop.wait()
+    finally:
+        await service.close()
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Локальный HTTP-сервис планирования путей")
+    parser.add_argument('--map', action='append', required=True, metavar='NAME=FILE',
+                        help="карта, загружаемая при старте; можно указать несколько раз")
+    parser.add_argument('--host', default='127.0.0.1')
+    parser.add_argument('--port', type=int, default=8080)
+    parser.add_argument('--workers', type=int, default=os.cpu_count())
+    parser.add_argument('--queue-size', type=int, default=QUEUE_SIZE)
+    parser.add_argument('--robot-radius', type=int, default=0)
+    args = parser.parse_args()
+    asyncio.run(serve(args))
+
+
+if __name__ == '__main__':
+    main()